@@ -1,5 +1,7 @@
+import importlib
 import os
 import sys
+import time
 
 initFilePath = os.path.abspath(__file__)
 pluginDirectory = os.path.dirname(initFilePath)
@@ -9,9 +11,46 @@ unrealLibraryDirectory = os.path.join(pluginDirectory, "vendor", "unrealSDK")
 def AddDirectoryToPath(dir):
     if dir not in sys.path:
         sys.path.append(dir)
-        print(f"added {dir} to path")
 
 
 AddDirectoryToPath(pluginDirectory)
 AddDirectoryToPath(sourceDirectory)
-AddDirectoryToPath(unrealLibraryDirectory)
\ No newline at end of file
+AddDirectoryToPath(unrealLibraryDirectory)
+
+# the shelf buttons go through RunTool, so a tool's module and everything it imports only loads the first time its button is pressed
+tools = {
+    "LimbRiggingTool" : "LimbRiggingTool",
+    "MayaToUE" : "MayaToUE",
+    "ProxyRigger" : "ProxyRigger",
+}
+startupTimes = {} # tool name -> times of its latest start, see GetStartupReport
+
+def RunTool(toolName):
+    if toolName not in tools:
+        raise KeyError(f"no tool called {toolName}, the tools are: {', '.join(sorted(tools))}")
+
+    moduleName = tools[toolName]
+    firstStart = moduleName not in sys.modules
+    moduleCount = len(sys.modules)
+    startTime = time.perf_counter()
+    toolModule = importlib.import_module(moduleName) # a module that is already loaded is just looked up, nothing reloads
+    importTime = time.perf_counter()
+    window = toolModule.Run()
+    windowTime = time.perf_counter()
+
+    startupTimes[toolName] = {
+        "firstStart" : firstStart,
+        "importSeconds" : round(importTime - startTime, 4),
+        "windowSeconds" : round(windowTime - importTime, 4), # until the window is built and show() returned
+        "timeToFirstWindow" : round(windowTime - startTime, 4),
+        "modulesLoaded" : len(sys.modules) - moduleCount,
+    }
+    return window
+
+def GetStartupReport():
+    return {toolName : dict(times) for toolName, times in startupTimes.items()}
+
+def PrintStartupReport():
+    for toolName, times in startupTimes.items():
+        startKind = "first start" if times["firstStart"] else "restart"
+        print(f"{toolName}: {times['timeToFirstWindow'] * 1000:.0f}ms to the first window ({startKind}), {times['importSeconds'] * 1000:.0f}ms importing {times['modulesLoaded']} modules, {times['windowSeconds'] * 1000:.0f}ms building the window")
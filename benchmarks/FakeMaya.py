@@ -0,0 +1,956 @@
+# an in-memory stand-in for maya.cmds, maya.mel and the parts of the maya api the tools use, so their hot paths can be run
+# and measured on a machine without maya. every command and api call is counted, commands the scene does not model are
+# counted too and listed under "unmodeled" so a benchmark never quietly skips work
+#
+#   scene = Install()              # puts fake maya, PySide2 and shiboken2 modules into sys.modules
+#   BuildSyntheticScene(scene, chainCount = 4, vertCount = 5000)
+#   ... run tool code ...
+#   scene.stats.GetReport()
+
+import collections
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+import types
+
+class CallStats:
+    def __init__(self):
+        self.counts = collections.Counter()
+        self.unmodeled = collections.Counter()
+
+    def Reset(self):
+        self.counts.clear()
+        self.unmodeled.clear()
+
+    def Record(self, name):
+        self.counts[name] += 1
+
+    def GetReport(self):
+        return {
+            "totalCalls" : sum(self.counts.values()),
+            "calls" : dict(sorted(self.counts.items())),
+            "unmodeled" : dict(sorted(self.unmodeled.items())),
+        }
+
+class FakeNode:
+    def __init__(self, name, nodeType, parent = None):
+        self.name = name
+        self.type = nodeType
+        self.parent = parent
+        self.children = []
+        self.attrs = {"t" : (0.0, 0.0, 0.0), "v" : 1, "intermediateObject" : False}
+        self.data = None # mesh, skin, curve or anim curve data, depending on the type
+
+class MeshData:
+    def __init__(self, points, faceVertCounts, faceVertIndices):
+        self.points = [tuple(point) for point in points]
+        self.faceVertCounts = list(faceVertCounts)
+        self.faceVertIndices = list(faceVertIndices)
+
+class SkinData:
+    def __init__(self, influences, weights):
+        self.influences = list(influences)
+        self.weights = weights # flat list, vert major, len(influences) values per vert
+
+class FakeScene:
+    def __init__(self):
+        self.stats = CallStats()
+        self.tempDirectory = tempfile.mkdtemp(prefix = "FakeMaya_")
+        self.callbacks = {}
+        self.nextCallbackId = 1
+        self.Clear()
+
+    def Clear(self):
+        self.nodes = {}
+        self.connections = [] # (source node, source attr, destination node, destination attr)
+        self.selection = []
+        self.playbackRange = [1.0, 120.0]
+        self.undoEnabled = True
+
+    def NotifyChanged(self):
+        for Callback in list(self.callbacks.values()):
+            Callback()
+
+    def GetUniqueName(self, name):
+        name = name.rsplit("|", 1)[-1]
+        if name not in self.nodes:
+            return name
+
+        baseName = re.sub(r"\d+$", "", name)
+        number = 1
+        while f"{baseName}{number}" in self.nodes:
+            number += 1
+
+        return f"{baseName}{number}"
+
+    def CreateNode(self, nodeType, name, parent = None):
+        node = FakeNode(self.GetUniqueName(name), nodeType, parent)
+        self.nodes[node.name] = node
+        if parent:
+            parent.children.append(node)
+
+        return node
+
+    def Find(self, name):
+        # takes names, dag paths and plugs, "|root|arm_l.tx" finds arm_l
+        return self.nodes.get(str(name).split(".", 1)[0].rsplit("|", 1)[-1])
+
+    def Get(self, name):
+        node = self.Find(name)
+        if node is None:
+            raise ValueError(f"No object matches name: {name}")
+
+        return node
+
+    def GetPath(self, node):
+        names = []
+        while node:
+            names.append(node.name)
+            node = node.parent
+
+        return "|" + "|".join(reversed(names))
+
+    def GetWorldPosition(self, node):
+        x, y, z = 0.0, 0.0, 0.0
+        while node:
+            tx, ty, tz = node.attrs.get("t", (0.0, 0.0, 0.0))
+            x, y, z = x + tx, y + ty, z + tz
+            node = node.parent
+
+        return (x, y, z)
+
+    def SetParent(self, node, parent):
+        if node.parent:
+            node.parent.children.remove(node)
+
+        node.parent = parent
+        if parent:
+            parent.children.append(node)
+
+    def Delete(self, node):
+        for child in list(node.children):
+            self.Delete(child)
+
+        if node.parent:
+            node.parent.children.remove(node)
+
+        self.connections = [connection for connection in self.connections if connection[0] is not node and connection[2] is not node]
+        self.nodes.pop(node.name, None)
+        if node.name in self.selection:
+            self.selection.remove(node.name)
+
+        self.NotifyChanged()
+
+    def Connect(self, sourcePlug, destinationPlug):
+        sourceNode, sourceAttr = self.Get(sourcePlug), sourcePlug.split(".", 1)[1]
+        destinationNode, destinationAttr = self.Get(destinationPlug), destinationPlug.split(".", 1)[1]
+        self.connections.append((sourceNode, sourceAttr, destinationNode, destinationAttr))
+        self.NotifyChanged()
+
+    def GetDescendants(self, node):
+        descendants = []
+        for child in node.children:
+            descendants.append(child)
+            descendants.extend(self.GetDescendants(child))
+
+        return descendants
+
+shapeTypes = ("mesh", "nurbsCurve", "locator")
+dagTypes = ("transform", "joint", "ikHandle", "ikEffector", "orientConstraint", "parentConstraint", "poleVectorConstraint") + shapeTypes
+
+def AsList(objects):
+    if objects is None:
+        return []
+
+    if isinstance(objects, (list, tuple, set)):
+        flat = []
+        for entry in objects:
+            flat.extend(AsList(entry))
+
+        return flat
+
+    return [objects]
+
+def IsOfType(node, nodeType):
+    # animCurve covers animCurveTL, animCurveTA and so on, like the maya type hierarchy
+    return node.type == nodeType or (nodeType == "animCurve" and node.type.startswith("animCurve")) or (nodeType == "transform" and node.type == "joint")
+
+class FakeCommands: # the modeled part of maya.cmds, every public method becomes a command
+    def __init__(self, scene):
+        self.scene = scene
+
+    def ls(self, *objects, sl = False, selection = False, type = None, l = False, long = False, showType = False, **kwargs):
+        scene = self.scene
+        if sl or selection:
+            nodes = [scene.Get(name) for name in scene.selection]
+        elif objects:
+            nodes = [node for node in (scene.Find(name) for name in AsList(objects)) if node]
+        else:
+            nodes = list(scene.nodes.values())
+
+        if type:
+            nodeTypes = AsList(type)
+            nodes = [node for node in nodes if any(IsOfType(node, nodeType) for nodeType in nodeTypes)]
+
+        names = [scene.GetPath(node) if (l or long) else node.name for node in nodes]
+        if showType:
+            return [value for name, node in zip(names, nodes) for value in (name, node.type)]
+
+        return names
+
+    def listRelatives(self, objects = None, s = False, shapes = False, c = False, children = False, ad = False, allDescendents = False, p = False, parent = False, type = None, f = False, fullPath = False, ni = False, noIntermediate = False, **kwargs):
+        scene = self.scene
+        found = []
+        for name in AsList(objects):
+            node = scene.Get(name)
+            if p or parent:
+                candidates = [node.parent] if node.parent else []
+            elif ad or allDescendents:
+                candidates = scene.GetDescendants(node)
+            else:
+                candidates = list(node.children)
+
+            if s or shapes:
+                candidates = [candidate for candidate in candidates if candidate.type in shapeTypes]
+
+            if ni or noIntermediate:
+                candidates = [candidate for candidate in candidates if not candidate.attrs.get("intermediateObject")]
+
+            if type:
+                candidates = [candidate for candidate in candidates if any(IsOfType(candidate, nodeType) for nodeType in AsList(type))]
+
+            found.extend(candidates)
+
+        if not found:
+            return None
+
+        return [scene.GetPath(node) if (f or fullPath) else node.name for node in found]
+
+    def objectType(self, name, **kwargs):
+        return self.scene.Get(name).type
+
+    def objExists(self, name):
+        return self.scene.Find(name) is not None
+
+    def select(self, objects = None, r = False, cl = False, add = False, **kwargs):
+        names = [self.scene.Get(name).name for name in AsList(objects)]
+        self.scene.selection = (self.scene.selection + names) if add else ([] if cl else names)
+
+    def xform(self, name, q = False, t = False, ws = False, translation = False, worldSpace = False, **kwargs):
+        scene = self.scene
+        if ".vtx[" in name:
+            # only the whole vertex list is modeled, that is all the tools ask for
+            return [coordinate for point in scene.Get(name).data.points for coordinate in point]
+
+        node = scene.Get(name)
+        if q:
+            return list(scene.GetWorldPosition(node) if (ws or worldSpace) else node.attrs["t"])
+
+    def getAttr(self, plug, mi = False, **kwargs):
+        node, attr = self.scene.Get(plug), plug.split(".", 1)[1]
+        if attr == "poleVector":
+            return [(0.0, 0.0, 1.0)]
+
+        if mi: # the indices in use of a multi attribute, kept as "attr[index]" entries
+            return sorted(int(name[len(attr) + 1:-1]) for name in node.attrs if name.startswith(attr + "[")) or None
+
+        value = node.attrs.get(attr, 0.0)
+        return [tuple(value)] if isinstance(value, tuple) and len(value) == 3 else value
+
+    def setAttr(self, plug, *values, type = None, typ = None, **kwargs):
+        node, attr = self.scene.Get(plug), plug.split(".", 1)[1]
+        node.attrs[{"translate" : "t", "visibility" : "v"}.get(attr, attr)] = values[0] if len(values) == 1 else tuple(values)
+
+    def addAttr(self, name, ln = None, longName = None, dv = None, dt = None, **kwargs):
+        self.scene.Get(name).attrs[ln or longName] = "" if dt else (dv if dv is not None else 0.0)
+
+    def attributeQuery(self, attr, node = None, exists = False, **kwargs):
+        return attr in self.scene.Get(node).attrs
+
+    def connectAttr(self, sourcePlug, destinationPlug, **kwargs):
+        self.scene.Connect(sourcePlug, destinationPlug)
+
+    def listConnections(self, objects = None, s = True, d = True, source = None, destination = None, sh = False, **kwargs):
+        scene = self.scene
+        nodes = {id(node) for node in (scene.Get(name) for name in AsList(objects))}
+        found = []
+        for sourceNode, _, destinationNode, _ in scene.connections:
+            if s and id(destinationNode) in nodes:
+                found.append(sourceNode.name)
+            if d and id(sourceNode) in nodes:
+                found.append(destinationNode.name)
+
+        return found or None
+
+    def listHistory(self, objects = None, **kwargs):
+        # everything upstream of the objects
+        scene = self.scene
+        found = []
+        frontier = [scene.Get(name) for name in AsList(objects)]
+        seen = {id(node) for node in frontier}
+        while frontier:
+            nextFrontier = []
+            for sourceNode, _, destinationNode, _ in scene.connections:
+                if any(destinationNode is node for node in frontier) and id(sourceNode) not in seen:
+                    seen.add(id(sourceNode))
+                    nextFrontier.append(sourceNode)
+                    found.append(sourceNode.name)
+
+            frontier = nextFrontier
+
+        return found
+
+    def group(self, objects = None, n = None, name = None, em = False, **kwargs):
+        scene = self.scene
+        groupNode = scene.CreateNode("transform", n or name or "group1")
+        for objectName in AsList(objects):
+            scene.SetParent(scene.Get(objectName), groupNode)
+
+        return groupNode.name
+
+    def parent(self, *names, w = False, world = False, **kwargs):
+        scene = self.scene
+        names = AsList(names)
+        parentNode = None if (w or world) else scene.Get(names.pop())
+        for name in names:
+            scene.SetParent(scene.Get(name), parentNode)
+
+        return names
+
+    def matchTransform(self, name, target, **kwargs):
+        scene = self.scene
+        node = scene.Get(name)
+        targetPosition = scene.GetWorldPosition(scene.Get(target))
+        parentPosition = scene.GetWorldPosition(node.parent) if node.parent else (0.0, 0.0, 0.0)
+        node.attrs["t"] = tuple(targetValue - parentValue for targetValue, parentValue in zip(targetPosition, parentPosition))
+
+    def CreateConstraint(self, constraintType, drivers, target):
+        scene = self.scene
+        targetNode = scene.Get(target)
+        constraint = scene.CreateNode(constraintType, f"{targetNode.name}_{constraintType}1", targetNode)
+        for i, driver in enumerate(AsList(drivers)):
+            constraint.attrs[f"{scene.Get(driver).name}W{i}"] = 1.0
+            scene.Connect(f"{driver}.worldMatrix", f"{constraint.name}.target")
+
+        scene.Connect(f"{constraint.name}.constraintRotate", f"{target}.rotate")
+        return [constraint.name]
+
+    def orientConstraint(self, driver, target, **kwargs):
+        return self.CreateConstraint("orientConstraint", driver, target)
+
+    def parentConstraint(self, driver, target, **kwargs):
+        return self.CreateConstraint("parentConstraint", driver, target)
+
+    def poleVectorConstraint(self, driver, target, **kwargs):
+        return self.CreateConstraint("poleVectorConstraint", driver, target)
+
+    def ikHandle(self, n = None, sj = None, ee = None, sol = None, **kwargs):
+        scene = self.scene
+        handle = scene.CreateNode("ikHandle", n or "ikHandle1")
+        handle.attrs["t"] = scene.GetWorldPosition(scene.Get(ee))
+        effector = scene.CreateNode("ikEffector", "effector1", scene.Get(ee).parent)
+        scene.Connect(f"{sj}.message", f"{handle.name}.startJoint")
+        scene.Connect(f"{effector.name}.handlePath", f"{handle.name}.endEffector")
+        return [handle.name, effector.name]
+
+    def CreateTransformWithShape(self, shapeType, name):
+        scene = self.scene
+        transform = scene.CreateNode("transform", name)
+        shape = scene.CreateNode(shapeType, transform.name + "Shape", transform)
+        return transform, shape
+
+    def spaceLocator(self, n = None, name = None, **kwargs):
+        transform, _ = self.CreateTransformWithShape("locator", n or name or "locator1")
+        return [transform.name]
+
+    def circle(self, n = None, name = None, r = 1.0, radius = None, **kwargs):
+        radius = radius if radius is not None else r
+        transform, shape = self.CreateTransformWithShape("nurbsCurve", n or name or "nurbsCircle1")
+        shape.data = [(0.0, math.cos(i * math.pi / 4) * radius, math.sin(i * math.pi / 4) * radius) for i in range(8)]
+        history = self.scene.CreateNode("makeNurbCircle", "makeNurbCircle1")
+        self.scene.Connect(f"{history.name}.outputCurve", f"{shape.name}.create")
+        return [transform.name, history.name]
+
+    def curve(self, n = None, name = None, d = 1, p = None, k = None, per = False, **kwargs):
+        transform, shape = self.CreateTransformWithShape("nurbsCurve", n or name or "curve1")
+        shape.data = [tuple(point) for point in p or []]
+        return transform.name
+
+    def duplicate(self, name, n = None, rr = False, **kwargs):
+        scene = self.scene
+        node = scene.Get(name)
+        copy = scene.CreateNode(node.type, n or node.name, node.parent)
+        copy.attrs = dict(node.attrs)
+        for child in node.children:
+            childCopy = scene.CreateNode(child.type, copy.name + "Shape", copy)
+            childCopy.attrs = dict(child.attrs)
+            childCopy.data = list(child.data) if isinstance(child.data, list) else child.data
+
+        return [copy.name]
+
+    def createNode(self, nodeType, n = None, name = None, **kwargs):
+        return self.scene.CreateNode(nodeType, n or name or nodeType + "1").name
+
+    def expression(self, s = None, string = None, **kwargs):
+        expressionNode = self.scene.CreateNode("expression", "expression1")
+        expressionNode.attrs["expression"] = s or string
+        return expressionNode.name
+
+    def rename(self, name, newName, **kwargs):
+        scene = self.scene
+        node = scene.Get(name)
+        del scene.nodes[node.name]
+        node.name = scene.GetUniqueName(newName)
+        scene.nodes[node.name] = node
+        scene.NotifyChanged()
+        return node.name
+
+    def delete(self, *names, **kwargs):
+        for name in AsList(names):
+            node = self.scene.Find(name)
+            if node:
+                self.scene.Delete(node)
+
+    def skinCluster(self, *objects, q = False, g = False, tsb = False, **kwargs):
+        scene = self.scene
+        objects = AsList(objects)
+        if q:
+            skinNode = scene.Get(objects[0])
+            return [destination.name for source, _, destination, attr in scene.connections if source is skinNode and attr == "inMesh"]
+
+        influences, model = objects[:-1], objects[-1]
+        modelNode = scene.Get(model)
+        shape = next(child for child in modelNode.children if child.type == "mesh") if modelNode.type == "transform" else modelNode
+        skinNode = scene.CreateNode("skinCluster", "skinCluster1")
+        vertCount = len(shape.data.points)
+        skinNode.data = SkinData([scene.Get(influence).name for influence in influences], [1.0 / len(influences)] * (vertCount * len(influences)))
+        for i, influence in enumerate(influences):
+            scene.Connect(f"{influence}.worldMatrix", f"{skinNode.name}.matrix[{i}]")
+
+        scene.Connect(f"{skinNode.name}.outputGeometry[0]", f"{shape.name}.inMesh")
+        return [skinNode.name]
+
+    def sets(self, *objects, **kwargs):
+        return None
+
+    def internalVar(self, uad = False, userAppDir = False, **kwargs):
+        return self.scene.tempDirectory + "/"
+
+    def undoInfo(self, q = False, state = None, stateWithoutFlush = None, openChunk = False, closeChunk = False, **kwargs):
+        if q:
+            return self.scene.undoEnabled
+
+        if stateWithoutFlush is not None or state is not None:
+            self.scene.undoEnabled = bool(state if stateWithoutFlush is None else stateWithoutFlush)
+
+    def undo(self, **kwargs):
+        return None
+
+    def animLayer(self, name = None, override = False, **kwargs):
+        return self.scene.CreateNode("animLayer", name or "AnimLayer1").name
+
+    def refresh(self, **kwargs):
+        return None
+
+    def playbackOptions(self, q = False, e = False, min = None, max = None, minTime = None, maxTime = None, **kwargs):
+        if q:
+            return self.scene.playbackRange[0] if min else self.scene.playbackRange[1]
+
+        if min is not None:
+            self.scene.playbackRange[0] = float(min)
+        if max is not None:
+            self.scene.playbackRange[1] = float(max)
+
+    def keyframe(self, curve, q = False, tc = False, vc = False, **kwargs):
+        keys = self.scene.Get(curve).data
+        return [key[0] for key in keys] if tc else [key[1] for key in keys]
+
+    def keyTangent(self, curve, q = False, ia = False, oa = False, itt = False, ott = False, **kwargs):
+        keys = self.scene.Get(curve).data
+        if ia or oa:
+            return [0.0] * len(keys)
+
+        return ["auto"] * len(keys)
+
+    def FBXExport(self, *args, **kwargs):
+        # writes a tiny file, so an export manifest sees the output exists on the next run
+        exportPath = args[list(args).index("-f") + 1]
+        os.makedirs(os.path.dirname(os.path.abspath(exportPath)), exist_ok = True)
+        with open(exportPath, "w") as exportFile:
+            exportFile.write("fake fbx\n")
+
+def RecordCalls(stats, prefix, Function):
+    def Recorded(*args, **kwargs):
+        stats.Record(prefix + Function.__name__)
+        return Function(*args, **kwargs)
+
+    Recorded.__name__ = Function.__name__
+    return Recorded
+
+# fbx and other commands that only change settings, they are counted but do nothing
+noOpCommands = [
+    "FBXResetExport", "FBXExportSmoothingGroups", "FBXExportInputConnections", "FBXExportBakeComplexAnimation", "FBXExportBakeComplexStart",
+    "FBXExportBakeComplexEnd", "FBXExportBakeComplexStep", "FBXExportSplitAnimationIntoTakes", "FBXExportDeleteOriginalTakeOnSplitAnimation",
+    "bakeResults", "loadPlugin", "file", "setKeyframe", "currentTime", "evaluationManager",
+]
+
+def CreateCommandsModule(scene):
+    cmdsModule = types.ModuleType("maya.cmds")
+    commands = FakeCommands(scene)
+    for name in dir(commands):
+        if callable(getattr(commands, name)) and (name[0].islower() or name.startswith("FBX")):
+            setattr(cmdsModule, name, RecordCalls(scene.stats, "cmds.", getattr(commands, name)))
+
+    for name in noOpCommands:
+        if not hasattr(cmdsModule, name):
+            NoOp = lambda *args, **kwargs : None
+            NoOp.__name__ = name
+            setattr(cmdsModule, name, RecordCalls(scene.stats, "cmds.", NoOp))
+
+    def GetUnmodeledCommand(name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def UnmodeledCommand(*args, **kwargs):
+            scene.stats.Record("cmds." + name)
+            scene.stats.unmodeled["cmds." + name] += 1
+
+        return UnmodeledCommand
+
+    cmdsModule.__getattr__ = GetUnmodeledCommand
+    return cmdsModule
+
+def CreateMelModule(scene):
+    melModule = types.ModuleType("maya.mel")
+
+    def eval(command):
+        scene.stats.Record("mel.eval")
+        scene.stats.unmodeled["mel.eval"] += 1
+
+    melModule.eval = eval
+    return melModule
+
+# maya.api.OpenMaya
+
+class MPoint:
+    def __init__(self, x = 0.0, y = 0.0, z = 0.0, w = 1.0):
+        self.x, self.y, self.z, self.w = x, y, z, w
+
+class MIntArray(list):
+    pass
+
+class MDoubleArray(list):
+    pass
+
+class MObject:
+    kNullObj = None
+
+    def __init__(self, node = None, vertCount = 0):
+        self.node = node
+        self.vertCount = vertCount
+
+    def hasFn(self, fn):
+        if self.node is None:
+            return False
+
+        return self.node.type in {MFn.kDagNode : dagTypes, MFn.kShape : shapeTypes}.get(fn, ())
+
+    def isNull(self):
+        return self.node is None
+
+class MFn:
+    kDagNode = 107
+    kShape = 248
+    kMeshVertComponent = 550
+
+MObject.kNullObj = MObject()
+
+def CreateApiModule(scene):
+    om = types.ModuleType("maya.api.OpenMaya")
+    stats = scene.stats
+
+    def Recorded(cls):
+        for name, value in list(vars(cls).items()):
+            if callable(value) and not name.startswith("_"):
+                setattr(cls, name, RecordCalls(stats, f"om.{cls.__name__}.", value))
+
+        return cls
+
+    class MDagPath:
+        def __init__(self, node = None):
+            self.nodeRef = node
+
+        def partialPathName(self):
+            return self.nodeRef.name
+
+        def fullPathName(self):
+            return scene.GetPath(self.nodeRef)
+
+        def node(self):
+            return MObject(self.nodeRef)
+
+        def inclusiveMatrix(self):
+            stats.Record("om.MDagPath.inclusiveMatrix")
+            return [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0] + list(scene.GetWorldPosition(self.nodeRef)) + [1.0]
+
+    @Recorded
+    class MSelectionList:
+        def __init__(self):
+            self.items = []
+
+        def add(self, name, mergeWithExisting = True):
+            node = scene.Find(name)
+            if node is None:
+                raise RuntimeError(f"(kInvalidParameter): Object does not exist: {name}")
+
+            if not mergeWithExisting or node not in self.items: # like maya, a node that is already in the list is not added again
+                self.items.append(node)
+
+            return self
+
+        def remove(self, index):
+            del self.items[index]
+            return self
+
+        def length(self):
+            return len(self.items)
+
+        def getDependNode(self, index):
+            return MObject(self.items[index])
+
+        def getDagPath(self, index):
+            return MDagPath(self.items[index])
+
+    @Recorded
+    class MFnSingleIndexedComponent:
+        def __init__(self, component = None):
+            self.component = component
+
+        def create(self, componentType):
+            self.component = MObject()
+            return self.component
+
+        def setCompleteData(self, count):
+            self.component.vertCount = count
+
+    def GetMeshNode(dagPath):
+        node = dagPath.nodeRef
+        return next(child for child in node.children if child.type == "mesh") if node.type == "transform" else node
+
+    @Recorded
+    class MFnMesh:
+        def __init__(self, dagPath = None):
+            self.meshNode = GetMeshNode(dagPath) if dagPath else None
+
+        @property
+        def numVertices(self):
+            stats.Record("om.MFnMesh.numVertices")
+            return len(self.meshNode.data.points)
+
+        def getVertices(self):
+            return MIntArray(self.meshNode.data.faceVertCounts), MIntArray(self.meshNode.data.faceVertIndices)
+
+        def getPoints(self, space = None):
+            return [MPoint(*point) for point in self.meshNode.data.points]
+
+        def getUVSetNames(self):
+            return ["map1"]
+
+        def getUVs(self, uvSet = None):
+            # the grids are planar, every vert gets its x and y as its uv
+            points = self.meshNode.data.points
+            return [point[0] for point in points], [point[1] for point in points]
+
+        def getAssignedUVs(self, uvSet = None):
+            return MIntArray(self.meshNode.data.faceVertCounts), MIntArray(self.meshNode.data.faceVertIndices)
+
+        def create(self, points, faceVertCounts, faceVertIndices, parent = None):
+            transform = scene.CreateNode("transform", "polySurface1")
+            self.meshNode = scene.CreateNode("mesh", "polySurfaceShape1", transform)
+            self.meshNode.data = MeshData([(point.x, point.y, point.z) for point in points], faceVertCounts, faceVertIndices)
+            return MObject(transform)
+
+    @Recorded
+    class MFnDependencyNode:
+        def __init__(self, mobject = None):
+            self.nodeRef = mobject.node if mobject else None
+
+        @property
+        def typeName(self):
+            return self.nodeRef.type
+
+        def name(self):
+            return self.nodeRef.name
+
+    @Recorded
+    class MFnDagNode:
+        def __init__(self, target = None):
+            # takes an MObject or an MDagPath like the real one
+            self.nodeRef = target.nodeRef if isinstance(target, MDagPath) else (target.node if target else None)
+
+        @property
+        def typeName(self):
+            return self.nodeRef.type
+
+        @property
+        def isIntermediateObject(self):
+            return bool(self.nodeRef.attrs.get("intermediateObject"))
+
+        def childCount(self):
+            return len(self.nodeRef.children)
+
+        def child(self, index):
+            return MObject(self.nodeRef.children[index])
+
+        def partialPathName(self):
+            return self.nodeRef.name
+
+        def fullPathName(self):
+            return scene.GetPath(self.nodeRef)
+
+    @Recorded
+    class MFnNurbsCurve:
+        def __init__(self, dagPath = None):
+            self.curveNode = dagPath.nodeRef if dagPath else None
+
+        def setCVPositions(self, points, space = None):
+            self.curveNode.data = [(point.x, point.y, point.z) for point in points]
+
+        def updateCurve(self):
+            return None
+
+    class MMessage:
+        @staticmethod
+        def removeCallbacks(callbackIds):
+            for callbackId in callbackIds:
+                scene.callbacks.pop(callbackId, None)
+
+    def AddCallback(Callback):
+        callbackId = scene.nextCallbackId
+        scene.nextCallbackId += 1
+        scene.callbacks[callbackId] = Callback
+        return callbackId
+
+    class MDGMessage:
+        addConnectionCallback = staticmethod(lambda Callback : AddCallback(Callback))
+        addNodeRemovedCallback = staticmethod(lambda Callback : AddCallback(Callback))
+
+    class MNodeMessage:
+        addNameChangedCallback = staticmethod(lambda mobject, Callback : AddCallback(Callback))
+
+    class MSceneMessage:
+        kAfterNew = 1
+        kAfterOpen = 2
+        addCallback = staticmethod(lambda messageType, Callback : AddCallback(Callback))
+
+    for apiClass in (MPoint, MIntArray, MDoubleArray, MObject, MDagPath, MSelectionList, MFn, MFnSingleIndexedComponent, MFnMesh, MFnDependencyNode, MFnDagNode, MFnNurbsCurve, MMessage, MDGMessage, MNodeMessage, MSceneMessage):
+        setattr(om, apiClass.__name__, apiClass)
+
+    om.MSpace = types.SimpleNamespace(kWorld = 4, kObject = 2, kTransform = 1)
+    return om
+
+def CreateAnimApiModule(scene):
+    oma = types.ModuleType("maya.api.OpenMayaAnim")
+    stats = scene.stats
+
+    class MFnSkinCluster:
+        def __init__(self, mobject):
+            stats.Record("oma.MFnSkinCluster.__init__")
+            self.skinNode = mobject.node
+
+        def influenceObjects(self):
+            stats.Record("oma.MFnSkinCluster.influenceObjects")
+            om = sys.modules["maya.api.OpenMaya"]
+            return [om.MDagPath(scene.Get(influence)) for influence in self.skinNode.data.influences]
+
+        def getWeights(self, dagPath, component):
+            stats.Record("oma.MFnSkinCluster.getWeights")
+            return MDoubleArray(self.skinNode.data.weights), len(self.skinNode.data.influences)
+
+        def setWeights(self, dagPath, component, influenceIndices, weights, normalize = True, returnOldWeights = False):
+            stats.Record("oma.MFnSkinCluster.setWeights")
+            self.skinNode.data.weights = list(weights)
+
+    oma.MFnSkinCluster = MFnSkinCluster
+    return oma
+
+class MVector: # maya.OpenMaya (api 1.0), only the vector LimbRigger does its math with
+    def __init__(self, x = 0.0, y = 0.0, z = 0.0):
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    def __add__(self, other):
+        return MVector(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return MVector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(self, scale):
+        return MVector(self.x * scale, self.y * scale, self.z * scale)
+
+    def __truediv__(self, scale):
+        return MVector(self.x / scale, self.y / scale, self.z / scale)
+
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normalize(self):
+        length = self.length() or 1.0
+        self.x, self.y, self.z = self.x / length, self.y / length, self.z / length
+
+# PySide2, shiboken2 and the maya ui modules, the tools only need their names to exist when no window is opened
+
+class FakeQtMeta(type):
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        return cls
+
+class FakeQtObject(metaclass = FakeQtMeta):
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        # widgets, signals and whatever a call returns are all fake objects, so building a window goes through without qt
+        return FakeQtObject()
+
+    def __call__(self, *args, **kwargs):
+        return FakeQtObject()
+
+    def __int__(self):
+        return 0
+
+    def __iter__(self):
+        return iter(())
+
+class FakeUiModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        fakeClass = FakeQtMeta(name, (FakeQtObject,), {})
+        setattr(self, name, fakeClass)
+        return fakeClass
+
+def CreateUiModules():
+    modules = {}
+    for name in ("PySide2", "PySide2.QtCore", "PySide2.QtGui", "PySide2.QtWidgets", "shiboken2", "maya.OpenMayaUI", "maya.utils", "maya.standalone"):
+        modules[name] = FakeUiModule(name)
+
+    modules["PySide2"].QtCore = modules["PySide2.QtCore"]
+    modules["PySide2"].QtGui = modules["PySide2.QtGui"]
+    modules["PySide2"].QtWidgets = modules["PySide2.QtWidgets"]
+    return modules
+
+fakeScene = None
+
+def Install():
+    # puts the fake modules in sys.modules, once per process, and returns the scene behind them
+    global fakeScene
+    if fakeScene is not None:
+        return fakeScene
+
+    fakeScene = FakeScene()
+    mayaModule = types.ModuleType("maya")
+    apiModule = types.ModuleType("maya.api")
+    openMayaModule = types.ModuleType("maya.OpenMaya")
+    openMayaModule.MVector = MVector
+
+    modules = CreateUiModules()
+    modules.update({
+        "maya" : mayaModule,
+        "maya.cmds" : CreateCommandsModule(fakeScene),
+        "maya.mel" : CreateMelModule(fakeScene),
+        "maya.api" : apiModule,
+        "maya.api.OpenMaya" : CreateApiModule(fakeScene),
+        "maya.api.OpenMayaAnim" : CreateAnimApiModule(fakeScene),
+        "maya.OpenMaya" : openMayaModule,
+    })
+    mayaModule.cmds = modules["maya.cmds"]
+    mayaModule.mel = modules["maya.mel"]
+    mayaModule.api = apiModule
+    mayaModule.OpenMaya = openMayaModule
+    mayaModule.OpenMayaUI = modules["maya.OpenMayaUI"]
+    mayaModule.utils = modules["maya.utils"]
+    mayaModule.standalone = modules["maya.standalone"]
+    apiModule.OpenMaya = modules["maya.api.OpenMaya"]
+    apiModule.OpenMayaAnim = modules["maya.api.OpenMayaAnim"]
+    sys.modules.update(modules)
+    return fakeScene
+
+def BuildJointChain(scene, names, positions, parent = None):
+    joints = []
+    for name, position in zip(names, positions):
+        joint = scene.CreateNode("joint", name, parent)
+        parentPosition = scene.GetWorldPosition(parent) if parent else (0.0, 0.0, 0.0)
+        joint.attrs["t"] = tuple(value - parentValue for value, parentValue in zip(position, parentPosition))
+        joints.append(joint)
+        parent = joint
+
+    return joints
+
+def BuildGridMesh(scene, name, vertCount, height):
+    # a flat grid of quads standing up along y, about vertCount verts
+    columnCount = 50
+    rowCount = max(2, vertCount // columnCount)
+    points = [(column * 0.5 - columnCount * 0.25, row * height / (rowCount - 1), 0.0) for row in range(rowCount) for column in range(columnCount)]
+    faceVertCounts, faceVertIndices = [], []
+    for row in range(rowCount - 1):
+        for column in range(columnCount - 1):
+            first = row * columnCount + column
+            faceVertCounts.append(4)
+            faceVertIndices.extend([first, first + 1, first + columnCount + 1, first + columnCount])
+
+    transform = scene.CreateNode("transform", name)
+    shape = scene.CreateNode("mesh", name + "Shape", transform)
+    shape.data = MeshData(points, faceVertCounts, faceVertIndices)
+    origShape = scene.CreateNode("mesh", name + "ShapeOrig", transform)
+    origShape.attrs["intermediateObject"] = True
+    origShape.data = MeshData(points, faceVertCounts, faceVertIndices)
+    return transform, shape
+
+def BuildSyntheticScene(scene, chainCount = 4, vertCount = 2000, clipCount = 4, clipLength = 30):
+    # a spine with chainCount three joint limbs hanging off it (left/right pairs), a grid mesh skinned to every joint,
+    # and an anim curve on every limb root covering all the clips
+    scene.Clear()
+    spine = BuildJointChain(scene, ["root", "spine", "chest"], [(0, 0, 0), (0, 10, 0), (0, 20, 0)])
+    limbJoints = []
+    for i in range(chainCount):
+        side = "l" if i % 2 == 0 else "r"
+        sideSign = 1 if side == "l" else -1
+        x, y = sideSign * 5, 20 - (i // 2) * 4
+        names = [f"limb{i // 2}_upper_{side}", f"limb{i // 2}_lower_{side}", f"limb{i // 2}_end_{side}"]
+        limbJoints.append(BuildJointChain(scene, names, [(x, y, 0), (x + sideSign * 10, y, 1), (x + sideSign * 20, y, 0)], spine[-1]))
+
+    joints = spine + [joint for chain in limbJoints for joint in chain]
+    _, shape = BuildGridMesh(scene, "body", vertCount, 30.0)
+    skin = scene.CreateNode("skinCluster", "skinCluster1")
+    jointCount = len(joints)
+    weights = [0.0] * (len(shape.data.points) * jointCount)
+    for vert in range(len(shape.data.points)):
+        owner = vert * jointCount // len(shape.data.points)
+        weights[vert * jointCount + owner] = 0.75
+        weights[vert * jointCount + (owner + 1) % jointCount] = 0.25
+
+    skin.data = SkinData([joint.name for joint in joints], weights)
+    for i, joint in enumerate(joints):
+        scene.connections.append((joint, "worldMatrix[0]", skin, f"matrix[{i}]"))
+        x, y, z = scene.GetWorldPosition(joint)
+        skin.attrs[f"bindPreMatrix[{i}]"] = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, -x, -y, -z, 1.0]
+
+    scene.connections.append((skin, "outputGeometry[0]", shape, "inMesh"))
+
+    for chain in limbJoints:
+        animCurve = scene.CreateNode("animCurveTA", chain[0].name + "_rotateZ")
+        animCurve.data = [(float(frame), math.sin(frame * 0.1) * 30.0) for frame in range(1, clipCount * clipLength + 1, 5)]
+        scene.connections.append((animCurve, "output", chain[0], "rotateZ"))
+
+    scene.playbackRange = [1.0, float(clipCount * clipLength)]
+    scene.NotifyChanged()
+    return {"joints" : [joint.name for joint in joints], "limbs" : [[joint.name for joint in chain] for chain in limbJoints], "mesh" : "body", "meshShape" : shape.name, "skin" : skin.name}
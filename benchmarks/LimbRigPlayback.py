@@ -0,0 +1,99 @@
+# playback speed of LimbRigger rigs with the expression switch and with the node network switch, run it with mayapy:
+#   mayapy benchmarks/LimbRigPlayback.py [--limbs 12] [--frames 200] [--repeat 3] [--report playback.json]
+# every run builds a fresh scene with the given number of animated limbs, rigs them in one mode and steps through the frames
+# with the evaluation manager in parallel mode, the reported fps is the best of the repeats
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sourceDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if sourceDirectory not in sys.path:
+    sys.path.append(sourceDirectory)
+
+def BuildLimbs(limbCount):
+    import maya.cmds as mc
+    limbs = []
+    for i in range(limbCount):
+        mc.select(cl = True)
+        offset = i * 20
+        root = mc.joint(n = f"bench_upper_{i:02d}", p = (offset, 20, 0))
+        mid = mc.joint(n = f"bench_lower_{i:02d}", p = (offset, 10, 2))
+        end = mc.joint(n = f"bench_end_{i:02d}", p = (offset, 0, 0))
+        limbs.append((root, mid, end))
+
+    return limbs
+
+def AnimateLimb(root, mid, end, frames):
+    # switches between ik and fk halfway and moves both sets of controls, so every part of the switch gets evaluated
+    import maya.cmds as mc
+    blendControl = "ac_ikfk_blend_" + mid
+    mc.setKeyframe(blendControl, at = "ikfkBlend", t = 1, v = 0)
+    mc.setKeyframe(blendControl, at = "ikfkBlend", t = frames, v = 1)
+    for control in ("ac_fk_" + root, "ac_fk_" + mid):
+        mc.setKeyframe(control, at = "rotateZ", t = 1, v = 0)
+        mc.setKeyframe(control, at = "rotateZ", t = frames, v = 45)
+
+    mc.setKeyframe("ac_ik_" + end, at = "translateY", t = 1, v = 0)
+    mc.setKeyframe("ac_ik_" + end, at = "translateY", t = frames, v = 8)
+
+def MeasurePlayback(useNodeNetwork, limbCount, frames):
+    import maya.cmds as mc
+    from LimbRiggingTool import LimbRigger
+
+    mc.file(new = True, f = True)
+    rigger = LimbRigger()
+    rigger.useNodeNetwork = useNodeNetwork
+    for root, mid, end in BuildLimbs(limbCount):
+        rigger.root, rigger.mid, rigger.end = root, mid, end
+        rigger.RigLimb(1, 1, 0)
+        AnimateLimb(root, mid, end, frames)
+
+    mc.playbackOptions(min = 1, max = frames)
+    mc.evaluationManager(mode = "parallel")
+    mc.currentTime(1) # lets the evaluation manager build its graph before the clock starts
+
+    startTime = time.perf_counter()
+    for frame in range(1, frames + 1):
+        mc.currentTime(frame)
+
+    seconds = time.perf_counter() - startTime
+    return {
+        "mode" : "nodeNetwork" if useNodeNetwork else "expression",
+        "expressionNodes" : len(mc.ls(type = "expression")),
+        "evaluationMode" : mc.evaluationManager(q = True, mode = True)[0],
+        "seconds" : round(seconds, 4),
+        "fps" : round(frames / seconds, 1),
+    }
+
+def Main():
+    parser = argparse.ArgumentParser(description = "compares playback speed of LimbRigger expression and node network rigs")
+    parser.add_argument("--limbs", type = int, default = 12, help = "how many limbs to rig")
+    parser.add_argument("--frames", type = int, default = 200, help = "how many frames to step through")
+    parser.add_argument("--repeat", type = int, default = 3, help = "runs per mode, the fastest one is kept")
+    parser.add_argument("--report", help = "also write the results to this json file")
+    arguments = parser.parse_args()
+
+    import maya.standalone
+    maya.standalone.initialize(name = "python")
+    results = []
+    try:
+        for useNodeNetwork in (False, True):
+            runs = [MeasurePlayback(useNodeNetwork, arguments.limbs, arguments.frames) for _ in range(arguments.repeat)]
+            best = max(runs, key = lambda run : run["fps"])
+            results.append(best)
+            print(f"{best['mode']:<12} {arguments.limbs} limbs, {best['expressionNodes']} expressions, {best['evaluationMode']} evaluation: {best['fps']} fps")
+    finally:
+        maya.standalone.uninitialize()
+
+    if len(results) == 2:
+        print(f"node network plays back {results[1]['fps'] / results[0]['fps']:.2f}x as fast as expressions")
+
+    if arguments.report:
+        with open(arguments.report, "w") as reportFile:
+            json.dump({"limbs" : arguments.limbs, "frames" : arguments.frames, "results" : results}, reportFile, indent = 4)
+
+if __name__ == "__main__":
+    Main()
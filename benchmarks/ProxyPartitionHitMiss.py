@@ -0,0 +1,112 @@
+# what the proxy partition cache saves, runs anywhere python and numpy do:
+#   python benchmarks/ProxyPartitionHitMiss.py [--verts 100000] [--influences 80] [--repeat 3] [--report partition.json]
+# builds a grid mesh skinned in bands to the given number of influences, then times the work GenerateProxySegments does after the
+# weights are read, once with an empty cache and once with the entry the first run saved. exits with 1 if a hit is not faster than a miss
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sourceDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if sourceDirectory not in sys.path:
+    sys.path.append(sourceDirectory)
+
+import numpy as np
+from ProxyPartitionCache import ProxyPartitionCache
+from ProxyRigUtilities import BuildSegments, GetDominantInfluences, GetFaceOwners
+
+def BuildSkinnedGrid(vertCount, influenceCount):
+    # a grid of quads, every influence mostly drives a band of rows with a little noise from the rest
+    columns = int(np.sqrt(vertCount))
+    rows = max(2, vertCount // columns)
+    gridVerts = np.arange(rows * columns, dtype = np.int32).reshape(rows, columns)
+    corners = np.stack((gridVerts[:-1, :-1], gridVerts[:-1, 1:], gridVerts[1:, 1:], gridVerts[1:, :-1]), axis = -1)
+    faceVertIndices = corners.reshape(-1).astype(np.int32)
+    faceVertCounts = np.full(len(faceVertIndices) // 4, 4, dtype = np.int32)
+
+    random = np.random.default_rng(7)
+    weights = random.random((rows * columns, influenceCount)) * 0.1
+    bands = np.repeat(np.arange(rows) * influenceCount // rows, columns)
+    weights[np.arange(len(bands)), bands] += 1.0
+    weights /= weights.sum(axis = 1, keepdims = True)
+    influences = [f"joint_{i:03d}" for i in range(influenceCount)]
+    return faceVertCounts, faceVertIndices, weights, influences
+
+def GenerateSegments(cache, faceVertCounts, faceVertIndices, weights, influences):
+    # the same steps as ProxyRigger.GenerateProxySegments, without maya
+    vertOwners = GetDominantInfluences(weights)
+    cacheKey = cache.GetKey(faceVertCounts, faceVertIndices, influences, vertOwners)
+    cachedPartition = cache.Load(cacheKey, influences)
+    if cachedPartition is not None:
+        return cachedPartition
+
+    faceOwners = GetFaceOwners(faceVertCounts, faceVertIndices, vertOwners, len(influences))
+    segments = BuildSegments(faceOwners, faceVertCounts, faceVertIndices, influences)
+    cache.Save(cacheKey, faceOwners, segments, influences)
+    return faceOwners, segments
+
+def Measure(vertCount, influenceCount, repeat):
+    faceVertCounts, faceVertIndices, weights, influences = BuildSkinnedGrid(vertCount, influenceCount)
+    missSeconds = []
+    hitSeconds = []
+    for _ in range(repeat):
+        cacheDirectory = tempfile.mkdtemp(prefix = "ProxyPartitionHitMiss")
+        try:
+            cache = ProxyPartitionCache(cacheDirectory)
+            startTime = time.perf_counter()
+            missOwners, missSegments = GenerateSegments(cache, faceVertCounts, faceVertIndices, weights, influences)
+            missSeconds.append(time.perf_counter() - startTime)
+
+            startTime = time.perf_counter()
+            hitOwners, hitSegments = GenerateSegments(cache, faceVertCounts, faceVertIndices, weights, influences)
+            hitSeconds.append(time.perf_counter() - startTime)
+        finally:
+            shutil.rmtree(cacheDirectory, ignore_errors = True)
+
+        if cache.hits != 1 or cache.misses != 1:
+            raise Exception(f"expected one miss and then one hit, got {cache.misses} miss(es) and {cache.hits} hit(s)")
+
+        # a hit has to give back exactly what the miss built
+        sameSegments = len(missSegments) == len(hitSegments) and all(
+            missSegment.joint == hitSegment.joint and all(np.array_equal(getattr(missSegment, name), getattr(hitSegment, name)) for name in ("faces", "polygonCounts", "polygonConnects", "sourceVerts"))
+            for missSegment, hitSegment in zip(missSegments, hitSegments)
+        )
+        if not np.array_equal(missOwners, hitOwners) or not sameSegments:
+            raise Exception("the cache hit does not match what the miss built")
+
+    return {
+        "verts" : len(weights),
+        "faces" : len(faceVertCounts),
+        "influences" : influenceCount,
+        "segments" : len(missSegments),
+        "missSeconds" : round(min(missSeconds), 4),
+        "hitSeconds" : round(min(hitSeconds), 4),
+        "speedup" : round(min(missSeconds) / min(hitSeconds), 2),
+    }
+
+def Main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--verts", type = int, default = 100000)
+    parser.add_argument("--influences", type = int, default = 80)
+    parser.add_argument("--repeat", type = int, default = 3)
+    parser.add_argument("--report", default = "")
+    args = parser.parse_args()
+
+    result = Measure(args.verts, args.influences, args.repeat)
+    print(f"{result['verts']} verts, {result['faces']} faces, {result['influences']} influences, {result['segments']} segments: miss {result['missSeconds'] * 1000:.1f}ms, hit {result['hitSeconds'] * 1000:.1f}ms, {result['speedup']}x")
+    if args.report:
+        with open(args.report, "w") as reportFile:
+            json.dump(result, reportFile, indent = 4)
+
+    if result["hitSeconds"] >= result["missSeconds"]:
+        print("a cache hit is not faster than a miss")
+        return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(Main())
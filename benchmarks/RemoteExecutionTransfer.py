@@ -0,0 +1,203 @@
+# loopback benchmark for the remote execution command connection, no unreal needed
+#   python benchmarks/RemoteExecutionTransfer.py [--sizes 1,8,32] [--repeat 3] [--report transfer.json]
+# a fake node stands in for the editor, every payload size is sent up as a command and brought back as a command result,
+# over the plain protocol, length-prefixed frames, and frames with zlib compression
+# then a command result full of log entries is read by the async client in chunks that each end right after a "}", the worst case for the plain protocol
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+
+vendorDirectory = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "vendor", "unrealSDK")
+if vendorDirectory not in sys.path:
+    sys.path.append(vendorDirectory)
+
+import remote_execution
+from remote_execution_async import AsyncRemoteExecution, RemoteExecutionLoopThread, read_json_messages
+from remote_execution_fake_node import FakeUnrealNode
+
+modes = {
+    "plain" : [],
+    "framed" : [remote_execution.CAPABILITY_FRAMED],
+    "framed+zlib" : [remote_execution.CAPABILITY_FRAMED, remote_execution.CAPABILITY_ZLIB],
+}
+
+class LoopbackBroadcast: # stands in for the multicast connection, sends the connection messages straight to the fake node
+    def __init__(self, config, nodeId, nodeEndpoint):
+        self.config = config
+        self.nodeId = nodeId
+        self.nodeEndpoint = nodeEndpoint
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def broadcast_open_connection(self, remoteNodeId, capabilities = None):
+        data = {"command_ip" : self.config.command_endpoint[0], "command_port" : self.config.command_endpoint[1]}
+        if capabilities:
+            data["capabilities"] = capabilities
+
+        self.socket.sendto(remote_execution._RemoteExecutionMessage(remote_execution._TYPE_OPEN_CONNECTION, self.nodeId, remoteNodeId, data).to_json_bytes(), self.nodeEndpoint)
+
+    def broadcast_close_connection(self, remoteNodeId):
+        self.socket.sendto(remote_execution._RemoteExecutionMessage(remote_execution._TYPE_CLOSE_CONNECTION, self.nodeId, remoteNodeId).to_json_bytes(), self.nodeEndpoint)
+
+def GetFreePort():
+    with socket.socket() as freeSocket:
+        freeSocket.bind(("127.0.0.1", 0))
+        return freeSocket.getsockname()[1]
+
+def GetPayloadCommands(megabytes):
+    # an asset list like the importer sends back, json text compresses about as well as the real thing
+    # both directions carry it as one string, so the fake node spends next to no time running the commands themselves
+    assetCount = megabytes * 1024 * 1024 // 64
+    assetList = json.dumps([f"/Game/Characters/Hero/Animations/Hero_Clip_{i:08d}.Hero_Clip_{i:08d}" for i in range(assetCount)])
+    uploadCommand = "_assets = " + repr(assetList)
+    downloadCommand = "_assets"
+    return uploadCommand, downloadCommand
+
+def TimeBest(repeat, Action):
+    best = None
+    for _ in range(repeat):
+        startTime = time.perf_counter()
+        Action()
+        seconds = time.perf_counter() - startTime
+        best = seconds if best is None else min(best, seconds)
+
+    return best
+
+def RunBlockingClient(node, capabilities, uploadCommand, downloadCommand, repeat):
+    config = remote_execution.RemoteExecutionConfig()
+    config.command_endpoint = ("127.0.0.1", GetFreePort())
+    nodeId = "benchmark-blocking"
+    broadcast = LoopbackBroadcast(config, nodeId, node.discovery_endpoint)
+    connection = remote_execution._RemoteExecutionCommandConnection(config, nodeId, node.node_id, capabilities)
+    connection.open(broadcast)
+    try:
+        def Download():
+            result = connection.run_command(downloadCommand, True, remote_execution.MODE_EVAL_STATEMENT)
+            if not result["success"]:
+                raise RuntimeError(result["result"])
+
+        def Upload():
+            result = connection.run_command(uploadCommand, True, remote_execution.MODE_EXEC_FILE)
+            if not result["success"]:
+                raise RuntimeError(result["result"])
+
+        return TimeBest(repeat, Upload), TimeBest(repeat, Download)
+    finally:
+        connection.close(broadcast)
+
+def RunAsyncClient(loopThread, node, capabilities, uploadCommand, downloadCommand, repeat):
+    node.capabilities = capabilities # the async client negotiates from the pong, so the node offers exactly this mode
+    config = remote_execution.RemoteExecutionConfig()
+    config.multicast_group_endpoint = node.discovery_endpoint
+    session = AsyncRemoteExecution(config)
+    loopThread.run(session.start())
+    try:
+        loopThread.run(session.wait_for_remote_nodes(5.0))
+        connection = loopThread.run(session.open_command_connection(node.node_id))
+        Upload = lambda : loopThread.run(connection.run_command(uploadCommand, exec_mode = remote_execution.MODE_EXEC_FILE, raise_on_failure = True))
+        Download = lambda : loopThread.run(connection.run_command(downloadCommand, exec_mode = remote_execution.MODE_EVAL_STATEMENT, raise_on_failure = True))
+        return TimeBest(repeat, Upload), TimeBest(repeat, Download)
+    finally:
+        loopThread.run(session.stop())
+        node.capabilities = list(remote_execution.SUPPORTED_CAPABILITIES)
+
+def GetChunkedResultMessage(megabytes):
+    # a command whose printed lines come back as one output entry each, so the result is mostly small json objects
+    lineCount = megabytes * 1024 * 1024 // 64
+    output = [{"type" : "Info", "output" : f"imported /Game/Characters/Hero/Hero_Clip_{i:08d}"} for i in range(lineCount)]
+    result = {"success" : True, "command" : "", "result" : "None", "output" : output}
+    return remote_execution._RemoteExecutionMessage(remote_execution._TYPE_COMMAND_RESULT, "benchmark-node", "benchmark-async", result).to_json_bytes()
+
+def SplitAfterBraces(messageBytes, chunkSize):
+    chunks = []
+    position = 0
+    while position < len(messageBytes):
+        end = messageBytes.find(b"}", position + chunkSize)
+        end = len(messageBytes) if end < 0 else end + 1
+        chunks.append(messageBytes[position:end])
+        position = end
+
+    return chunks
+
+def RunChunkedAsyncRead(loopThread, megabytes, repeat, chunkSize = 64 * 1024):
+    # the async client reading one plain protocol message that arrives in many reads, each ending in "}"
+    chunks = SplitAfterBraces(GetChunkedResultMessage(megabytes), chunkSize)
+
+    async def WriteChunks(reader, writer):
+        for chunk in chunks:
+            writer.write(chunk)
+            await writer.drain()
+            await asyncio.sleep(0) # lets the reader take each chunk as its own read
+
+        writer.close()
+
+    async def ReadOnce():
+        server = await asyncio.start_server(WriteChunks, "127.0.0.1", 0)
+        try:
+            reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname())
+            async for jsonObject in read_json_messages(reader, []):
+                if len(jsonObject["data"]["output"]) == 0:
+                    raise RuntimeError("the chunked message came back empty")
+                break
+            writer.close()
+        finally:
+            server.close()
+
+    return len(chunks), sum(len(chunk) for chunk in chunks), TimeBest(repeat, lambda : loopThread.run(ReadOnce()))
+
+def Main():
+    parser = argparse.ArgumentParser(description = "loopback transfer benchmark for remote_execution")
+    parser.add_argument("--sizes", default = "1,8,32", help = "comma separated payload sizes in MB")
+    parser.add_argument("--repeat", type = int, default = 3, help = "runs per measurement, the best one is kept")
+    parser.add_argument("--chunked", type = int, default = 16, help = "size in MB of the chunked plain protocol message read by the async client, 0 skips it")
+    parser.add_argument("--report", help = "also write the results to this json file")
+    arguments = parser.parse_args()
+
+    loopThread = RemoteExecutionLoopThread()
+    node = FakeUnrealNode()
+    loopThread.run(node.start())
+    results = []
+    try:
+        for megabytes in [int(size) for size in arguments.sizes.split(",")]:
+            uploadCommand, downloadCommand = GetPayloadCommands(megabytes)
+            for modeName, capabilities in modes.items():
+                for clientName, RunClient in (("blocking", lambda *args : RunBlockingClient(node, *args)), ("async", lambda *args : RunAsyncClient(loopThread, node, *args))):
+                    uploadSeconds, downloadSeconds = RunClient(capabilities, uploadCommand, downloadCommand, arguments.repeat)
+                    result = {
+                        "megabytes" : megabytes,
+                        "mode" : modeName,
+                        "client" : clientName,
+                        "uploadSeconds" : round(uploadSeconds, 4),
+                        "downloadSeconds" : round(downloadSeconds, 4),
+                        "uploadMBps" : round(len(uploadCommand) / (1024 * 1024) / uploadSeconds, 1),
+                        "downloadMBps" : round(len(uploadCommand) / (1024 * 1024) / downloadSeconds, 1),
+                    }
+                    results.append(result)
+                    print(f"{megabytes:>4} MB {modeName:<12} {clientName:<9} up {uploadSeconds:7.3f}s ({result['uploadMBps']:7.1f} MB/s)  down {downloadSeconds:7.3f}s ({result['downloadMBps']:7.1f} MB/s)")
+
+        if arguments.chunked:
+            chunkCount, messageSize, readSeconds = RunChunkedAsyncRead(loopThread, arguments.chunked, arguments.repeat)
+            result = {
+                "megabytes" : arguments.chunked,
+                "mode" : "plain chunked",
+                "client" : "async",
+                "chunks" : chunkCount,
+                "downloadSeconds" : round(readSeconds, 4),
+                "downloadMBps" : round(messageSize / (1024 * 1024) / readSeconds, 1),
+            }
+            results.append(result)
+            print(f"{arguments.chunked:>4} MB {'plain chunked':<12} {'async':<9} {chunkCount} reads ending in }}, down {readSeconds:7.3f}s ({result['downloadMBps']:7.1f} MB/s)")
+    finally:
+        loopThread.run(node.stop())
+        loopThread.stop()
+
+    if arguments.report:
+        with open(arguments.report, "w") as reportFile:
+            json.dump({"results" : results}, reportFile, indent = 4)
+
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,373 @@
+# counts the scene commands and measures the wall time of the tools' hot paths against FakeMaya, runs anywhere python and numpy do:
+#   python benchmarks/ToolBenchmarks.py [--sizes small,medium,large] [--cases ProxyRigger] [--repeat 3] [--report tools.json] [--budgets budgets.json]
+# every case is run at every size on a freshly built synthetic scene, the report has the calls per command, the best wall time,
+# and how calls and time grow with the size of the scene. anything over the budgets file is listed and the run exits with 1
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+benchmarkDirectory = os.path.dirname(os.path.abspath(__file__))
+pluginDirectory = os.path.dirname(benchmarkDirectory)
+for directory in (benchmarkDirectory, os.path.join(pluginDirectory, "src"), os.path.join(pluginDirectory, "vendor", "unrealSDK")):
+    if directory not in sys.path:
+        sys.path.append(directory)
+
+import FakeMaya
+
+sizes = {
+    "small" : {"chainCount" : 2, "vertCount" : 1000, "clipCount" : 2},
+    "medium" : {"chainCount" : 4, "vertCount" : 10000, "clipCount" : 4},
+    "large" : {"chainCount" : 8, "vertCount" : 40000, "clipCount" : 8},
+}
+defaultBudgetsPath = os.path.join(benchmarkDirectory, "ToolBudgets.json")
+
+def ImportPluginPackage():
+    # MayaToUE imports the plugin package for its paths and the startup cases go through its RunTool, load the real one under its installed name
+    if "MayaPlugIns_Spring2025" in sys.modules:
+        return
+
+    spec = importlib.util.spec_from_file_location("MayaPlugIns_Spring2025", os.path.join(pluginDirectory, "__init__.py"), submodule_search_locations = [pluginDirectory])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules["MayaPlugIns_Spring2025"] = package
+    spec.loader.exec_module(package)
+
+# every case takes the scene and what BuildSyntheticScene made, does its setup and returns the call to measure,
+# or the call and a function that returns more to put in the report
+
+def SetupRigLimb(scene, sceneInfo):
+    from ControllerShapes import GetControllerShapeLibrary
+    from LimbRiggingTool import LimbRigger
+
+    def Run():
+        rigger = LimbRigger()
+        for root, mid, end in sceneInfo["limbs"]:
+            rigger.root, rigger.mid, rigger.end = root, mid, end
+            rigger.RigLimb(1, 1, 0)
+
+        GetControllerShapeLibrary().ClearTemplates()
+
+    return Run
+
+def SetupRigAllLimbs(scene, sceneInfo):
+    from LimbRiggingTool import LimbRigger
+
+    def Run():
+        rigger = LimbRigger()
+        rigger.FindAllLimbChains()
+        rigger.RigAllLimbs()
+
+    return Run
+
+def SetupCreateProxyRig(scene, sceneInfo):
+    from ProxyRigger import ProxyRigger
+    scene.selection = [sceneInfo["mesh"]]
+    return lambda : ProxyRigger().CreateProxyRigFromSelectedMesh()
+
+def SetupGenerateJointVertDict(scene, sceneInfo):
+    from ProxyRigger import ProxyRigger
+    scene.selection = [sceneInfo["mesh"]]
+    proxyRigger = ProxyRigger()
+    proxyRigger.FindSkinAndJointsOfSelectedMesh()
+    return proxyRigger.GenerateJointVertDict
+
+def CreateExporter(scene, sceneInfo, clipCount):
+    from MayaToUEExport import MayaToUE
+    exporter = MayaToUE()
+    exporter.rootJoint = sceneInfo["joints"][0]
+    exporter.meshes = [sceneInfo["mesh"]]
+    exporter.fileName = "Benchmark"
+    exporter.saveDirectory = os.path.join(scene.tempDirectory, "export")
+    exporter.sendToUnreal = False
+    clipLength = (scene.playbackRange[1] - scene.playbackRange[0] + 1) / clipCount
+    for i in range(clipCount):
+        animClip = exporter.AddNewAnimEntry()
+        animClip.subfix = f"_clip{i}"
+        animClip.frameMin = scene.playbackRange[0] + i * clipLength
+        animClip.frameMax = animClip.frameMin + clipLength - 1
+
+    return exporter
+
+def SetupSaveFiles(scene, sceneInfo):
+    return CreateExporter(scene, sceneInfo, sceneInfo["clipCount"]).SaveFiles
+
+def SetupSaveFilesSharedBake(scene, sceneInfo):
+    exporter = CreateExporter(scene, sceneInfo, sceneInfo["clipCount"])
+    exporter.bakeClipsOnce = True
+    return exporter.SaveFiles
+
+def SetupAddMeshs(scene, sceneInfo):
+    # a big mixed selection, every joint plus the mesh, only the mesh should be kept
+    from MayaToUEExport import MayaToUE
+    scene.selection = sceneInfo["joints"] + [sceneInfo["mesh"]]
+    return MayaToUE().AddMeshs
+
+def SetupSaveFilesUnchanged(scene, sceneInfo):
+    # the second export of a scene nothing changed in, everything should be skipped by the manifest
+    exporter = CreateExporter(scene, sceneInfo, sceneInfo["clipCount"])
+    exporter.SaveFiles()
+    return exporter.SaveFiles
+
+def BuildSceneGraph(scene):
+    # a SceneGraph copy of the fake scene, parents first, what the maya backend reads should match what it answers
+    from SceneQuery import SceneGraph
+    sceneGraph = SceneGraph()
+    for node in sorted(scene.nodes.values(), key = lambda node : scene.GetPath(node).count("|")):
+        sceneGraph.AddNode(node.name, node.type, node.parent.name if node.parent else None, node.attrs.get("t", (0.0, 0.0, 0.0)), node.attrs.get("intermediateObject", False))
+
+    return sceneGraph
+
+def SetupQueryNodes(scene, sceneInfo):
+    # every joint, the mesh under its name and its full path (the same node twice), the skin and a node that does not exist
+    from MayaUtilities import ClassifyNodes, QueryNodes
+    nodes = sceneInfo["joints"] + [sceneInfo["mesh"], scene.GetPath(scene.Get(sceneInfo["mesh"])), sceneInfo["skin"], "missingNode"]
+    sceneGraph = BuildSceneGraph(scene)
+
+    def Run():
+        nodeInfos = QueryNodes(nodes)
+        expectedInfos = QueryNodes(nodes, sceneGraph)
+        if list(nodeInfos) != list(expectedInfos):
+            raise Exception(f"the maya backend found {list(nodeInfos)}, the scene graph {list(expectedInfos)}")
+
+        for node, nodeInfo in nodeInfos.items():
+            expectedInfo = expectedInfos[node]
+            if nodeInfo.GetClassification() != expectedInfo.GetClassification() or (nodeInfo.worldMatrix is not None and nodeInfo.GetWorldPosition() != expectedInfo.GetWorldPosition()):
+                raise Exception(f"the maya backend read {node} as a {nodeInfo.GetClassification()} at {nodeInfo.GetWorldPosition()}, the scene graph has a {expectedInfo.GetClassification()} at {expectedInfo.GetWorldPosition()}")
+
+        if ClassifyNodes(nodes) != ClassifyNodes(nodes, sceneGraph):
+            raise Exception("the maya backend and the scene graph classify the nodes differently")
+
+    return Run
+
+def SetupConnectionIndexCache(scene, sceneInfo):
+    # an in memory graph as big as the mesh, in 10 levels like a long deformer stack, every node fed by 2 nodes of the next level
+    # the run walks it once cold and then asks the cache for the same walk again, the report has both times
+    from ConnectionGraph import ConnectionGraph, ConnectionIndexCache, Upstream
+    levelCount = 10
+    levelWidth = max(1, len(scene.Get(sceneInfo["meshShape"]).data.points) // levelCount)
+    graph = ConnectionGraph()
+    graph.AddNode("root", "mesh")
+    for level in range(levelCount):
+        for i in range(levelWidth):
+            graph.AddNode(f"node_{level}_{i}", "joint" if level == levelCount - 1 else "transform")
+
+    for i in range(levelWidth):
+        graph.AddConnection(f"node_0_{i}", "root")
+
+    for level in range(levelCount - 1):
+        for i in range(levelWidth):
+            graph.AddConnection(f"node_{level + 1}_{i}", f"node_{level}_{i}")
+            graph.AddConnection(f"node_{level + 1}_{(i + 1) % levelWidth}", f"node_{level}_{i}")
+
+    walkTimes = {}
+    cache = ConnectionIndexCache(graph)
+
+    def Run():
+        cache.Invalidate()
+        for walk in ("missSeconds", "hitSeconds"):
+            startTime = time.perf_counter()
+            joints = cache.GetIndex("root", Upstream, levelCount).OfType("joint")
+            walkTimes[walk] = round(time.perf_counter() - startTime, 6)
+            if len(joints) != levelWidth:
+                raise Exception(f"the walk found {len(joints)} joints, the graph has {levelWidth}")
+
+    def GetDetails():
+        return dict(walkTimes, nodes = len(graph.nodeTypes), hits = cache.hits, misses = cache.misses)
+
+    return Run, GetDetails
+
+def GetPluginModuleNames():
+    pluginDirectories = (os.path.join(pluginDirectory, "src"), os.path.join(pluginDirectory, "vendor", "unrealSDK"))
+    return [name for name, module in sys.modules.items() if os.path.dirname(getattr(module, "__file__", None) or "") in pluginDirectories]
+
+def SetupStartup(toolName):
+    # a first click on the shelf button, with none of the plugin modules loaded yet
+    def Setup(scene, sceneInfo):
+        for moduleName in GetPluginModuleNames():
+            del sys.modules[moduleName]
+
+        loadedModules = []
+
+        def Run():
+            loadedBefore = set(sys.modules)
+            sys.modules["MayaPlugIns_Spring2025"].RunTool(toolName)
+            loadedModules.extend(sorted(set(sys.modules) - loadedBefore))
+
+        def GetDetails():
+            return {"startup" : sys.modules["MayaPlugIns_Spring2025"].GetStartupReport()[toolName], "modules" : loadedModules}
+
+        return Run, GetDetails
+
+    return Setup
+
+def SetupHeadlessImport(moduleName):
+    # what a batch worker loads for its task, with none of the plugin modules loaded yet
+    def Setup(scene, sceneInfo):
+        for pluginModuleName in GetPluginModuleNames():
+            del sys.modules[pluginModuleName]
+
+        loadedModules = []
+
+        def Run():
+            loadedBefore = set(sys.modules)
+            importlib.import_module(moduleName)
+            loadedModules.extend(sorted(set(sys.modules) - loadedBefore))
+
+        return Run, lambda : {"modules" : loadedModules}
+
+    return Setup
+
+cases = {
+    # name : (setup, the size setting the case scales with)
+    "LimbRigger.RigLimb" : (SetupRigLimb, "chainCount"),
+    "LimbRigger.RigAllLimbs" : (SetupRigAllLimbs, "chainCount"),
+    "ProxyRigger.CreateProxyRigFromSelectedMesh" : (SetupCreateProxyRig, "vertCount"),
+    "ProxyRigger.GenerateJointVertDict" : (SetupGenerateJointVertDict, "vertCount"),
+    "ConnectionGraph.ConnectionIndexCache" : (SetupConnectionIndexCache, "vertCount"),
+    "SceneQuery.QueryNodes" : (SetupQueryNodes, "chainCount"),
+    "MayaToUE.AddMeshs" : (SetupAddMeshs, "chainCount"),
+    "MayaToUE.SaveFiles" : (SetupSaveFiles, "vertCount"),
+    "MayaToUE.SaveFiles.Unchanged" : (SetupSaveFilesUnchanged, "vertCount"),
+    "MayaToUE.SaveFiles.SharedBake" : (SetupSaveFilesSharedBake, "vertCount"),
+    "Startup.LimbRiggingTool" : (SetupStartup("LimbRiggingTool"), "chainCount"),
+    "Startup.MayaToUE" : (SetupStartup("MayaToUE"), "chainCount"),
+    "Startup.ProxyRigger" : (SetupStartup("ProxyRigger"), "chainCount"),
+    "Headless.MayaToUEExport" : (SetupHeadlessImport("MayaToUEExport"), "chainCount"),
+}
+
+def RunCase(scene, caseName, sizeName, repeat):
+    Setup, _ = cases[caseName]
+    best = None
+    for _ in range(repeat):
+        # a fresh scene and user directory every time, so no run finds a cache or an export manifest from the one before
+        shutil.rmtree(scene.tempDirectory, ignore_errors = True)
+        scene.tempDirectory = tempfile.mkdtemp(prefix = "FakeMaya_")
+        sceneInfo = FakeMaya.BuildSyntheticScene(scene, **sizes[sizeName])
+        sceneInfo["clipCount"] = sizes[sizeName]["clipCount"]
+        with contextlib.redirect_stdout(io.StringIO()):
+            Run = Setup(scene, sceneInfo)
+            Run, GetDetails = Run if isinstance(Run, tuple) else (Run, None)
+            scene.stats.Reset()
+            startTime = time.perf_counter()
+            Run()
+            seconds = time.perf_counter() - startTime
+
+        if best is None or seconds < best["seconds"]:
+            best = dict(scene.stats.GetReport(), seconds = round(seconds, 4))
+            if GetDetails:
+                best["details"] = GetDetails()
+
+    shutil.rmtree(scene.tempDirectory, ignore_errors = True)
+    return best
+
+def GetScalingExponent(points, key):
+    # slope of log(value) over log(size), 0 is flat, 1 grows linearly with the scene, 2 quadratically
+    samples = [(math.log(point["size"]), math.log(max(point[key], 1e-6))) for point in points]
+    if len(samples) < 2:
+        return None
+
+    meanX = sum(x for x, _ in samples) / len(samples)
+    meanY = sum(y for _, y in samples) / len(samples)
+    spread = sum((x - meanX) ** 2 for x, _ in samples)
+    if spread == 0:
+        return None
+
+    return round(sum((x - meanX) * (y - meanY) for x, y in samples) / spread, 3)
+
+def CheckBudgets(caseName, caseResult, budget):
+    violations = []
+    for sizeName, result in caseResult["sizes"].items():
+        if result["unmodeled"] and not budget.get("allowUnmodeled", False):
+            violations.append(f"{caseName} [{sizeName}] called commands FakeMaya does not model: {', '.join(result['unmodeled'])}")
+
+        maxCalls = budget.get("maxCalls", {}).get(sizeName)
+        if maxCalls is not None and result["totalCalls"] > maxCalls:
+            violations.append(f"{caseName} [{sizeName}] made {result['totalCalls']} calls, the budget is {maxCalls}")
+
+        maxSeconds = budget.get("maxSeconds", {}).get(sizeName)
+        if maxSeconds is not None and result["seconds"] > maxSeconds:
+            violations.append(f"{caseName} [{sizeName}] took {result['seconds']}s, the budget is {maxSeconds}s")
+
+        loadedModules = result.get("details", {}).get("modules", [])
+        for moduleName in budget.get("forbiddenModules", []):
+            if moduleName in loadedModules:
+                violations.append(f"{caseName} [{sizeName}] loaded {moduleName}, it should only load when it is used")
+
+        for command, maxCommandCalls in budget.get("maxCallsPerCommand", {}).items():
+            commandCalls = result["calls"].get(command, 0)
+            if commandCalls > maxCommandCalls:
+                violations.append(f"{caseName} [{sizeName}] called {command} {commandCalls} times, the budget is {maxCommandCalls}")
+
+    scaling = caseResult["scaling"]
+    for key, budgetKey in (("callsExponent", "maxCallsExponent"), ("secondsExponent", "maxSecondsExponent")):
+        if budgetKey in budget and scaling[key] is not None and scaling[key] > budget[budgetKey]:
+            violations.append(f"{caseName} {key} is {scaling[key]} over {scaling['sizeSetting']}, the budget is {budget[budgetKey]}")
+
+    return violations
+
+def Main():
+    parser = argparse.ArgumentParser(description = "counts scene commands and times the tool entry points against an in-memory maya")
+    parser.add_argument("--sizes", default = ",".join(sizes), help = f"comma separated scene sizes to run, from {', '.join(sizes)}")
+    parser.add_argument("--cases", default = "", help = "only run the cases whose name contains one of these comma separated words")
+    parser.add_argument("--repeat", type = int, default = 3, help = "runs per case and size, the fastest one is kept")
+    parser.add_argument("--budgets", default = defaultBudgetsPath, help = "json file of call and time budgets, an empty string skips the checks")
+    parser.add_argument("--report", help = "also write the results to this json file")
+    arguments = parser.parse_args()
+
+    sizeNames = [sizeName for sizeName in arguments.sizes.split(",") if sizeName]
+    unknownSizes = [sizeName for sizeName in sizeNames if sizeName not in sizes]
+    if unknownSizes:
+        parser.error(f"unknown sizes: {', '.join(unknownSizes)}")
+
+    caseFilters = [caseFilter for caseFilter in arguments.cases.split(",") if caseFilter]
+    caseNames = [caseName for caseName in cases if not caseFilters or any(caseFilter in caseName for caseFilter in caseFilters)]
+
+    scene = FakeMaya.Install()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ImportPluginPackage()
+
+    results = {}
+    for caseName in caseNames:
+        sizeSetting = cases[caseName][1]
+        caseResult = {"sizes" : {}}
+        for sizeName in sizeNames:
+            caseResult["sizes"][sizeName] = RunCase(scene, caseName, sizeName, arguments.repeat)
+            result = caseResult["sizes"][sizeName]
+            print(f"{caseName:<45} {sizeName:<7} {result['totalCalls']:>6} calls {result['seconds'] * 1000:>10.1f}ms")
+
+        points = [{"size" : sizes[sizeName][sizeSetting], "calls" : caseResult["sizes"][sizeName]["totalCalls"], "seconds" : caseResult["sizes"][sizeName]["seconds"]} for sizeName in sizeNames]
+        caseResult["scaling"] = {
+            "sizeSetting" : sizeSetting,
+            "points" : points,
+            "callsExponent" : GetScalingExponent(points, "calls"),
+            "secondsExponent" : GetScalingExponent(points, "seconds"),
+        }
+        results[caseName] = caseResult
+
+    violations = []
+    if arguments.budgets:
+        with open(arguments.budgets, "r") as budgetsFile:
+            budgets = json.load(budgetsFile)
+
+        for caseName, caseResult in results.items():
+            violations += CheckBudgets(caseName, caseResult, budgets.get(caseName, {}))
+
+    for violation in violations:
+        print(f"over budget: {violation}")
+
+    if arguments.report:
+        with open(arguments.report, "w") as reportFile:
+            json.dump({"sizes" : {sizeName : sizes[sizeName] for sizeName in sizeNames}, "cases" : results, "violations" : violations}, reportFile, indent = 4)
+
+    return 1 if violations else 0
+
+if __name__ == "__main__":
+    sys.exit(Main())
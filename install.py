@@ -1,31 +1,179 @@
+import compileall
+import hashlib
+import json
 import os
 import shutil
+import time
 import maya.cmds as mc
 
+# installs by content hash, only files that changed since the last install are copied, the rest are hard linked from it
+# the new version is put together next to the installed one, compiled, and then swapped in, so maya never sees half an install
+
+installedItems = ["__init__.py", "src", "assets", "vendor"]
+excludedPaths = [
+    "vendor/mayaSDK", # stubs for writing code outside maya, maya has the real modules
+    "vendor/unrealSDK/remote_execution_fake_node.py", # only used by the benchmarks
+]
+excludedDirectoryNames = ["__pycache__", ".git"]
+manifestFileName = "installManifest.json"
+
+def GetSourceFiles(projectPath):
+    # relative paths with forward slashes, so the manifest reads the same on every os
+    sourceFiles = []
+    for item in installedItems:
+        itemPath = os.path.join(projectPath, item)
+        if os.path.isfile(itemPath):
+            sourceFiles.append(item)
+            continue
+
+        for directory, directoryNames, fileNames in os.walk(itemPath):
+            relativeDirectory = os.path.relpath(directory, projectPath).replace("\\", "/")
+            directoryNames[:] = sorted(name for name in directoryNames if name not in excludedDirectoryNames and f"{relativeDirectory}/{name}" not in excludedPaths)
+            for fileName in sorted(fileNames):
+                relativePath = f"{relativeDirectory}/{fileName}"
+                if not fileName.endswith(".pyc") and relativePath not in excludedPaths:
+                    sourceFiles.append(relativePath)
+
+    return sourceFiles
+
+def HashFile(filePath):
+    hasher = hashlib.blake2b(digest_size = 20)
+    with open(filePath, "rb") as sourceFile:
+        for chunk in iter(lambda : sourceFile.read(1024 * 1024), b""):
+            hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+def LoadInstallManifest(pluginDestinationPath):
+    try:
+        with open(os.path.join(pluginDestinationPath, manifestFileName), "r") as manifestFile:
+            return json.load(manifestFile).get("files", {})
+    except (OSError, ValueError):
+        return {}
+
+def SaveInstallManifest(pluginDestinationPath, fileEntries):
+    with open(os.path.join(pluginDestinationPath, manifestFileName), "w") as manifestFile:
+        json.dump({"installedTime" : time.time(), "files" : fileEntries}, manifestFile, indent = 4)
+
+def GetFileEntries(projectPath, oldEntries):
+    # a file whose size and modified time match the last install keeps its hash, only new or touched files are read
+    fileEntries = {}
+    for relativePath in GetSourceFiles(projectPath):
+        fileStat = os.stat(os.path.join(projectPath, relativePath))
+        oldEntry = oldEntries.get(relativePath)
+        if oldEntry and oldEntry["size"] == fileStat.st_size and oldEntry["mtime"] == fileStat.st_mtime_ns:
+            fileEntries[relativePath] = oldEntry
+        else:
+            fileEntries[relativePath] = {"hash" : HashFile(os.path.join(projectPath, relativePath)), "size" : fileStat.st_size, "mtime" : fileStat.st_mtime_ns}
+
+    return fileEntries
+
+def LinkOrCopy(sourcePath, destinationPath):
+    os.makedirs(os.path.dirname(destinationPath), exist_ok = True)
+    try:
+        os.link(sourcePath, destinationPath)
+    except OSError: # some network shares and file systems have no hard links
+        shutil.copy2(sourcePath, destinationPath)
+
+def CarryOverBytecode(pluginDestinationPath, stagingPath, fileEntries):
+    # the compiled files of the current install come along, compileall then only recompiles the sources that changed
+    for relativePath in fileEntries:
+        if not relativePath.endswith(".py"):
+            continue
+
+        directory, fileName = os.path.split(relativePath)
+        cacheDirectory = os.path.join(pluginDestinationPath, directory, "__pycache__")
+        if not os.path.isdir(cacheDirectory):
+            continue
+
+        moduleName = os.path.splitext(fileName)[0]
+        for cacheFileName in os.listdir(cacheDirectory):
+            if cacheFileName.split(".", 1)[0] == moduleName:
+                LinkOrCopy(os.path.join(cacheDirectory, cacheFileName), os.path.join(stagingPath, directory, "__pycache__", cacheFileName))
+
+def StageInstall(projectPath, pluginDestinationPath, stagingPath, fileEntries, oldEntries):
+    copiedFiles = []
+    for relativePath, fileEntry in fileEntries.items():
+        installedPath = os.path.join(pluginDestinationPath, relativePath)
+        stagedPath = os.path.join(stagingPath, relativePath)
+        oldEntry = oldEntries.get(relativePath)
+        if oldEntry and oldEntry["hash"] == fileEntry["hash"] and os.path.exists(installedPath):
+            LinkOrCopy(installedPath, stagedPath)
+        else:
+            os.makedirs(os.path.dirname(stagedPath), exist_ok = True)
+            shutil.copy2(os.path.join(projectPath, relativePath), stagedPath) # keeps the modified time, compileall compares it with the bytecode
+            copiedFiles.append(relativePath)
+
+    CarryOverBytecode(pluginDestinationPath, stagingPath, fileEntries)
+    if not compileall.compile_dir(stagingPath, ddir = pluginDestinationPath, quiet = 1): # ddir, so tracebacks name the installed files
+        raise Exception(f"could not compile the plugin in {stagingPath}, the installed version was left alone")
+
+    SaveInstallManifest(stagingPath, fileEntries)
+    return copiedFiles
+
+def SwapInstall(pluginDestinationPath, stagingPath):
+    # two renames in the same folder, maya either finds the old version or the new one, never a mix
+    oldPath = pluginDestinationPath + ".old"
+    shutil.rmtree(oldPath, ignore_errors = True)
+    if os.path.exists(pluginDestinationPath):
+        os.rename(pluginDestinationPath, oldPath)
+
+    try:
+        os.rename(stagingPath, pluginDestinationPath)
+    except OSError:
+        if os.path.exists(oldPath):
+            os.rename(oldPath, pluginDestinationPath) # puts the old version back, it still works
+        raise
+
+    shutil.rmtree(oldPath, ignore_errors = True)
+
+def SyncPlugin(projectPath, pluginDestinationPath):
+    startTime = time.perf_counter()
+    oldEntries = LoadInstallManifest(pluginDestinationPath)
+    fileEntries = GetFileEntries(projectPath, oldEntries)
+    upToDate = fileEntries.keys() == oldEntries.keys() and all(fileEntries[relativePath]["hash"] == oldEntries[relativePath]["hash"] for relativePath in fileEntries)
+    if upToDate and all(os.path.exists(os.path.join(pluginDestinationPath, relativePath)) for relativePath in fileEntries):
+        if fileEntries != oldEntries:
+            SaveInstallManifest(pluginDestinationPath, fileEntries) # only modified times changed, remember them so the files are not read again next time
+        return {"changed" : False, "copied" : [], "removed" : [], "files" : len(fileEntries), "seconds" : round(time.perf_counter() - startTime, 3)}
+
+    stagingPath = pluginDestinationPath + ".staging"
+    shutil.rmtree(stagingPath, ignore_errors = True)
+    try:
+        copiedFiles = StageInstall(projectPath, pluginDestinationPath, stagingPath, fileEntries, oldEntries)
+        SwapInstall(pluginDestinationPath, stagingPath)
+    finally:
+        shutil.rmtree(stagingPath, ignore_errors = True)
+
+    removedFiles = sorted(oldEntries.keys() - fileEntries.keys())
+    return {"changed" : True, "copied" : copiedFiles, "removed" : removedFiles, "files" : len(fileEntries), "seconds" : round(time.perf_counter() - startTime, 3)}
+
 def Install():
     projectPath = os.path.dirname(os.path.abspath(__file__))
     pluginName = os.path.split(projectPath)[-1]
     mayaScriptPath = os.path.join(mc.internalVar(uad = True), "scripts")
-    
-    pluginDestinationPath = os.path.join(mayaScriptPath, pluginName)
-    if os.path.exists(pluginDestinationPath):
-        shutil.rmtree(pluginDestinationPath)
 
-    os.makedirs(pluginDestinationPath, exist_ok = True)
-    sourceDirectoryName = "src"
+    pluginDestinationPath = os.path.join(mayaScriptPath, pluginName)
     assetDirectoryName = "assets"
 
-    shutil.copytree(os.path.join(projectPath, sourceDirectoryName), os.path.join(pluginDestinationPath, sourceDirectoryName))
-    shutil.copytree(os.path.join(projectPath, assetDirectoryName), os.path.join(pluginDestinationPath, assetDirectoryName))
-    shutil.copytree(os.path.join(projectPath, "vendor"), os.path.join(pluginDestinationPath, "vendor"))
-    shutil.copy2(os.path.join(projectPath, "__init__.py"), os.path.join(pluginDestinationPath, "__init__.py"))
+    installSummary = SyncPlugin(projectPath, pluginDestinationPath)
+    if installSummary["changed"]:
+        print(f"installed {pluginName} in {installSummary['seconds']}s, {len(installSummary['copied'])} of {installSummary['files']} files copied, {len(installSummary['removed'])} removed")
+    else:
+        print(f"{pluginName} is already up to date, checked {installSummary['files']} files in {installSummary['seconds']}s")
 
     def AddShelfButton(scriptName):
         currentShelf = mc.tabLayout("ShelfLayout", q = True, selectTab = True)
+        command = f"import {pluginName};{pluginName}.RunTool('{scriptName}')"
+        for shelfButton in mc.shelfLayout(currentShelf, q = True, childArray = True) or []:
+            if mc.objectTypeUI(shelfButton) == "shelfButton" and mc.shelfButton(shelfButton, q = True, c = True) == command:
+                return # installing again does not add the button a second time
+
         mc.setParent(currentShelf)
         icon = os.path.join(pluginDestinationPath, assetDirectoryName, scriptName + ".PNG")
-        mc.shelfButton(c = f"from {pluginName}.src import {scriptName};{scriptName}.Run()", image = icon)
+        mc.shelfButton(c = command, image = icon) # the tool module only loads on the first click
 
     AddShelfButton("LimbRiggingTool")
     AddShelfButton("MayaToUE")
-    AddShelfButton("ProxyRigger")
\ No newline at end of file
+    AddShelfButton("ProxyRigger")
+    return installSummary
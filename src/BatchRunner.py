@@ -0,0 +1,172 @@
+import concurrent.futures
+import json
+import os
+import subprocess
+import sys
+import time
+
+# runs jobs in separate worker processes (normally headless mayapy running BatchWorker.py) and gathers the results
+# nothing in here needs maya, so any command that speaks the same stdin/stdout protocol can stand in for the worker
+
+ResultMarker = "BATCH_RESULT " # the worker prints its result on a line starting with this, everything else it prints is just log
+
+class BatchJob:
+    def __init__(self, name, task, arguments, weight = 1.0):
+        self.name = name
+        self.task = task # name of the task function the worker runs, see BatchWorker.tasks
+        self.arguments = arguments # json friendly dict handed to the task
+        self.weight = weight # rough cost of the job, heavier jobs are started first
+
+class BatchResult:
+    def __init__(self, job):
+        self.job = job
+        self.success = False
+        self.attempts = 0
+        self.seconds = 0.0
+        self.result = None
+        self.error = ""
+        self.log = ""
+
+    def ToDict(self):
+        return {
+            "name" : self.job.name,
+            "task" : self.job.task,
+            "success" : self.success,
+            "attempts" : self.attempts,
+            "seconds" : round(self.seconds, 3),
+            "result" : self.result,
+            "error" : self.error,
+        }
+
+def GetMayaPyPath():
+    executableName = "mayapy.exe" if sys.platform == "win32" else "mayapy"
+    searchDirectories = []
+    if os.environ.get("MAYA_LOCATION"):
+        searchDirectories.append(os.path.join(os.environ["MAYA_LOCATION"], "bin"))
+
+    searchDirectories.append(os.path.dirname(sys.executable)) # inside maya this is the bin folder next to mayapy
+
+    for directory in searchDirectories:
+        mayaPyPath = os.path.join(directory, executableName)
+        if os.path.exists(mayaPyPath):
+            return mayaPyPath
+
+    raise FileNotFoundError(f"could not find {executableName}, please set MAYA_LOCATION to the maya install folder")
+
+def GetWorkerCommand():
+    return [GetMayaPyPath(), os.path.join(os.path.dirname(os.path.abspath(__file__)), "BatchWorker.py")]
+
+def ParseWorkerOutput(output):
+    # the last result line wins, in case the task itself printed something that looks like one
+    for line in reversed(output.splitlines()):
+        if line.startswith(ResultMarker):
+            return json.loads(line[len(ResultMarker):])
+
+    return None
+
+def RunJobOnce(job, workerCommand, timeout, cancelEvent = None, pollSeconds = 0.1):
+    # waits in short slices instead of one long call, so a cancel or the timeout can kill the worker in between
+    jobText = json.dumps({"task" : job.task, "arguments" : job.arguments})
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    process = subprocess.Popen(workerCommand, stdin = subprocess.PIPE, stdout = subprocess.PIPE, stderr = subprocess.PIPE, text = True)
+    pendingInput = jobText
+    while True:
+        try:
+            output, errorOutput = process.communicate(pendingInput, timeout = pollSeconds)
+            break
+        except subprocess.TimeoutExpired:
+            pendingInput = None # the input only goes in with the first call, calling communicate again loses no output
+            if cancelEvent is not None and cancelEvent.is_set():
+                process.kill()
+                output, _ = process.communicate()
+                return None, "cancelled", output or ""
+
+            if deadline is not None and time.perf_counter() > deadline:
+                process.kill()
+                output, _ = process.communicate()
+                return None, f"timed out after {timeout}s", output or ""
+
+    output = output or ""
+    try:
+        workerResult = ParseWorkerOutput(output)
+    except ValueError as e:
+        return None, f"worker sent an unreadable result: {e}", output + (errorOutput or "")
+
+    if workerResult is None:
+        return None, f"worker exited with code {process.returncode} without sending a result: {(errorOutput or '').strip()[-2000:]}", output
+
+    if not workerResult.get("success"):
+        return None, workerResult.get("error", "worker reported a failure"), output
+
+    return workerResult.get("result"), "", output
+
+def RunJob(job, workerCommand, retries, timeout, cancelEvent = None):
+    batchResult = BatchResult(job)
+    startTime = time.perf_counter()
+    while batchResult.attempts <= retries:
+        if cancelEvent is not None and cancelEvent.is_set():
+            batchResult.error = "cancelled" # a cancelled job is not tried again and a job that has not started yet never starts
+            break
+
+        batchResult.attempts += 1
+        result, error, log = RunJobOnce(job, workerCommand, timeout, cancelEvent)
+        batchResult.log = log
+        if not error:
+            batchResult.success = True
+            batchResult.result = result
+            batchResult.error = ""
+            break
+
+        batchResult.error = error
+
+    batchResult.seconds = time.perf_counter() - startTime
+    return batchResult
+
+def RunBatch(jobs, workerCommand = None, workerCount = 4, retries = 1, timeout = None, OnResult = None, cancelEvent = None):
+    # runs every job in its own worker process, at most workerCount at the same time, and returns the results in job order
+    # a job that crashes, times out or reports a failure is tried again up to retries more times
+    # setting cancelEvent (a threading.Event) kills the running workers and skips the jobs that have not started, they come back as failed
+    if workerCommand is None:
+        workerCommand = GetWorkerCommand()
+
+    jobs = list(jobs)
+    startOrder = sorted(range(len(jobs)), key = lambda i : -jobs[i].weight) # stable, so equal weights keep their order
+    results = [None] * len(jobs)
+    with concurrent.futures.ThreadPoolExecutor(max_workers = max(1, workerCount)) as executor:
+        futures = {executor.submit(RunJob, jobs[i], workerCommand, retries, timeout, cancelEvent) : i for i in startOrder}
+        for future in concurrent.futures.as_completed(futures):
+            batchResult = future.result()
+            results[futures[future]] = batchResult
+            if OnResult:
+                OnResult(batchResult)
+
+    return results
+
+def SplitByWeight(items, weights, groupCount):
+    # heaviest items first, each into the group with the least weight so far, so the groups take about as long as each other
+    groups = [[] for _ in range(max(1, min(groupCount, len(items))))]
+    groupWeights = [0.0] * len(groups)
+    for i in sorted(range(len(items)), key = lambda i : -weights[i]):
+        lightest = groupWeights.index(min(groupWeights))
+        groups[lightest].append(items[i])
+        groupWeights[lightest] += weights[i]
+
+    return groups
+
+def SummarizeBatch(results, wallSeconds = None):
+    summary = {
+        "total" : len(results),
+        "succeeded" : sum(1 for result in results if result.success),
+        "failed" : sum(1 for result in results if not result.success),
+        "workerSeconds" : round(sum(result.seconds for result in results), 3),
+        "jobs" : [result.ToDict() for result in results],
+    }
+    if wallSeconds is not None:
+        summary["wallSeconds"] = round(wallSeconds, 3)
+
+    return summary
+
+def WriteBatchReport(reportPath, summary):
+    os.makedirs(os.path.dirname(os.path.abspath(reportPath)), exist_ok = True)
+    with open(reportPath, "w") as reportFile:
+        json.dump(summary, reportFile, indent = 4)
@@ -0,0 +1,131 @@
+# headless worker for BatchRunner, run it with mayapy and send the job as json on stdin:
+#   mayapy BatchWorker.py < job.json
+# the job looks like {"task": "ProxyRig", "arguments": {...}}, the result is printed on a BatchRunner.ResultMarker line
+
+import json
+import os
+import sys
+import time
+import traceback
+
+sourceDirectory = os.path.dirname(os.path.abspath(__file__))
+pluginDirectory = os.path.dirname(sourceDirectory)
+for directory in (os.path.dirname(pluginDirectory), pluginDirectory, sourceDirectory, os.path.join(pluginDirectory, "vendor", "unrealSDK")):
+    if directory not in sys.path:
+        sys.path.append(directory)
+
+from BatchRunner import ResultMarker
+
+def GetSkinnedMeshes():
+    import maya.cmds as mc
+    meshes = []
+    for skin in mc.ls(type = "skinCluster"):
+        for shape in mc.skinCluster(skin, q = True, g = True) or []:
+            mesh = mc.listRelatives(shape, p = True)[0]
+            if mesh not in meshes:
+                meshes.append(mesh)
+
+    return meshes
+
+def ProxyRigTask(arguments):
+    # opens a scene, builds a proxy rig for the given meshes (or every skinned mesh) and saves the result
+    import maya.cmds as mc
+    from ProxyRigger import ProxyRigger
+
+    scene = arguments["scene"]
+    mc.file(scene, o = True, f = True)
+    meshes = arguments.get("meshes") or GetSkinnedMeshes()
+    if not meshes:
+        raise Exception(f"{scene} has no skinned mesh to build a proxy rig for")
+
+    for mesh in meshes:
+        mc.select(mesh, r = True)
+        ProxyRigger().CreateProxyRigFromSelectedMesh()
+
+    outputScene = arguments.get("outputScene")
+    if not outputScene:
+        sceneName, sceneExtension = os.path.splitext(os.path.basename(scene))
+        outputScene = os.path.join(arguments.get("outputDirectory") or os.path.dirname(scene), sceneName + "_proxy" + sceneExtension)
+
+    os.makedirs(os.path.dirname(os.path.abspath(outputScene)), exist_ok = True)
+    mc.file(rename = outputScene)
+    mc.file(save = True, f = True, type = "mayaAscii" if outputScene.lower().endswith(".ma") else "mayaBinary")
+    return {"meshes" : meshes, "outputScene" : outputScene}
+
+def ExportAnimClipsTask(arguments):
+    # opens the scene copy MayaToUE saved once and bakes every clip it was given out of it, a clip that fails does not stop the others
+    import maya.cmds as mc
+    from MayaToUEExport import ExportAnimationFBX
+
+    mc.loadPlugin("fbxmaya", qt = True)
+    mc.file(arguments["scene"], o = True, f = True)
+
+    clipResults = []
+    for clip in arguments["clips"]:
+        startTime = time.perf_counter()
+        try:
+            ExportAnimationFBX(arguments["objects"], clip["exportPath"], clip["startFrame"], clip["endFrame"])
+            clipResults.append({"exportPath" : clip["exportPath"], "success" : True, "exportSeconds" : round(time.perf_counter() - startTime, 3)})
+        except Exception as e:
+            clipResults.append({"exportPath" : clip["exportPath"], "success" : False, "error" : f"{e}"})
+
+    return {"clips" : clipResults}
+
+def ExportCharacterTask(arguments):
+    # opens a character scene and runs the same export steps the MayaToUE window runs, see MayaToUEBatch.py
+    import maya.cmds as mc
+    from MayaToUEExport import AnimClip, MayaToUE # the exporter without the window, so the worker never loads Qt for it
+
+    mc.loadPlugin("fbxmaya", qt = True)
+    mc.file(arguments["scene"], o = True, f = True)
+    if not mc.objExists(arguments["rootJoint"]):
+        raise Exception(f"{arguments['scene']} has no root joint {arguments['rootJoint']}")
+
+    mayaToUE = MayaToUE()
+    mayaToUE.rootJoint = arguments["rootJoint"]
+    mayaToUE.meshes = arguments.get("meshes", [])
+    mayaToUE.fileName = arguments["fileName"]
+    mayaToUE.saveDirectory = arguments["saveDirectory"]
+    mayaToUE.onlyExportChanges = arguments.get("onlyExportChanges", True)
+    mayaToUE.sendToUnreal = arguments.get("sendToUnreal", False)
+    for clip in arguments.get("clips", []):
+        animClip = AnimClip()
+        animClip.subfix = clip.get("subfix", "")
+        animClip.frameMin = clip["start"]
+        animClip.frameMax = clip["end"]
+        mayaToUE.animationClips.append(animClip)
+
+    startTime = time.perf_counter()
+    stepTimes = mayaToUE.SaveFiles()
+    return {
+        "fileName" : mayaToUE.fileName,
+        "skipped" : mayaToUE.lastSkippedExports,
+        "exportSeconds" : round(time.perf_counter() - startTime, 3),
+        "steps" : stepTimes,
+    }
+
+tasks = {
+    "ProxyRig" : ProxyRigTask,
+    "ExportAnimClips" : ExportAnimClipsTask,
+    "ExportCharacter" : ExportCharacterTask,
+}
+
+def Main():
+    job = json.loads(sys.stdin.read())
+    import maya.standalone
+    maya.standalone.initialize(name = "python")
+    exitCode = 0
+    try:
+        result = tasks[job["task"]](job.get("arguments", {}))
+        workerResult = {"success" : True, "result" : result}
+    except Exception as e:
+        workerResult = {"success" : False, "error" : f"{e}\n{traceback.format_exc()}"}
+        exitCode = 1
+
+    sys.stdout.write("\n" + ResultMarker + json.dumps(workerResult) + "\n")
+    sys.stdout.flush()
+    maya.standalone.uninitialize()
+    return exitCode
+
+if __name__ == "__main__":
+    sys.exit(Main())
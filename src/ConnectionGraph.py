@@ -0,0 +1,92 @@
+# walks dependency graph connections through a backend, so the same walking code runs on the maya scene
+# (MayaUtilities.MayaConnectionBackend) or on a made up graph held in memory (ConnectionGraph)
+
+Upstream = "upstream"
+Downstream = "downstream"
+
+def GetUniqueInOrder(items):
+    return list(dict.fromkeys(items))
+
+class ConnectionGraph: # in memory backend, nodes and connections are added by hand
+    def __init__(self):
+        self.nodeTypes = {}
+        self.upstream = {} # node -> nodes connected into it
+        self.downstream = {} # node -> nodes it connects out to
+
+    def AddNode(self, node, nodeType):
+        self.nodeTypes[node] = nodeType
+        self.upstream.setdefault(node, {})
+        self.downstream.setdefault(node, {})
+
+    def AddConnection(self, source, destination):
+        for node in (source, destination):
+            if node not in self.nodeTypes:
+                raise KeyError(f"{node} is not in the graph, add it with AddNode first")
+
+        # dicts instead of sets so the connection order stays the same from run to run
+        self.upstream[destination][source] = True
+        self.downstream[source][destination] = True
+
+    def ListConnections(self, nodes, direction):
+        connections = self.upstream if direction == Upstream else self.downstream
+        found = []
+        for node in nodes:
+            found.extend(connections.get(node, ()))
+
+        return GetUniqueInOrder(found)
+
+    def GetNodeTypes(self, nodes):
+        return {node : self.nodeTypes[node] for node in nodes}
+
+class ConnectionIndex: # every node found walking from a root, with its type, gathered in one walk
+    def __init__(self, root, direction, searchDepth, backend):
+        self.root = root
+        self.direction = direction
+        self.searchDepth = searchDepth
+        self.backend = backend
+        self.nodeTypes = {} # node -> type, in the order the nodes were found
+        self.Build()
+
+    def Build(self):
+        # one ListConnections and one GetNodeTypes call per depth level, no matter how wide the level is
+        self.nodeTypes = {}
+        nexts = self.backend.ListConnections([self.root], self.direction)
+        searchDepth = self.searchDepth
+        while nexts and searchDepth > 0:
+            newNodes = [node for node in GetUniqueInOrder(nexts) if node not in self.nodeTypes]
+            if not newNodes:
+                break
+
+            self.nodeTypes.update(self.backend.GetNodeTypes(newNodes))
+            nexts = self.backend.ListConnections(newNodes, self.direction)
+            searchDepth -= 1
+
+    def GetNodes(self):
+        return list(self.nodeTypes)
+
+    def OfType(self, *nodeTypes):
+        return [node for node, nodeType in self.nodeTypes.items() if nodeType in nodeTypes]
+
+    def Filter(self, Filter):
+        return [node for node in self.nodeTypes if Filter(node)]
+
+class ConnectionIndexCache: # keeps one index per query until Invalidate is called
+    def __init__(self, backend):
+        self.backend = backend
+        self.indices = {}
+        self.hits = 0
+        self.misses = 0
+
+    def GetIndex(self, root, direction, searchDepth):
+        key = (root, direction, searchDepth)
+        if key in self.indices:
+            self.hits += 1
+            return self.indices[key]
+
+        self.misses += 1
+        index = ConnectionIndex(root, direction, searchDepth, self.backend)
+        self.indices[key] = index
+        return index
+
+    def Invalidate(self):
+        self.indices.clear()
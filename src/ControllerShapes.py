@@ -0,0 +1,145 @@
+import json
+import os
+import maya.cmds as mc
+import maya.api.OpenMaya as om
+from MayaUtilities import GetDagPath
+
+# controller shapes kept as point lists, each one is built into a hidden template curve the first time it is used
+# and every controller after that is a duplicate of the template with its points scaled, no mel parsing or freezing transforms
+# the templates stay in the scene for the whole session under one hidden group, nothing selects it, so the exports never pick it up
+
+builtInShapes = {
+    "box" : {
+        "degree" : 1,
+        "points" : [
+            (-0.5, 0.5, 0.5), (0.5, 0.5, 0.5), (0.5, 0.5, -0.5), (-0.5, 0.5, -0.5), (-0.5, 0.5, 0.5), (-0.5, -0.5, 0.5), (0.5, -0.5, 0.5), (0.5, 0.5, 0.5),
+            (0.5, 0.5, -0.5), (0.5, -0.5, -0.5), (0.5, -0.5, 0.5), (0.5, -0.5, -0.5), (-0.5, -0.5, -0.5), (-0.5, 0.5, -0.5), (-0.5, -0.5, -0.5), (-0.5, -0.5, 0.5),
+        ],
+    },
+    "plus" : {
+        "degree" : 1,
+        "points" : [
+            (-15, 4, 0), (-13, 4, 0), (-13, 6, 0), (-11, 6, 0), (-11, 8, 0), (-13, 8, 0), (-13, 10, 0),
+            (-15, 10, 0), (-15, 8, 0), (-17, 8, 0), (-17, 6, 0), (-15, 6, 0), (-15, 4, 0),
+        ],
+    },
+    "circle" : { # the same cvs mc.circle makes for a radius of 1 facing x
+        "degree" : 3,
+        "periodic" : True,
+        "points" : [
+            (0, 0.783612, -0.783612), (0, 0, -1.108194), (0, -0.783612, -0.783612), (0, -1.108194, 0),
+            (0, -0.783612, 0.783612), (0, 0, 1.108194), (0, 0.783612, 0.783612), (0, 1.108194, 0),
+        ],
+    },
+}
+
+shapeFilesVariable = "MAYAPLUGINS_CONTROLLER_SHAPES" # json shape files loaded on top of the built in shapes, separated like PATH
+templateGroupName = "controllerShapeTemplates"
+
+def GetCurvePoints(shape):
+    # a periodic curve repeats its first degree points at the end
+    points = [tuple(point) for point in shape["points"]]
+    if shape.get("periodic"):
+        points += points[:shape["degree"]]
+
+    return points
+
+def GetCurveKnots(shape, pointCount):
+    if shape.get("periodic"):
+        return list(range(-shape["degree"] + 1, pointCount))
+
+    if shape["degree"] == 1:
+        return list(range(pointCount))
+
+    spanCount = pointCount - shape["degree"]
+    return [0] * (shape["degree"] - 1) + list(range(spanCount + 1)) + [spanCount] * (shape["degree"] - 1)
+
+class ControllerShapeLibrary:
+    def __init__(self):
+        self.shapes = {name : dict(shape) for name, shape in builtInShapes.items()}
+        self.templates = {} # shape name -> template curve in the current scene
+
+    def RegisterShape(self, name, points, degree = 1, periodic = False):
+        if len(points) <= degree:
+            raise Exception(f"controller shape {name} needs more than {degree} points for a degree {degree} curve")
+
+        self.shapes[name] = {"degree" : degree, "periodic" : periodic, "points" : [tuple(point) for point in points]}
+        self.RemoveTemplate(name) # an older template of the same name would not match the new points
+
+    def LoadShapeFile(self, shapeFilePath):
+        # {"shapes": {"arrow": {"degree": 1, "periodic": false, "points": [[0, 0, 0], ...]}}}
+        with open(shapeFilePath, "r") as shapeFile:
+            for name, shape in json.load(shapeFile).get("shapes", {}).items():
+                self.RegisterShape(name, shape["points"], shape.get("degree", 1), shape.get("periodic", False))
+
+    def LoadStudioShapes(self):
+        for shapeFilePath in os.environ.get(shapeFilesVariable, "").split(os.pathsep):
+            if shapeFilePath and os.path.exists(shapeFilePath):
+                self.LoadShapeFile(shapeFilePath)
+
+    def GetTemplate(self, shapeName):
+        template = self.templates.get(shapeName)
+        if template and mc.objExists(template):
+            return template
+
+        if shapeName not in self.shapes:
+            raise Exception(f"no controller shape called {shapeName}, the known shapes are: {', '.join(sorted(self.shapes))}")
+
+        templateGroup = self.GetTemplateGroup()
+        templateName = f"controllerShapeTemplate_{shapeName}"
+        if mc.objExists(f"{templateGroup}|{templateName}"):
+            mc.delete(f"{templateGroup}|{templateName}") # saved with the scene by an earlier session, its shape may have changed since
+
+        shape = self.shapes[shapeName]
+        points = GetCurvePoints(shape)
+        template = mc.curve(n = templateName, d = shape["degree"], p = points, k = GetCurveKnots(shape, len(points)), per = shape.get("periodic", False))
+        mc.setAttr(template + ".v", 0)
+        template = f"{templateGroup}|{mc.parent(template, templateGroup)[0]}"
+        self.templates[shapeName] = template
+        return template
+
+    def GetTemplateGroup(self):
+        templateGroup = "|" + templateGroupName
+        if not mc.objExists(templateGroup):
+            mc.group(em = True, n = templateGroupName)
+            mc.setAttr(templateGroup + ".v", 0)
+            mc.setAttr(templateGroup + ".hiddenInOutliner", 1)
+
+        return templateGroup
+
+    def CreateController(self, shapeName, name, size = 1.0):
+        controller = mc.duplicate(self.GetTemplate(shapeName), n = name, rr = True)[0]
+        controller = mc.parent(controller, w = True)[0] # the duplicate lands in the template group, out of sight
+        mc.setAttr(controller + ".v", 1)
+
+        # the size goes straight into the cvs, so the controller starts out with clean transforms
+        if size != 1.0:
+            controllerShape = mc.listRelatives(controller, s = True, f = True)[0]
+            curve = om.MFnNurbsCurve(GetDagPath(controllerShape))
+            curve.setCVPositions([om.MPoint(x * size, y * size, z * size) for x, y, z in GetCurvePoints(self.shapes[shapeName])])
+            curve.updateCurve()
+
+        return controller
+
+    def RemoveTemplate(self, shapeName):
+        template = self.templates.pop(shapeName, None)
+        if template and mc.objExists(template):
+            mc.delete(template)
+
+    def ClearTemplates(self):
+        # takes the templates and their group out of the scene, the next controller builds them again
+        for shapeName in list(self.templates):
+            self.RemoveTemplate(shapeName)
+
+        if mc.objExists("|" + templateGroupName):
+            mc.delete("|" + templateGroupName)
+
+controllerShapeLibrary = None
+
+def GetControllerShapeLibrary():
+    global controllerShapeLibrary
+    if controllerShapeLibrary is None:
+        controllerShapeLibrary = ControllerShapeLibrary()
+        controllerShapeLibrary.LoadStudioShapes()
+
+    return controllerShapeLibrary
@@ -0,0 +1,96 @@
+import concurrent.futures
+import threading
+from ExportSteps import RunCleanupSteps
+from PySide2.QtCore import QObject, Qt, QTimer, Signal
+
+# runs an export as a list of ExportSteps without freezing maya
+# maya steps run one at a time on the main thread whenever the ui is idle, the rest (hashing, files, the unreal transfer) go to a worker thread
+
+class ExportJob(QObject):
+    progressChanged = Signal(int, int, str) # steps done, steps known so far, label of the step that is running
+    statusChanged = Signal(str) # extra progress a long step reports while it runs, can be emitted from any thread
+    finished = Signal(bool, str) # success, message
+    workerStepDone = Signal(object) # the future of a worker step, emitted from the worker thread and handled on the main thread
+
+    def __init__(self, steps, workerCount = 2, parent = None):
+        super().__init__(parent)
+        self.steps = list(steps)
+        self.doneCount = 0
+        self.cancelled = False
+        self.cancelEvent = threading.Event() # for the steps, a step that waits on workers or unreal checks it and stops early
+        self.running = False
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers = max(1, workerCount))
+        self.pendingFuture = None
+        self.timer = QTimer(self)
+        self.timer.setInterval(0) # fires whenever the event loop has nothing else to do
+        self.timer.timeout.connect(self.Tick)
+        self.workerStepDone.connect(self.WorkerStepDone, Qt.QueuedConnection)
+
+    def Start(self):
+        self.running = True
+        self.timer.start()
+
+    def Cancel(self):
+        # nothing after the running step is started, a worker step that watches cancelEvent stops too, a maya step gets to finish
+        self.cancelled = True
+        self.cancelEvent.set()
+
+    def GetTotal(self):
+        return self.doneCount + len(self.steps) + (1 if self.pendingFuture else 0)
+
+    def Tick(self):
+        if self.cancelled:
+            self.Finish(False, "Export cancelled")
+            return
+
+        if not self.steps:
+            self.Finish(True, "Export finished")
+            return
+
+        step = self.steps.pop(0)
+        self.progressChanged.emit(self.doneCount, self.GetTotal() + 1, step.label)
+        if not step.runOnMainThread:
+            # the timer stops while the worker runs, otherwise it fires nonstop and keeps a core busy only to find the step not done
+            self.timer.stop()
+            self.pendingFuture = self.executor.submit(step.Action)
+            self.pendingFuture.add_done_callback(self.workerStepDone.emit)
+            return
+
+        # one maya step per tick, so the ui gets to handle its events between steps
+        try:
+            self.StepFinished(step.Action())
+        except Exception as e:
+            self.Finish(False, f"{e}")
+
+    def WorkerStepDone(self, future):
+        if future is not self.pendingFuture:
+            return
+
+        self.pendingFuture = None
+        try:
+            self.StepFinished(future.result())
+        except Exception as e:
+            self.Finish(False, f"{e}")
+            return
+
+        if self.running:
+            self.timer.start()
+
+    def StepFinished(self, moreSteps):
+        self.doneCount += 1
+        if moreSteps:
+            self.steps[0:0] = moreSteps
+
+        self.progressChanged.emit(self.doneCount, self.GetTotal(), "")
+
+    def Finish(self, success, message):
+        self.timer.stop()
+        if not success:
+            cleanupErrors = RunCleanupSteps(self.steps) # runs on the main thread, so the clean up steps may call maya
+            self.steps = []
+            if cleanupErrors:
+                message = f"{message}, clean up failed: {'; '.join(cleanupErrors)}"
+
+        self.executor.shutdown(wait = False)
+        self.running = False
+        self.finished.emit(success, message)
@@ -0,0 +1,74 @@
+import bisect
+import hashlib
+import json
+import os
+
+# remembers what every exported file was made from, so an export can skip files whose inputs did not change
+
+class ExportManifest:
+    def __init__(self, manifestPath):
+        self.manifestPath = manifestPath
+        self.entries = {}
+        self.Load()
+
+    def Load(self):
+        self.entries = {}
+        if not os.path.exists(self.manifestPath):
+            return
+
+        try:
+            with open(self.manifestPath, "r") as manifestFile:
+                self.entries = json.load(manifestFile).get("entries", {})
+        except (OSError, ValueError) as e:
+            print(f"ignoring unreadable export manifest {self.manifestPath}: {e}")
+
+    def Save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.manifestPath)), exist_ok = True)
+        tempPath = self.manifestPath + ".tmp"
+        with open(tempPath, "w") as manifestFile:
+            json.dump({"entries" : self.entries}, manifestFile, indent = 4, sort_keys = True)
+
+        os.replace(tempPath, self.manifestPath)
+
+    def GetEntryKey(self, outputPath):
+        # relative to the manifest, so the export folder can be moved around with its manifest
+        return os.path.relpath(os.path.abspath(outputPath), os.path.dirname(os.path.abspath(self.manifestPath))).replace("\\", "/")
+
+    def IsUpToDate(self, outputPath, entry):
+        return os.path.exists(outputPath) and self.entries.get(self.GetEntryKey(outputPath)) == entry
+
+    def Record(self, outputPath, entry):
+        self.entries[self.GetEntryKey(outputPath)] = entry
+
+def GetKeysAffectingRange(keys, startFrame, endFrame):
+    # the keys inside the range, plus the closest key on either side since those still shape the curve inside the range
+    # keys are (time, ...) tuples sorted by time
+    times = [key[0] for key in keys]
+    first = max(bisect.bisect_left(times, startFrame) - 1, 0)
+    last = min(bisect.bisect_right(times, endFrame) + 1, len(keys))
+    return keys[first:last]
+
+def HashAnimCurves(curveKeys, startFrame = None, endFrame = None):
+    # curveKeys maps a curve name to its keys, leave the range out to hash the whole curves
+    hasher = hashlib.sha1()
+    for curve in sorted(curveKeys):
+        keys = curveKeys[curve]
+        if startFrame is not None and endFrame is not None:
+            keys = GetKeysAffectingRange(keys, startFrame, endFrame)
+
+        hasher.update(json.dumps([curve, keys]).encode("utf-8"))
+
+    return hasher.hexdigest()
+
+def HashMeshData(meshData):
+    # meshData is packed mesh data (points, topology, uvs, weights), in a stable order
+    hasher = hashlib.sha1()
+    for data in meshData:
+        hasher.update(len(data).to_bytes(8, "little")) # the length too, so data moving from one entry to the next is still a change
+        hasher.update(data)
+
+    return hasher.hexdigest()
+
+def HashValues(values):
+    # anything json can write, dict keys in sorted order
+    return hashlib.sha1(json.dumps(values, sort_keys = True).encode("utf-8")).hexdigest()
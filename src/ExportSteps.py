@@ -0,0 +1,44 @@
+import time
+
+# an export is a list of steps, the window runs them as an ExportJob (see ExportJobs), scripts and batch workers run them right away
+# nothing in here imports Qt, so headless mayapy workers can use it
+
+class ExportStep:
+    def __init__(self, label, Action, runOnMainThread = True, alwaysRun = False):
+        self.label = label
+        self.Action = Action # can return a list of steps, they run right after this one
+        self.runOnMainThread = runOnMainThread # anything that calls maya has to stay on the main thread
+        self.alwaysRun = alwaysRun # clean up that still runs when an earlier step failed or the export was cancelled
+
+def RunCleanupSteps(steps):
+    # the always run steps of what was left when an export stopped early, a failing one does not keep the others from running
+    errors = []
+    for step in steps:
+        if not step.alwaysRun:
+            continue
+
+        try:
+            step.Action()
+        except Exception as e:
+            errors.append(f"{step.label}: {e}")
+
+    return errors
+
+def RunExportStepsNow(steps):
+    # runs the steps in order and blocks until they are done, for scripts and batch use, returns how long each step took
+    steps = list(steps)
+    stepTimes = []
+    while steps:
+        step = steps.pop(0)
+        startTime = time.perf_counter()
+        try:
+            moreSteps = step.Action()
+        except Exception:
+            RunCleanupSteps(steps)
+            raise
+
+        stepTimes.append({"step" : step.label, "seconds" : round(time.perf_counter() - startTime, 3)})
+        if moreSteps:
+            steps[0:0] = moreSteps
+
+    return stepTimes
@@ -1,6 +1,5 @@
 from PySide2.QtGui import QColor, QPalette
 import maya.cmds as mc # imports maya's cmd module so we can use it to run code in maya
-import maya.mel as mel
 from maya.OpenMaya import MVector
 
 from PySide2.QtWidgets import (QLineEdit, 
@@ -12,10 +11,13 @@ from PySide2.QtWidgets import (QLineEdit,
                                QLabel, 
                                QSlider,
                                QPushButton,
+                               QCheckBox,
                                QColorDialog) # imports all of the widgets needed to build our ui 
 from PySide2.QtCore import Qt # this has some values we can use to configure our widget, like our windowtype, or orientation
 
-from MayaUtilities import QMayaWindow
+from ControllerShapes import GetControllerShapeLibrary
+from MayaWindow import QMayaWindow
+from SkeletonUtilities import FindLimbChains, GetShortName, sideColors
     
 class LimbRigger: # class where we define the different joints we will use
     def __init__(self):
@@ -23,38 +25,65 @@ class LimbRigger: # class where we define the different joints we will use
         self.mid = "" # gives the middle joint an empty name
         self.end = "" # gives the end joint an empty name
         self.controllerSize = 5 # initializes the controller size as 5
+        self.limbChains = [] # every limb found by FindAllLimbChains, rigged together by RigAllLimbs
+        self.useNodeNetwork = True # drives the ik/fk switch with direct connections and a reverse node instead of expressions, so the rig can evaluate in parallel
 
     def AutoFindJoints(self): # function to automatically find the root joint and it's child joints
-        self.root = mc.ls(sl = True, type = "joint")[0] # finds the parent joint the user selects
-        self.mid = mc.listRelatives(self.root, c = True, type = "joint")[0] # finds the joint parented underneath the root joint
-        self.end = mc.listRelatives(self.mid, c = True, type = "joint")[0] # finds the joint parented underneath the mid joint
+        self.root = mc.ls(sl = True, type = "joint", l = True)[0] # finds the parent joint the user selects, as a full path so joints with the same name elsewhere do not get in the way
+        self.mid = mc.listRelatives(self.root, c = True, type = "joint", fullPath = True)[0] # finds the joint parented underneath the root joint
+        self.end = mc.listRelatives(self.mid, c = True, type = "joint", fullPath = True)[0] # finds the joint parented underneath the mid joint
+
+    def FindAllLimbChains(self): # walks the whole skeleton once and finds every limb in it
+        selection = mc.ls(sl = True, type = "joint", l = True) # the selected joint's skeleton, or every joint in the scene when nothing is selected
+        if selection:
+            topJoint = "|" + selection[0].split("|")[1] # the top of the hierarchy the selected joint is in
+            joints = [topJoint] if mc.objectType(topJoint) == "joint" else []
+            joints += mc.listRelatives(topJoint, ad = True, type = "joint", fullPath = True) or [] # one query for the whole hierarchy, as full paths so the parents come for free
+        else:
+            joints = mc.ls(type = "joint", l = True)
+
+        jointSet = set(joints)
+        parents = {} # joint -> parent joint, None for the top joints
+        positions = {} # joint -> world position
+        for joint in joints:
+            parent = joint.rsplit("|", 1)[0]
+            parents[joint] = parent if parent in jointSet else None
+            positions[joint] = mc.xform(joint, q = True, t = True, ws = True)
+
+        self.limbChains = FindLimbChains(parents, positions)
+        return self.limbChains
+
+    def RigAllLimbs(self): # rigs every found limb in one go, colored by side
+        mc.undoInfo(openChunk = True, chunkName = "RigAllLimbs") # one undo takes the whole batch back
+        mc.refresh(suspend = True) # no viewport redraws while dozens of nodes get created
+        try:
+            for limbChain in self.limbChains:
+                self.root, self.mid, self.end = limbChain.GetJoints() # full paths, RigLimb only uses the short names to name the controls
+                self.RigLimb(*sideColors[limbChain.side])
+        finally:
+            mc.refresh(suspend = False)
+            mc.undoInfo(closeChunk = True)
 
     def CreateFKControlForJoint(self, jointName): # function to create FK handle from a joint selection
-        controlName = "ac_fk_" + jointName # takes the name of the joint and gives it a prefix for the controller
+        controlName = "ac_fk_" + GetShortName(jointName) # takes the name of the joint and gives it a prefix for the controller
         controlGroupName = controlName + "_grp" # creates the group name for the new controller
-        mc.circle(n = controlName, r = self.controllerSize, nr = (1, 0, 0)) # creates the controller and gives it a name and how big it is
+        controlName = GetControllerShapeLibrary().CreateController("circle", controlName, self.controllerSize) # duplicates the circle template, sized to the controller size
 
-        mc.group(controlName, n = controlGroupName) # groups the controller underneath it's grp
+        controlGroupName = mc.group(controlName, n = controlGroupName) # groups the controller underneath it's grp, maya adds a number when the name is taken
         mc.matchTransform(controlGroupName, jointName) # matches the transform of controller with the joint to align it
         mc.orientConstraint(controlName, jointName) # constrains the joint with the controller
         return controlName, controlGroupName # returns the new controller and it's group
     
     def CreateBoxController(self, name):
-        mel.eval(f"curve -n {name} -d 1 -p -0.5 0.5 0.5 -p 0.5 0.5 0.5 -p 0.5 0.5 -0.5 -p -0.5 0.5 -0.5 -p -0.5 0.5 0.5 -p -0.5 -0.5 0.5 -p 0.5 -0.5 0.5 -p 0.5 0.5 0.5 -p 0.5 0.5 -0.5 -p 0.5 -0.5 -0.5 -p 0.5 -0.5 0.5 -p 0.5 -0.5 -0.5 -p -0.5 -0.5 -0.5 -p -0.5 0.5 -0.5 -p -0.5 -0.5 -0.5 -p -0.5 -0.5 0.5 -k 0 -k 1 -k 2 -k 3 -k 4 -k 5 -k 6 -k 7 -k 8 -k 9 -k 10 -k 11 -k 12 -k 13 -k 14 -k 15 ;")
-        mc.scale(self.controllerSize, self.controllerSize, self.controllerSize, name)
-        mc.makeIdentity(name, apply = True) # this is freeze transformation
+        name = GetControllerShapeLibrary().CreateController("box", name, self.controllerSize) # the size goes into the cvs, so there is no transform to freeze
 
-        grpName = name + "_grp"
-        mc.group(name, n = grpName)
+        grpName = mc.group(name, n = name + "_grp")
         return name, grpName
     
     def CreatePlusController(self, name):
-        mel.eval(f"curve -n {name} -d 1 -p -15 4 0 -p -13 4 0 -p -13 6 0 -p -11 6 0 -p -11 8 0 -p -13 8 0 -p -13 10 0 -p -15 10 0 -p -15 8 0 -p -17 8 0 -p -17 6 0 -p -15 6 0 -p -15 4 0 -k 0 -k 1 -k 2 -k 3 -k 4 -k 5 -k 6 -k 7 -k 8 -k 9 -k 10 -k 11 -k 12 ;")
-        #mc.scale(self.controllerSize / 3, self.controllerSize / 3, self.controllerSize / 3)
-        #mc.makeIdentity(name, apply = True) # this is freeze transformation
+        name = GetControllerShapeLibrary().CreateController("plus", name) # the plus keeps its own size
 
-        grpName = name + "_grp"
-        mc.group(name, n = grpName)
+        grpName = mc.group(name, n = name + "_grp")
         return name, grpName
 
     def GetObjectLocation(self, objectName)->MVector:
@@ -65,6 +94,7 @@ class LimbRigger: # class where we define the different joints we will use
         print(f"<{vectorToPrint.x}, {vectorToPrint.y}, {vectorToPrint.z}>")
 
     def RigLimb(self, r, g, b): # function to create the rig from the joints established before
+        midName, endName = GetShortName(self.mid), GetShortName(self.end) # the joints are used by their full paths, their short names only go into the control names
         rootFKControl, rootFKControlGrp = self.CreateFKControlForJoint(self.root) # creates controller and it's group for the root joint
         midFKControl, midFKControlGrp = self.CreateFKControlForJoint(self.mid) # creates controller and it's group for the mid joint
         endFKControl, endFKControlGrp = self.CreateFKControlForJoint(self.end) # creates controller and it's group for the end joint
@@ -72,7 +102,7 @@ class LimbRigger: # class where we define the different joints we will use
         mc.parent(midFKControlGrp, rootFKControl) # parents the grp for the mid joint control underneath the root control
         mc.parent(endFKControlGrp, midFKControl) # parents the grp for the end joint control underneath the mid control
 
-        ikEndControl = "ac_ik_" + self.end
+        ikEndControl = "ac_ik_" + endName
         ikEndControl, ikEndControlGrp = self.CreateBoxController(ikEndControl)
         mc.matchTransform(ikEndControlGrp, self.end)
         endOrientConstraint = mc.orientConstraint(ikEndControl, self.end)[0]
@@ -82,22 +112,19 @@ class LimbRigger: # class where we define the different joints we will use
 
         rootToEndVector = endJointLocation - rootJointLocation
 
-        ikHandleName = "ikHandle_" + self.end
-        mc.ikHandle(n = ikHandleName, sj = self.root, ee = self.end, sol = "ikRPsolver")
+        ikHandleName = mc.ikHandle(n = "ikHandle_" + endName, sj = self.root, ee = self.end, sol = "ikRPsolver")[0]
         ikPoleVectorValues = mc.getAttr(ikHandleName + ".poleVector")[0]
         ikPoleVector = MVector(ikPoleVectorValues[0], ikPoleVectorValues[1], ikPoleVectorValues[2])
 
         ikPoleVector.normalize()
         ikPoleVectorControlLocation = rootJointLocation + rootToEndVector / 2 + ikPoleVector * rootToEndVector.length()
 
-        ikPoleVectorControlName = "ac_ik_" + self.mid
-        mc.spaceLocator(n = ikPoleVectorControlName)
-        ikPoleVectorControlGrp = ikPoleVectorControlName + "_grp"
-        mc.group(ikPoleVectorControlName, n = ikPoleVectorControlGrp)
+        ikPoleVectorControlName = mc.spaceLocator(n = "ac_ik_" + midName)[0]
+        ikPoleVectorControlGrp = mc.group(ikPoleVectorControlName, n = ikPoleVectorControlName + "_grp")
         mc.setAttr(ikPoleVectorControlGrp + ".t", ikPoleVectorControlLocation.x, ikPoleVectorControlLocation.y, ikPoleVectorControlLocation.z, typ = "double3")
         mc.poleVectorConstraint(ikPoleVectorControlName, ikHandleName)
 
-        ikfkBlendControlName = "ac_ikfk_blend_" + self.mid
+        ikfkBlendControlName = "ac_ikfk_blend_" + midName
         ikfkBlendControlName, ikfkBlendControlGrp = self.CreatePlusController(ikfkBlendControlName)
         ikfkBlendControlLocation = rootJointLocation + MVector(rootJointLocation.x, 0, rootJointLocation.z)
         mc.setAttr(ikfkBlendControlGrp + ".t", ikfkBlendControlLocation.x, ikfkBlendControlLocation.y, ikfkBlendControlLocation.z, typ = "double3")
@@ -106,21 +133,35 @@ class LimbRigger: # class where we define the different joints we will use
         mc.addAttr(ikfkBlendControlName, ln = ikfkBlendAttributeName, min = 0, max = 1, k = True)
         ikfkBlendAttribute = ikfkBlendControlName + "." + ikfkBlendAttributeName
 
-        mc.expression(s = f"{ikHandleName}.ikBlend = {ikfkBlendAttribute}")
-        mc.expression(s = f"{ikEndControlGrp}.v = {ikPoleVectorControlGrp}.v = {ikfkBlendAttribute}")
-        mc.expression(s = f"{rootFKControlGrp}.v = 1 - {ikfkBlendAttribute}")
-        mc.expression(s = f"{endOrientConstraint}.{endFKControl}W0 = 1 - {ikfkBlendAttribute}")
-        mc.expression(s = f"{endOrientConstraint}.{ikEndControl}W1 = {ikfkBlendAttribute}")
+        if self.useNodeNetwork:
+            self.ConnectIKFKBlend(midName, ikfkBlendAttribute, ikHandleName, ikEndControlGrp, ikPoleVectorControlGrp, rootFKControlGrp, endOrientConstraint, endFKControl, ikEndControl)
+        else:
+            mc.expression(s = f"{ikHandleName}.ikBlend = {ikfkBlendAttribute}")
+            mc.expression(s = f"{ikEndControlGrp}.v = {ikPoleVectorControlGrp}.v = {ikfkBlendAttribute}")
+            mc.expression(s = f"{rootFKControlGrp}.v = 1 - {ikfkBlendAttribute}")
+            mc.expression(s = f"{endOrientConstraint}.{endFKControl}W0 = 1 - {ikfkBlendAttribute}")
+            mc.expression(s = f"{endOrientConstraint}.{ikEndControl}W1 = {ikfkBlendAttribute}")
 
         mc.parent(ikHandleName, ikEndControl)
         mc.setAttr(ikHandleName + ".v", 0)
 
-        topGrpName = self.root + "_rig_grp"
-        mc.group([rootFKControlGrp, ikEndControlGrp, ikPoleVectorControlGrp, ikfkBlendControlGrp], n = topGrpName)
+        topGrpName = mc.group([rootFKControlGrp, ikEndControlGrp, ikPoleVectorControlGrp, ikfkBlendControlGrp], n = GetShortName(self.root) + "_rig_grp")
         mc.setAttr(topGrpName + ".overrideEnabled", 1)
         mc.setAttr(topGrpName + ".overrideRGBColors", 1)
         mc.setAttr(topGrpName + ".overrideColorRGB", r, g, b, type = "double3")
 
+    def ConnectIKFKBlend(self, midName, ikfkBlendAttribute, ikHandleName, ikEndControlGrp, ikPoleVectorControlGrp, rootFKControlGrp, endOrientConstraint, endFKControl, ikEndControl): # same switch as the expressions, built from plain connections
+        fkBlendNode = mc.createNode("reverse", n = "ikfk_reverse_" + midName) # outputX is 1 - ikfkBlend, the fk side of the switch
+        mc.connectAttr(ikfkBlendAttribute, fkBlendNode + ".inputX")
+        fkBlendAttribute = fkBlendNode + ".outputX"
+
+        mc.connectAttr(ikfkBlendAttribute, ikHandleName + ".ikBlend") # ik solver is on when the blend is at 1
+        mc.connectAttr(ikfkBlendAttribute, ikEndControlGrp + ".v") # ik controls show when ik is on
+        mc.connectAttr(ikfkBlendAttribute, ikPoleVectorControlGrp + ".v")
+        mc.connectAttr(fkBlendAttribute, rootFKControlGrp + ".v") # fk controls show when ik is off
+        mc.connectAttr(fkBlendAttribute, f"{endOrientConstraint}.{endFKControl}W0") # end joint follows the fk control when ik is off
+        mc.connectAttr(ikfkBlendAttribute, f"{endOrientConstraint}.{ikEndControl}W1") # and the ik control when ik is on
+
 class ColorPicker(QWidget):
     def __init__(self):
         super().__init__()
@@ -193,6 +234,11 @@ class LimbRigToolWidget(QMayaWindow): # class for the window we create for the l
         self.colorPicker = ColorPicker()
         self.masterLayout.addWidget(self.colorPicker)
 
+        self.nodeNetworkCheckbox = QCheckBox("Use Node Network (faster playback)") # off falls back to the old expression based switch
+        self.nodeNetworkCheckbox.setChecked(self.rigger.useNodeNetwork)
+        self.nodeNetworkCheckbox.toggled.connect(self.NodeNetworkToggled)
+        self.masterLayout.addWidget(self.nodeNetworkCheckbox)
+
         self.controllerColorChanger = ControllerColor()
         self.masterLayout.addWidget(self.controllerColorChanger)
 
@@ -200,8 +246,22 @@ class LimbRigToolWidget(QMayaWindow): # class for the window we create for the l
         self.masterLayout.addWidget(self.rigLimbButton) # adds the button to the master layout
         self.rigLimbButton.clicked.connect(self.RigLimbButtonClicked) # provides functionality to the button being clicked
 
+        self.findAllLimbsButton = QPushButton("Find All Limbs") # finds every limb of the selected skeleton, or of every skeleton when nothing is selected
+        self.masterLayout.addWidget(self.findAllLimbsButton)
+        self.findAllLimbsButton.clicked.connect(self.FindAllLimbsButtonClicked)
+
+        self.limbChainsLabel = QLabel("") # lists the limbs that were found
+        self.masterLayout.addWidget(self.limbChainsLabel)
+
+        self.rigAllLimbsButton = QPushButton("Rig All Limbs") # rigs every found limb, left blue, right red, center yellow
+        self.masterLayout.addWidget(self.rigAllLimbsButton)
+        self.rigAllLimbsButton.clicked.connect(self.RigAllLimbsButtonClicked)
+
         self.setWindowTitle("Limb Rigging Tool") # puts a title on top of the window named "Limb Rigging Tool"
 
+    def NodeNetworkToggled(self, checked): # function for the node network checkbox being toggled
+        self.rigger.useNodeNetwork = checked
+
     def ControlSizeValueChanged(self, newValue): # function for changing the value of the controller size is changed
         self.rigger.controllerSize = newValue # sets the value of the controller size to the new value the user sets on the slider
         self.controlSizeLabel.setText(f"{self.rigger.controllerSize}") # changes the label text to reflect the value of the controller's new size
@@ -209,13 +269,30 @@ class LimbRigToolWidget(QMayaWindow): # class for the window we create for the l
     def RigLimbButtonClicked(self): # function for the RigLimbButton being clicked
         self.rigger.RigLimb(self.colorPicker.color.redF(), self.colorPicker.color.greenF(), self.colorPicker.color.blueF()) # runs the RigLimb() function
 
+    def FindAllLimbsButtonClicked(self): # function for the FindAllLimbsButton being clicked
+        limbChains = self.rigger.FindAllLimbChains()
+        limbTexts = []
+        for limbChain in limbChains:
+            pairText = f" (pairs with {GetShortName(limbChain.mirror.root)})" if limbChain.mirror else ""
+            limbTexts.append(f"{limbChain.side}: {', '.join(GetShortName(joint) for joint in limbChain.GetJoints())}{pairText}")
+
+        self.limbChainsLabel.setText("\n".join(limbTexts) if limbTexts else "No limbs found")
+
+    def RigAllLimbsButtonClicked(self): # function for the RigAllLimbsButton being clicked
+        if not self.rigger.limbChains:
+            QMessageBox.critical(self, "Error", "No limbs found yet, please click Find All Limbs first!")
+            return
+
+        self.rigger.RigAllLimbs()
+
     def AutoFindButtonClicked(self): # function for the AutoFindButton being clicked
         try: # tries to find the child joints underneath the selected joint and sets the text to reflect the selection
             self.rigger.AutoFindJoints()
-            self.jointSelectionText.setText(f"{self.rigger.root}, {self.rigger.mid}, {self.rigger.end}")
+            self.jointSelectionText.setText(f"{GetShortName(self.rigger.root)}, {GetShortName(self.rigger.mid)}, {GetShortName(self.rigger.end)}")
         except Exception as e: # if the button encounters an error, it will display an error message for the user
             QMessageBox.critical(self, "Error", "Wrong Selection, please select the first joint of a limb!")
 
 def Run():
     limbRigToolWidget = LimbRigToolWidget() # creates the Limb Rig Tool for the user in Maya
-    limbRigToolWidget.show() # displays the Limb Rig Tool
\ No newline at end of file
+    limbRigToolWidget.show() # displays the Limb Rig Tool
+    return limbRigToolWidget # hands the window back to whoever started the tool
\ No newline at end of file
@@ -1,11 +1,10 @@
-import os
-from MayaUtilities import IsJoint, IsMesh, QMayaWindow
-from PySide2.QtCore import Signal
+from ExportJobs import ExportJob
+from MayaToUEExport import AnimClip, MayaToUE
+from MayaWindow import QMayaWindow
+from PySide2.QtCore import Qt, Signal
 from PySide2.QtGui import QIntValidator, QRegExpValidator
-from PySide2.QtWidgets import QCheckBox, QFileDialog, QHBoxLayout, QLabel, QLineEdit, QListWidget, QMessageBox, QPushButton, QVBoxLayout, QWidget
+from PySide2.QtWidgets import QAbstractItemView, QCheckBox, QFileDialog, QHBoxLayout, QLabel, QLineEdit, QListWidget, QListWidgetItem, QMessageBox, QProgressBar, QPushButton, QVBoxLayout, QWidget
 import maya.cmds as mc
-import MayaPlugIns_Spring2025
-import remote_execution
 
 def TryAction(action):
     def wrapper(*args, **kwargs):
@@ -16,155 +15,6 @@ def TryAction(action):
 
     return wrapper
 
-class AnimClip:
-    def __init__(self):
-        self.subfix = ""
-        self.frameMin = mc.playbackOptions(q = True, min = True)
-        self.frameMax = mc.playbackOptions(q = True, max = True)
-        self.shouldExport = True
-
-
-
-class MayaToUE:
-    def __init__(self):
-        self.rootJoint = ""
-        self.meshes = []
-        self.animationClips : list[AnimClip] = []
-        self.fileName = ""
-        self.saveDirectory = ""
-
-    def GetAllJoints(self):
-        joints = []
-        joints.append(self.rootJoint)
-        children = mc.listRelatives(self.rootJoint, c = True, ad = True, type = "joint")
-        if children:
-            joints.extend(children)
-
-        return joints
-
-    def SaveFiles(self):
-        allJoints = self.GetAllJoints()
-        allMeshes = self.meshes
-
-        allObjectToExport = allJoints + allMeshes
-        mc.select(allObjectToExport, r = True)
-
-        skeletalMeshExportPath = self.GetSkeletalMeshSavePath()
-
-        mc.FBXResetExport()
-        mc.FBXExportSmoothingGroups('-v', True)
-        mc.FBXExportInputConnections('-v', False)
-
-        # -f means file name, -s means export selected, -ea means export animation
-        mc.FBXExport('-f', skeletalMeshExportPath, '-s', True, '-ea', False)
-
-        os.makedirs(self.GetAnimationDirectoryPath(), exist_ok = True)
-        mc.FBXExportBakeComplexAnimation('-v', True)
-        for animClip in self.animationClips:
-            if not animClip.shouldExport:
-                continue
-
-            animExportPath = self.GetSavePathForAnimClip(animClip)
-
-            startFrame = animClip.frameMin
-            endFrame = animClip.frameMax
-
-            mc.FBXExportBakeComplexStart('-v', startFrame)
-            mc.FBXExportBakeComplexEnd('-v', endFrame)
-            mc.FBXExportBakeComplexStep('-v', 1)
-
-            mc.playbackOptions(e = True, min = startFrame, max = endFrame)
-            mc.FBXExport('-f', animExportPath, '-s', True, '-ea', True)
-
-        self.SendToUnreal()
-
-    def SendToUnreal(self):
-        ueUtilPath = os.path.join(MayaPlugIns_Spring2025.sourceDirectory, "UnrealUtilities.py")
-        ueUtilPath = os.path.normpath(ueUtilPath)
-
-        meshPath = self.GetSkeletalMeshSavePath().replace("\\", "/")
-        animDir = self.GetAnimationDirectoryPath().replace("\\", "/")
-
-        commands = []
-        with open(ueUtilPath, 'r') as ueUtilityFile:
-            commands = ueUtilityFile.readlines()
-
-        commands.append(f"\nImportMeshAndAnimation(\'{meshPath}\', \'{animDir}\')")
-
-        command = "".join(commands)
-        print(command)
-
-        remoteExecute = remote_execution.RemoteExecution()
-        remoteExecute.start()
-        remoteExecute.open_command_connection(remoteExecute.remote_nodes)
-        remoteExecute.run_command(command)
-        remoteExecute.stop()
-
-
-
-
-    def GetAnimationDirectoryPath(self):
-        path = os.path.join(self.saveDirectory, "animations")
-        return os.path.normpath(path)
-
-    def GetSavePathForAnimClip(self, animClip: AnimClip):
-        path = os.path.join(self.GetAnimationDirectoryPath(), self.fileName + animClip.subfix + ".fbx")
-        return os.path.normpath(path)
-
-    def GetSkeletalMeshSavePath(self):
-        path = os.path.join(self.saveDirectory, self.fileName + ".fbx")
-        return os.path.normpath(path)
-
-    def RemoveAnimClip(self, clipToRemove: AnimClip):
-        self.animationClips.remove(clipToRemove)
-        print(f"animation clip removed, now we have: {len(self.animationClips)} left")
-
-    def AddNewAnimEntry(self):
-        self.animationClips.append(AnimClip())
-        print(f"animation clip added, now we have: {len(self.animationClips)} anim clip(s)")
-        return self.animationClips[-1]
-
-    def SetSelectionAsRootJoint(self):
-        selection = mc.ls(sl = True)
-        if not selection:
-            raise Exception("Nothing Selected! Please Select the Joint of the Rig!")
-        
-        selectedJoint = selection[0]
-        if not IsJoint(selectedJoint):
-            raise Exception(f"{selectedJoint} is not a joint, Please Select the Root Joint of the Rig!")
-        
-        self.rootJoint = selectedJoint
-
-    def AddRootJoint(self):
-        if (not self.rootJoint) or (not mc.objExists(self.rootJoint)):
-            raise Exception("No Root Joint Assigned, please set the current root joint of the rig first!")
-        
-        currentRootJointPositionX, currentRootJointPositionY, currentRootJointPositionZ = mc.xform(self.rootJoint, q = True, t = True, ws = True)
-        if currentRootJointPositionX == 0 and currentRootJointPositionY == 0 and currentRootJointPositionZ == 0:
-            raise Exception("current root joint is already at origin, no need to make a new one!")
-        
-        mc.select(cl = True)
-        rootJointName = self.rootJoint + "_root"
-        mc.joint(n = rootJointName)
-        mc.parent(self.rootJoint, rootJointName)
-        self.rootJoint = rootJointName
-
-    def AddMeshs(self):
-        selection = mc.ls(sl = True)
-        if not selection:
-            raise Exception("No Mesh Selected!")
-        
-        meshes = set()
-
-        for sel in selection:
-            if IsMesh(sel):
-                meshes.add(sel)
-
-        if len(meshes) == 0:
-            raise Exception("No Mesh Selected!")
-        
-        self.meshes = list(meshes)
-
 class AnimClipEntryWidget(QWidget):
     entryRemoved = Signal(AnimClip)
     entrySubfixChanged = Signal(str)
@@ -289,16 +139,93 @@ class MayaToUEWidget(QMayaWindow):
         self.pickDirectoryButton.clicked.connect(self.PickDirectoryButtonClicked)
         self.saveFileLayout.addWidget(self.pickDirectoryButton)
 
+        self.saveFileLayout.addWidget(QLabel("Export Workers: "))
+        self.exportWorkerCountLineEdit = QLineEdit()
+        self.exportWorkerCountLineEdit.setFixedWidth(30)
+        self.exportWorkerCountLineEdit.setValidator(QIntValidator(0, 64))
+        self.exportWorkerCountLineEdit.setText(str(self.mayaToUE.exportWorkerCount))
+        self.exportWorkerCountLineEdit.textChanged.connect(self.ExportWorkerCountChanged)
+        self.saveFileLayout.addWidget(self.exportWorkerCountLineEdit)
+
+        onlyExportChangesCheckbox = QCheckBox("Only Export Changes")
+        onlyExportChangesCheckbox.setChecked(self.mayaToUE.onlyExportChanges)
+        onlyExportChangesCheckbox.toggled.connect(self.OnlyExportChangesToggled)
+        self.masterLayout.addWidget(onlyExportChangesCheckbox)
+
+        bakeClipsOnceCheckbox = QCheckBox("Bake Clips Once")
+        bakeClipsOnceCheckbox.setChecked(self.mayaToUE.bakeClipsOnce)
+        bakeClipsOnceCheckbox.toggled.connect(self.BakeClipsOnceToggled)
+        self.masterLayout.addWidget(bakeClipsOnceCheckbox)
+
+        unrealEditorsLayout = QHBoxLayout()
+        self.masterLayout.addLayout(unrealEditorsLayout)
+        unrealEditorsLayout.addWidget(QLabel("Unreal Editors: "))
+        self.unrealEditorList = QListWidget()
+        self.unrealEditorList.setFixedHeight(60)
+        self.unrealEditorList.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.unrealEditorList.itemSelectionChanged.connect(self.UnrealEditorSelectionChanged)
+        unrealEditorsLayout.addWidget(self.unrealEditorList)
+        refreshUnrealEditorsButton = QPushButton("Find Editors")
+        refreshUnrealEditorsButton.clicked.connect(self.RefreshUnrealEditorsButtonClicked)
+        unrealEditorsLayout.addWidget(refreshUnrealEditorsButton)
+
         self.savePreviewLabel = QLabel("")
         self.masterLayout.addWidget(self.savePreviewLabel)
 
-        saveFileButton = QPushButton("Save Files")
-        saveFileButton.clicked.connect(self.SaveFileButtonClicked)
-        self.masterLayout.addWidget(saveFileButton)
+        self.exportJob = None
+        exportLayout = QHBoxLayout()
+        self.masterLayout.addLayout(exportLayout)
+        self.saveFileButton = QPushButton("Save Files")
+        self.saveFileButton.clicked.connect(self.SaveFileButtonClicked)
+        exportLayout.addWidget(self.saveFileButton)
+
+        self.cancelExportButton = QPushButton("Cancel")
+        self.cancelExportButton.setEnabled(False)
+        self.cancelExportButton.clicked.connect(self.CancelExportButtonClicked)
+        exportLayout.addWidget(self.cancelExportButton)
+
+        self.exportProgressBar = QProgressBar()
+        self.exportProgressBar.setValue(0)
+        self.masterLayout.addWidget(self.exportProgressBar)
 
+        self.exportStatusLabel = QLabel("")
+        self.masterLayout.addWidget(self.exportStatusLabel)
 
+    @TryAction
     def SaveFileButtonClicked(self):
-        self.mayaToUE.SaveFiles()
+        # the export runs as a job, maya stays usable while clips are written and unreal imports them
+        if self.exportJob and self.exportJob.running:
+            return
+
+        self.exportJob = ExportJob(self.mayaToUE.GetExportSteps(), parent = self)
+        self.exportJob.progressChanged.connect(self.ExportProgressChanged)
+        self.exportJob.statusChanged.connect(self.exportStatusLabel.setText)
+        self.exportJob.finished.connect(self.ExportFinished)
+        self.mayaToUE.OnExportStatus = self.exportJob.statusChanged.emit
+        self.mayaToUE.exportCancelEvent = self.exportJob.cancelEvent
+        self.saveFileButton.setEnabled(False)
+        self.cancelExportButton.setEnabled(True)
+        self.exportJob.Start()
+
+    def CancelExportButtonClicked(self):
+        if self.exportJob:
+            self.exportJob.Cancel()
+            self.exportStatusLabel.setText("Cancelling...")
+
+    def ExportProgressChanged(self, doneCount, totalCount, label):
+        self.exportProgressBar.setMaximum(totalCount)
+        self.exportProgressBar.setValue(doneCount)
+        if label:
+            self.exportStatusLabel.setText(label)
+
+    def ExportFinished(self, success, message):
+        self.mayaToUE.OnExportStatus = None
+        self.mayaToUE.exportCancelEvent = None
+        self.saveFileButton.setEnabled(True)
+        self.cancelExportButton.setEnabled(False)
+        self.exportStatusLabel.setText(message)
+        if not success and not self.exportJob.cancelled:
+            QMessageBox().critical(None, "Error", message)
 
     def UpdateSavePreviewLabel(self):
         previewText = self.mayaToUE.GetSkeletalMeshSavePath()
@@ -319,6 +246,29 @@ class MayaToUEWidget(QMayaWindow):
         self.mayaToUE.saveDirectory = path
         self.UpdateSavePreviewLabel()
 
+    @TryAction
+    def RefreshUnrealEditorsButtonClicked(self):
+        from UnrealSession import GetUnrealSession
+        self.unrealEditorList.clear()
+        for node in GetUnrealSession().GetNodes(timeout = 2.0):
+            item = QListWidgetItem(f"{node.get('project_name', '')} ({node.get('machine', '')}) {node['node_id']}")
+            item.setData(Qt.UserRole, node["node_id"])
+            self.unrealEditorList.addItem(item)
+            item.setSelected(node["node_id"] in self.mayaToUE.unrealNodeIds)
+
+    def UnrealEditorSelectionChanged(self):
+        self.mayaToUE.unrealNodeIds = [item.data(Qt.UserRole) for item in self.unrealEditorList.selectedItems()]
+
+    def BakeClipsOnceToggled(self, checked):
+        self.mayaToUE.bakeClipsOnce = checked
+
+    def OnlyExportChangesToggled(self, checked):
+        self.mayaToUE.onlyExportChanges = checked
+
+    @TryAction
+    def ExportWorkerCountChanged(self, newText):
+        self.mayaToUE.exportWorkerCount = int(newText) if newText else 0
+
     @TryAction
     def FileNameLineEditChanged(self, newText):
         self.mayaToUE.fileName = newText
@@ -358,4 +308,6 @@ class MayaToUEWidget(QMayaWindow):
         self.rootJointText.setText(self.mayaToUE.rootJoint)
 
 def Run():
-    MayaToUEWidget().show()
\ No newline at end of file
+    mayaToUEWidget = MayaToUEWidget()
+    mayaToUEWidget.show()
+    return mayaToUEWidget
\ No newline at end of file
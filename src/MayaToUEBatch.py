@@ -0,0 +1,154 @@
+# headless MayaToUE export for farm jobs, no maya ui needed:
+#   mayapy MayaToUEBatch.py characters.json [--workers 4] [--report report.json]
+# every character in the manifest is exported by its own mayapy worker (BatchWorker.py, task "ExportCharacter")
+# finished characters are written to a journal as they complete, so running the same manifest again after a crash skips them
+# a character whose scene file changed since is exported again, and a run with no failures deletes the journal, so the next run does everything
+#
+# manifest (json, or yaml when PyYAML is installed):
+# {
+#     "outputDirectory": "D:/Exports",
+#     "characters": [
+#         {
+#             "name": "Hero",
+#             "scene": "D:/Scenes/Hero_anim.mb",
+#             "rootJoint": "root",
+#             "meshes": ["Hero_body"],
+#             "clips": [{"subfix": "_walk", "start": 1, "end": 32}, {"subfix": "_run", "start": 40, "end": 60}]
+#         }
+#     ]
+# }
+# a character can also set "fileName" (defaults to its name), "saveDirectory" (defaults to outputDirectory/name),
+# "onlyExportChanges" (defaults to true) and "sendToUnreal" (defaults to false)
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+sourceDirectory = os.path.dirname(os.path.abspath(__file__))
+if sourceDirectory not in sys.path:
+    sys.path.append(sourceDirectory)
+
+from BatchRunner import BatchJob, RunBatch, SummarizeBatch, WriteBatchReport
+
+def LoadManifest(manifestPath):
+    with open(manifestPath, "r") as manifestFile:
+        if os.path.splitext(manifestPath)[1].lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise Exception(f"{manifestPath} is yaml but PyYAML is not installed, install it or use a json manifest")
+
+            return yaml.safe_load(manifestFile)
+
+        return json.load(manifestFile)
+
+def GetCharacterJobs(manifest, sendToUnreal = False):
+    jobs = []
+    outputDirectory = manifest.get("outputDirectory", "")
+    for character in manifest.get("characters", []):
+        for requiredKey in ("name", "scene", "rootJoint"):
+            if requiredKey not in character:
+                raise Exception(f"a character in the manifest has no {requiredKey}: {character}")
+
+        arguments = {
+            "scene" : character["scene"],
+            "rootJoint" : character["rootJoint"],
+            "meshes" : character.get("meshes", []),
+            "clips" : character.get("clips", []),
+            "fileName" : character.get("fileName", character["name"]),
+            "saveDirectory" : character.get("saveDirectory") or os.path.join(outputDirectory, character["name"]),
+            "onlyExportChanges" : character.get("onlyExportChanges", True),
+            "sendToUnreal" : character.get("sendToUnreal", sendToUnreal),
+        }
+        # the longest characters start first, so one big character does not end up starting last
+        frameCount = sum(clip["end"] - clip["start"] + 1 for clip in arguments["clips"])
+        jobs.append(BatchJob(character["name"], "ExportCharacter", arguments, frameCount + 1))
+
+    return jobs
+
+def GetSceneStamp(scenePath):
+    try:
+        sceneStat = os.stat(scenePath)
+    except OSError:
+        return None # a missing scene fails in the worker, it never gets into the journal
+
+    return [sceneStat.st_size, sceneStat.st_mtime_ns]
+
+def GetJobKey(job):
+    # a character counts as done only for exactly these settings and this version of its scene, editing either exports it again
+    return hashlib.sha1(json.dumps([job.name, job.arguments, GetSceneStamp(job.arguments["scene"])], sort_keys = True).encode("utf-8")).hexdigest()
+
+def LoadJournal(journalPath):
+    finishedKeys = set()
+    if not os.path.exists(journalPath):
+        return finishedKeys
+
+    with open(journalPath, "r") as journalFile:
+        for line in journalFile:
+            try:
+                finishedKeys.add(json.loads(line)["key"])
+            except (ValueError, KeyError):
+                pass # the last line can be cut short when the run crashed while writing it
+
+    return finishedKeys
+
+def AppendToJournal(journalPath, jobKey, job, result):
+    with open(journalPath, "a") as journalFile:
+        journalFile.write(json.dumps({"key" : jobKey, "name" : job.name, "seconds" : round(result.seconds, 3)}) + "\n")
+        journalFile.flush()
+        os.fsync(journalFile.fileno())
+
+def RunCharacterBatch(manifestPath, workerCount = 4, retries = 1, timeout = None, reportPath = None, journalPath = None, restart = False, sendToUnreal = False, workerCommand = None):
+    manifestPath = os.path.abspath(manifestPath)
+    manifestName = os.path.splitext(manifestPath)[0]
+    reportPath = reportPath or manifestName + "_report.json"
+    journalPath = journalPath or manifestName + "_journal.jsonl"
+    if restart and os.path.exists(journalPath):
+        os.remove(journalPath)
+
+    jobs = GetCharacterJobs(LoadManifest(manifestPath), sendToUnreal)
+    finishedKeys = LoadJournal(journalPath)
+    jobKeys = {id(job) : GetJobKey(job) for job in jobs} # taken before the run, a scene saved while its character exports is exported again next time
+    skippedJobs = [job for job in jobs if jobKeys[id(job)] in finishedKeys]
+    jobsToRun = [job for job in jobs if jobKeys[id(job)] not in finishedKeys]
+    for job in skippedJobs:
+        print(f"character batch: {job.name} already finished in an earlier run, skipping")
+
+    def OnResult(result):
+        print(f"character batch: {result.job.name} {'done' if result.success else 'failed'} in {result.seconds:.1f}s")
+        if result.success:
+            AppendToJournal(journalPath, jobKeys[id(result.job)], result.job, result)
+        else:
+            print(result.error)
+
+    startTime = time.perf_counter()
+    results = RunBatch(jobsToRun, workerCommand, workerCount, retries, timeout, OnResult) if jobsToRun else []
+    summary = SummarizeBatch(results, time.perf_counter() - startTime)
+    summary["manifest"] = manifestPath
+    summary["skipped"] = [job.name for job in skippedJobs]
+    WriteBatchReport(reportPath, summary)
+    if not summary["failed"] and os.path.exists(journalPath):
+        os.remove(journalPath) # the journal is only there to resume a run that did not finish
+    print(f"character batch: {summary['succeeded']} exported, {summary['failed']} failed, {len(skippedJobs)} skipped, report at {reportPath}")
+    return summary
+
+def Main():
+    parser = argparse.ArgumentParser(description = "exports the characters of a manifest to fbx with MayaToUE, each in its own mayapy worker")
+    parser.add_argument("manifest", help = "json or yaml manifest of the characters to export")
+    parser.add_argument("--workers", type = int, default = 4, help = "how many characters export at the same time")
+    parser.add_argument("--retries", type = int, default = 1, help = "how many more times a failed character is tried")
+    parser.add_argument("--timeout", type = float, default = None, help = "seconds one character may take before its worker is stopped")
+    parser.add_argument("--report", default = None, help = "where to write the json timing report, next to the manifest by default")
+    parser.add_argument("--journal", default = None, help = "where to keep the list of finished characters, next to the manifest by default")
+    parser.add_argument("--restart", action = "store_true", help = "forget the journal and export every character again")
+    parser.add_argument("--send-to-unreal", action = "store_true", help = "import every character into the running unreal editor after exporting it")
+    arguments = parser.parse_args()
+
+    summary = RunCharacterBatch(arguments.manifest, arguments.workers, arguments.retries, arguments.timeout, arguments.report, arguments.journal, arguments.restart, arguments.send_to_unreal)
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(Main())
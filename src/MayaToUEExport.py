@@ -0,0 +1,432 @@
+import array
+import os
+import tempfile
+import time
+from BatchRunner import BatchJob, RunBatch, SplitByWeight, SummarizeBatch
+from ExportManifest import ExportManifest, HashAnimCurves, HashMeshData, HashValues
+from ExportSteps import ExportStep, RunExportStepsNow
+from MayaUtilities import ClassifyNodes, CreateCompleteVertComponent, GetDagPath, GetDependNode, IsJoint
+import maya.cmds as mc
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+import MayaPlugIns_Spring2025
+
+# what MayaToUE exports and how, without the window, nothing in here imports Qt so headless mayapy workers can run an export too
+# the window is in MayaToUE
+
+class AnimClip:
+    def __init__(self):
+        self.subfix = ""
+        self.frameMin = mc.playbackOptions(q = True, min = True)
+        self.frameMax = mc.playbackOptions(q = True, max = True)
+        self.shouldExport = True
+
+
+
+def ExportAnimationFBX(objectsToExport, exportPath, startFrame, endFrame):
+    mc.select(objectsToExport, r = True)
+
+    mc.FBXResetExport()
+    mc.FBXExportSmoothingGroups('-v', True)
+    mc.FBXExportInputConnections('-v', False)
+
+    mc.FBXExportBakeComplexAnimation('-v', True)
+    mc.FBXExportBakeComplexStart('-v', startFrame)
+    mc.FBXExportBakeComplexEnd('-v', endFrame)
+    mc.FBXExportBakeComplexStep('-v', 1)
+
+    mc.playbackOptions(e = True, min = startFrame, max = endFrame)
+    mc.FBXExport('-f', exportPath, '-s', True, '-ea', True)
+
+def MergeFrameRanges(frameRanges):
+    # overlapping and back to back ranges become one, so every frame is in exactly one range
+    mergedRanges = []
+    for startFrame, endFrame in sorted(frameRanges):
+        if mergedRanges and startFrame <= mergedRanges[-1][1] + 1:
+            mergedRanges[-1][1] = max(mergedRanges[-1][1], endFrame)
+        else:
+            mergedRanges.append([startFrame, endFrame])
+
+    return mergedRanges
+
+def ExportBakedAnimationFBX(objectsToExport, exportPath, takeName, startFrame, endFrame):
+    # the joints already carry baked keys, so fbx only slices the clip out of them instead of evaluating the rig again
+    mc.select(objectsToExport, r = True)
+
+    mc.FBXResetExport()
+    mc.FBXExportSmoothingGroups('-v', True)
+    mc.FBXExportInputConnections('-v', False)
+
+    mc.FBXExportBakeComplexAnimation('-v', False)
+    mc.FBXExportSplitAnimationIntoTakes('-c')
+    mc.FBXExportSplitAnimationIntoTakes('-v', takeName, startFrame, endFrame)
+    mc.FBXExportDeleteOriginalTakeOnSplitAnimation('-v', True)
+
+    mc.playbackOptions(e = True, min = startFrame, max = endFrame)
+    mc.FBXExport('-f', exportPath, '-s', True, '-ea', True)
+
+class MayaToUE:
+    def __init__(self):
+        self.rootJoint = ""
+        self.meshes = []
+        self.animationClips : list[AnimClip] = []
+        self.fileName = ""
+        self.saveDirectory = ""
+        self.exportWorkerCount = 0 # more than 0 exports the animation clips in that many background mayapy processes
+        self.lastExportSummary = None
+        self.onlyExportChanges = True # skips files whose frame range, objects and animation are the same as in the last export
+        self.lastSkippedExports = []
+        self.OnExportStatus = None # called with progress messages while an export runs, possibly from a worker thread
+        self.exportCancelEvent = None # a threading.Event, once it is set the export workers are killed and the unreal import is abandoned
+        self.unrealNodeIds = [] # the editors to import into, empty means the one used last (or the only one running)
+        self.unrealImportTimeout = None # seconds one editor gets to import when importing into several, None waits for all of them
+        self.lastImportResults = {}
+        self.sendToUnreal = True # off for headless exports that only write the fbx files
+        self.bakeClipsOnce = False # bakes the frames of all the clips in one go and slices every clip out of that, off until its fbx files are checked against a bake per clip
+        self.sharedBakeLayer = None
+        self.sharedBakeRestore = None # playback range and selection from before the shared bake
+
+    def GetAllJoints(self):
+        joints = []
+        joints.append(self.rootJoint)
+        children = mc.listRelatives(self.rootJoint, c = True, ad = True, type = "joint")
+        if children:
+            joints.extend(children)
+
+        return joints
+
+    def SaveFiles(self):
+        return RunExportStepsNow(self.GetExportSteps())
+
+    def GetExportSteps(self):
+        # reading the scene is maya work, what needs exporting is only known once the hashes are compared, so that step adds the rest
+        return [
+            ExportStep("Reading the scene", self.ReadExportInputs),
+            ExportStep("Checking for changes", self.PlanExport, runOnMainThread = False),
+        ]
+
+    def ReportExportStatus(self, message):
+        print(message)
+        if self.OnExportStatus:
+            self.OnExportStatus(message)
+
+    def ReadExportInputs(self):
+        self.exportManifest = ExportManifest(self.GetManifestPath())
+        self.exportObjects = sorted(self.GetAllObjectsToExport())
+        self.exportMeshData, self.exportSkinInputs = self.GetSkeletalMeshInputs()
+        self.exportCurveKeys = self.GetDrivingAnimCurveKeys()
+        self.exportClips = [animClip for animClip in self.animationClips if animClip.shouldExport]
+        self.failedExports = []
+        os.makedirs(self.GetAnimationDirectoryPath(), exist_ok = True)
+
+    def PlanExport(self):
+        # runs on a worker thread, so it only hashes what ReadExportInputs read and must not call maya
+        manifest = self.exportManifest
+        self.lastSkippedExports = []
+        steps = []
+
+        skeletalMeshPath = self.GetSkeletalMeshSavePath()
+        skeletalMeshEntry = {"objects" : self.exportObjects, "meshHash" : HashMeshData(self.exportMeshData), "skinHash" : HashValues(self.exportSkinInputs)}
+        if self.onlyExportChanges and manifest.IsUpToDate(skeletalMeshPath, skeletalMeshEntry):
+            self.lastSkippedExports.append(skeletalMeshPath)
+        else:
+            steps.append(ExportStep(f"Exporting {os.path.basename(skeletalMeshPath)}", lambda : self.ExportSkeletalMeshStep(skeletalMeshEntry)))
+
+        clipsToExport = []
+        clipEntries = {}
+        for animClip in self.exportClips:
+            clipEntry = {
+                "objects" : self.exportObjects,
+                "frameRange" : [animClip.frameMin, animClip.frameMax],
+                "curveHash" : HashAnimCurves(self.exportCurveKeys, animClip.frameMin, animClip.frameMax),
+            }
+            animExportPath = self.GetSavePathForAnimClip(animClip)
+            if self.onlyExportChanges and manifest.IsUpToDate(animExportPath, clipEntry):
+                self.lastSkippedExports.append(animExportPath)
+                continue
+
+            clipsToExport.append(animClip)
+            clipEntries[animClip] = clipEntry
+
+        if self.exportWorkerCount > 0 and len(clipsToExport) > 1:
+            steps.append(ExportStep("Saving a scene copy for the export workers", self.SaveWorkerScene))
+            steps.append(ExportStep(f"Exporting {len(clipsToExport)} clips in {min(self.exportWorkerCount, len(clipsToExport))} workers", lambda : self.ExportAnimClipsInWorkers(clipsToExport, clipEntries), runOnMainThread = False))
+        elif self.bakeClipsOnce and len(clipsToExport) > 1:
+            steps.extend(self.GetSharedBakeSteps(clipsToExport, clipEntries))
+        else:
+            for animClip in clipsToExport:
+                steps.append(ExportStep(f"Exporting {os.path.basename(self.GetSavePathForAnimClip(animClip))}", lambda animClip = animClip : self.ExportAnimClip(animClip, clipEntries[animClip])))
+
+        steps.append(ExportStep("Writing the export manifest", self.FinishExport, runOnMainThread = False))
+        if self.sendToUnreal:
+            steps.append(ExportStep("Sending to Unreal", self.SendToUnreal, runOnMainThread = False))
+        return steps
+
+    def ExportSkeletalMeshStep(self, skeletalMeshEntry):
+        self.ExportSkeletalMesh()
+        self.exportManifest.Record(self.GetSkeletalMeshSavePath(), skeletalMeshEntry)
+
+    def ExportAnimClip(self, animClip, clipEntry):
+        animExportPath = self.GetSavePathForAnimClip(animClip)
+        ExportAnimationFBX(self.GetAllObjectsToExport(), animExportPath, animClip.frameMin, animClip.frameMax)
+        self.exportManifest.Record(animExportPath, clipEntry)
+
+    def GetSharedBakeSteps(self, clipsToExport, clipEntries):
+        # the bake, every clip and the clean up are steps of their own, so maya stays responsive in between and a cancel stops after the current clip
+        frameRanges = MergeFrameRanges([(animClip.frameMin, animClip.frameMax) for animClip in clipsToExport])
+        bakedFrameCount = sum(endFrame - startFrame + 1 for startFrame, endFrame in frameRanges)
+        steps = [ExportStep(f"Baking {bakedFrameCount} frames for {len(clipsToExport)} clips", lambda : self.BakeSharedClips(frameRanges))]
+        for animClip in clipsToExport:
+            steps.append(ExportStep(f"Exporting {os.path.basename(self.GetSavePathForAnimClip(animClip))}", lambda animClip = animClip : self.ExportAnimClipFromSharedBake(animClip, clipEntries[animClip])))
+
+        steps.append(ExportStep("Removing the shared bake", self.RemoveSharedBake, alwaysRun = True))
+        return steps
+
+    def BakeSharedClips(self, frameRanges):
+        # the keys go on a temporary override layer instead of the joints' own curves, deleting the layer hands the joints back to the rig
+        # undo is off while the layer is made, without flushing it, so the artist's undo queue neither grows nor gets the bake back on an undo
+        self.sharedBakeRestore = (mc.playbackOptions(q = True, min = True), mc.playbackOptions(q = True, max = True), mc.ls(sl = True, l = True))
+        undoEnabled = mc.undoInfo(q = True, stateWithoutFlush = True)
+        mc.undoInfo(stateWithoutFlush = False)
+        try:
+            self.sharedBakeLayer = mc.animLayer("MayaToUE_SharedBake", override = True)
+            for startFrame, endFrame in frameRanges:
+                mc.bakeResults(self.GetAllJoints(), t = (startFrame, endFrame), sampleBy = 1, simulation = True, destinationLayer = self.sharedBakeLayer, disableImplicitControl = False) # the override hides the constraints and ik, they stay on
+        finally:
+            mc.undoInfo(stateWithoutFlush = undoEnabled)
+
+    def ExportAnimClipFromSharedBake(self, animClip, clipEntry):
+        animExportPath = self.GetSavePathForAnimClip(animClip)
+        ExportBakedAnimationFBX(self.GetAllObjectsToExport(), animExportPath, self.fileName + animClip.subfix, animClip.frameMin, animClip.frameMax)
+        self.exportManifest.Record(animExportPath, clipEntry)
+
+    def RemoveSharedBake(self):
+        # also runs after a failed or cancelled export, the bake may not have got as far as making the layer
+        bakeLayer, self.sharedBakeLayer = self.sharedBakeLayer, None
+        restore, self.sharedBakeRestore = self.sharedBakeRestore, None
+        undoEnabled = mc.undoInfo(q = True, stateWithoutFlush = True)
+        mc.undoInfo(stateWithoutFlush = False)
+        try:
+            if bakeLayer and mc.objExists(bakeLayer):
+                mc.delete(bakeLayer)
+
+            if restore:
+                playbackMin, playbackMax, selection = restore
+                mc.playbackOptions(e = True, min = playbackMin, max = playbackMax)
+                if selection:
+                    mc.select(selection, r = True)
+                else:
+                    mc.select(cl = True)
+        finally:
+            mc.undoInfo(stateWithoutFlush = undoEnabled)
+
+    def FinishExport(self):
+        self.exportManifest.Save()
+        for skippedPath in self.lastSkippedExports:
+            print(f"skipped {skippedPath}, nothing it is made from changed since the last export")
+
+        if self.failedExports:
+            raise Exception(f"failed to export animation clips: {', '.join(self.failedExports)}")
+
+    def GetManifestPath(self):
+        path = os.path.join(self.saveDirectory, self.fileName + "_exportManifest.json")
+        return os.path.normpath(path)
+
+    def GetDrivingAnimCurveKeys(self):
+        # every key of every anim curve upstream of the exported joints, read once and shared by all the clips
+        curves = mc.ls(mc.listHistory(self.GetAllJoints()) or [], type = "animCurve")
+        curveKeys = {}
+        for curve in curves:
+            times = mc.keyframe(curve, q = True, tc = True) or []
+            values = mc.keyframe(curve, q = True, vc = True) or []
+            inAngles = mc.keyTangent(curve, q = True, ia = True) or []
+            outAngles = mc.keyTangent(curve, q = True, oa = True) or []
+            inTangentTypes = mc.keyTangent(curve, q = True, itt = True) or []
+            outTangentTypes = mc.keyTangent(curve, q = True, ott = True) or []
+            curveKeys[curve] = [list(key) for key in zip(times, values, inAngles, outAngles, inTangentTypes, outTangentTypes)]
+
+        return curveKeys
+
+    def GetSkeletalMeshInputs(self):
+        # what the skeletal mesh fbx is made from: the rest shape of every mesh (the orig shape when it is deformed, so scrubbing the timeline
+        # does not count as a change), the face and uv topology and the skin weights of the shape that gets exported, all packed as bytes,
+        # and the influences, bind matrices and joint orients as plain values
+        meshData = []
+        skinInputs = []
+        for mesh in sorted(self.meshes):
+            shapes = mc.listRelatives(mesh, s = True, f = True) or []
+            restShapes = [shape for shape in shapes if mc.getAttr(shape + ".intermediateObject")] or shapes
+            for shape in restShapes:
+                points = om.MFnMesh(GetDagPath(shape)).getPoints()
+                meshData.append(array.array("d", (coordinate for point in points for coordinate in (point.x, point.y, point.z))).tobytes())
+
+            for shape in [shape for shape in shapes if shape not in restShapes] or restShapes:
+                shapePath = GetDagPath(shape)
+                meshFn = om.MFnMesh(shapePath)
+                meshData.extend(array.array("i", values).tobytes() for values in meshFn.getVertices())
+                for uvSet in meshFn.getUVSetNames():
+                    meshData.append(uvSet.encode("utf-8"))
+                    meshData.extend(array.array("f", values).tobytes() for values in meshFn.getUVs(uvSet))
+                    meshData.extend(array.array("i", values).tobytes() for values in meshFn.getAssignedUVs(uvSet))
+
+                for skin in mc.ls(mc.listHistory(shape) or [], type = "skinCluster"):
+                    skinFn = oma.MFnSkinCluster(GetDependNode(skin))
+                    weights, _ = skinFn.getWeights(shapePath, CreateCompleteVertComponent(meshFn.numVertices))
+                    meshData.append(array.array("d", weights).tobytes())
+                    skinInputs.append({
+                        "influences" : [influencePath.partialPathName() for influencePath in skinFn.influenceObjects()],
+                        "bindPreMatrices" : [mc.getAttr(f"{skin}.bindPreMatrix[{index}]") for index in mc.getAttr(skin + ".bindPreMatrix", mi = True) or []],
+                    })
+
+        jointOrients = {joint : mc.getAttr(joint + ".jointOrient") for joint in self.GetAllJoints()}
+        return meshData, {"skins" : skinInputs, "jointOrients" : jointOrients}
+
+    def GetAllObjectsToExport(self):
+        return self.GetAllJoints() + self.meshes
+
+    def ExportSkeletalMesh(self):
+        mc.select(self.GetAllObjectsToExport(), r = True)
+
+        mc.FBXResetExport()
+        mc.FBXExportSmoothingGroups('-v', True)
+        mc.FBXExportInputConnections('-v', False)
+
+        # -f means file name, -s means export selected, -ea means export animation
+        mc.FBXExport('-f', self.GetSkeletalMeshSavePath(), '-s', True, '-ea', False)
+
+    def SaveWorkerScene(self):
+        # every worker opens a copy of the current scene and bakes its own clips, so this session is only waiting
+        sceneFileHandle, self.workerScenePath = tempfile.mkstemp(prefix = "MayaToUE_", suffix = ".mb")
+        os.close(sceneFileHandle)
+        mc.file(self.workerScenePath, exportAll = True, preserveReferences = True, type = "mayaBinary", force = True) # writes a copy, the open scene keeps its name
+        self.workerExportObjects = self.GetAllObjectsToExport()
+
+    def ExportAnimClipsInWorkers(self, clipsToExport, clipEntries):
+        # only waits on the worker processes, so it can run off the main thread
+        # one job per worker, each opens the scene copy once and exports its share of the clips, split so every worker bakes about as many frames
+        clipFrames = [animClip.frameMax - animClip.frameMin + 1 for animClip in clipsToExport]
+        clipGroups = SplitByWeight(clipsToExport, clipFrames, self.exportWorkerCount)
+        jobs = []
+        for i, clipGroup in enumerate(clipGroups):
+            arguments = {
+                "scene" : self.workerScenePath,
+                "objects" : self.workerExportObjects,
+                "clips" : [{"exportPath" : self.GetSavePathForAnimClip(animClip), "startFrame" : animClip.frameMin, "endFrame" : animClip.frameMax} for animClip in clipGroup],
+            }
+            jobs.append(BatchJob(f"{self.fileName} clips {i + 1} of {len(clipGroups)}", "ExportAnimClips", arguments, sum(animClip.frameMax - animClip.frameMin + 1 for animClip in clipGroup)))
+
+        def OnResult(result):
+            if not result.success:
+                self.ReportExportStatus(f"failed to export {result.job.name}: {result.error}")
+                return
+
+            for clipResult in result.result["clips"]:
+                self.ReportExportStatus(f"exported {clipResult['exportPath']} in {clipResult['exportSeconds']:.1f}s" if clipResult["success"] else f"failed to export {clipResult['exportPath']}: {clipResult['error']}")
+
+        startTime = time.perf_counter()
+        try:
+            results = RunBatch(jobs, workerCount = len(jobs), OnResult = OnResult, cancelEvent = self.exportCancelEvent)
+        finally:
+            os.remove(self.workerScenePath)
+
+        self.lastExportSummary = SummarizeBatch(results, time.perf_counter() - startTime)
+        for clipGroup, result in zip(clipGroups, results):
+            clipResults = {clipResult["exportPath"] : clipResult for clipResult in result.result["clips"]} if result.success else {}
+            for animClip in clipGroup:
+                animExportPath = self.GetSavePathForAnimClip(animClip)
+                if clipResults.get(animExportPath, {}).get("success"):
+                    self.exportManifest.Record(animExportPath, clipEntries[animClip])
+                else:
+                    self.failedExports.append(self.fileName + animClip.subfix)
+
+    def SendToUnreal(self):
+        from UnrealSession import GetUnrealSession # the unreal transport only loads once something is sent, opening the tool does not need it
+
+        ueUtilPath = os.path.join(MayaPlugIns_Spring2025.sourceDirectory, "UnrealUtilities.py")
+        ueUtilPath = os.path.normpath(ueUtilPath)
+
+        meshPath = self.GetSkeletalMeshSavePath().replace("\\", "/")
+        animDir = self.GetAnimationDirectoryPath().replace("\\", "/")
+
+        # UnrealUtilities is installed in the editor once, after that only this call and its arguments are sent
+        if len(self.unrealNodeIds) < 2:
+            nodeId = self.unrealNodeIds[0] if self.unrealNodeIds else None
+            self.PrintImportReport(GetUnrealSession().CallRemote(ueUtilPath, "ImportMeshAndAnimation", meshPath, animDir, nodeId = nodeId, cancelEvent = self.exportCancelEvent))
+            return
+
+        # every chosen editor imports at the same time over its own connection, a slow one only holds up its own result
+        self.lastImportResults = GetUnrealSession().CallRemoteOnNodes(self.unrealNodeIds, ueUtilPath, "ImportMeshAndAnimation", meshPath, animDir, timeout = self.unrealImportTimeout, cancelEvent = self.exportCancelEvent)
+        failed = []
+        for nodeId, nodeResult in self.lastImportResults.items():
+            if not nodeResult["success"]:
+                failed.append(f"{nodeId}: {nodeResult['error']}")
+                continue
+
+            self.ReportExportStatus(f"Unreal Editor {nodeId} finished importing in {nodeResult['seconds']}s")
+            self.PrintImportReport(nodeResult["result"])
+
+        if failed:
+            raise Exception("failed to import in Unreal Editor(s):\n" + "\n".join(failed))
+
+    def PrintImportReport(self, importReport):
+        if importReport:
+            print(f"Unreal imported the mesh in {importReport['meshSeconds']}s, the animations in {importReport['animationBatchSeconds']}s and saved in {importReport['saveSeconds']}s")
+            for assetPath, seconds in importReport["animationSeconds"].items():
+                print(f"    {assetPath}: {seconds}s")
+
+    def GetAnimationDirectoryPath(self):
+        path = os.path.join(self.saveDirectory, "animations")
+        return os.path.normpath(path)
+
+    def GetSavePathForAnimClip(self, animClip: AnimClip):
+        path = os.path.join(self.GetAnimationDirectoryPath(), self.fileName + animClip.subfix + ".fbx")
+        return os.path.normpath(path)
+
+    def GetSkeletalMeshSavePath(self):
+        path = os.path.join(self.saveDirectory, self.fileName + ".fbx")
+        return os.path.normpath(path)
+
+    def RemoveAnimClip(self, clipToRemove: AnimClip):
+        self.animationClips.remove(clipToRemove)
+        print(f"animation clip removed, now we have: {len(self.animationClips)} left")
+
+    def AddNewAnimEntry(self):
+        self.animationClips.append(AnimClip())
+        print(f"animation clip added, now we have: {len(self.animationClips)} anim clip(s)")
+        return self.animationClips[-1]
+
+    def SetSelectionAsRootJoint(self):
+        selection = mc.ls(sl = True)
+        if not selection:
+            raise Exception("Nothing Selected! Please Select the Joint of the Rig!")
+        
+        selectedJoint = selection[0]
+        if not IsJoint(selectedJoint):
+            raise Exception(f"{selectedJoint} is not a joint, Please Select the Root Joint of the Rig!")
+        
+        self.rootJoint = selectedJoint
+
+    def AddRootJoint(self):
+        if (not self.rootJoint) or (not mc.objExists(self.rootJoint)):
+            raise Exception("No Root Joint Assigned, please set the current root joint of the rig first!")
+        
+        currentRootJointPositionX, currentRootJointPositionY, currentRootJointPositionZ = mc.xform(self.rootJoint, q = True, t = True, ws = True)
+        if currentRootJointPositionX == 0 and currentRootJointPositionY == 0 and currentRootJointPositionZ == 0:
+            raise Exception("current root joint is already at origin, no need to make a new one!")
+        
+        mc.select(cl = True)
+        rootJointName = self.rootJoint + "_root"
+        mc.joint(n = rootJointName)
+        mc.parent(self.rootJoint, rootJointName)
+        self.rootJoint = rootJointName
+
+    def AddMeshs(self):
+        selection = mc.ls(sl = True)
+        if not selection:
+            raise Exception("No Mesh Selected!")
+        
+        meshes = ClassifyNodes(selection).get("mesh", []) # one query for the whole selection
+        if len(meshes) == 0:
+            raise Exception("No Mesh Selected!")
+        
+        self.meshes = meshes
@@ -1,31 +1,27 @@
 import maya.cmds as mc
-import maya.OpenMayaUI as omui # this imports maya's open maya ai module, it can help find maya's main window
-import shiboken2 # this helps with converting the maya main window to the pyside type
+import maya.api.OpenMaya as om # the python api 2.0, used when we need to read or write lots of data in one go
 
-from PySide2.QtWidgets import (QMainWindow, QWidget) # imports all of the widgets needed to build our ui 
-from PySide2.QtCore import Qt # this has some values we can use to configure our widget, like our windowtype, or orientation
+# nothing in here imports Qt, so headless mayapy workers can use it, the window base class is in MayaWindow
 
-def GetMayaMainWindow()->QMainWindow: # function to search for and return maya's main window to be used as a reference
-    mayaMainWindow = omui.MQtUtil.mainWindow() # creates a reference for the main maya window
-    print(mayaMainWindow) # prints the name of the main maya window
-    return shiboken2.wrapInstance(int(mayaMainWindow), QMainWindow) # converts the value of the main maya window using shiboken2 library to be more easily worked with
+from ConnectionGraph import ConnectionIndexCache, Downstream, GetUniqueInOrder, Upstream
+from SceneQuery import ClassifyNodeInfos, NodeInfo
 
-def DeleteWindowWithName(name): # function to delete the old instance of the window we created if the user runs the code without first closing the old instance
-    for window in GetMayaMainWindow().findChildren(QWidget, name):
-        window.deleteLater() # looks for a previously created window we create for Maya and deletes it if it exists
+def GetDependNode(name)->om.MObject:
+    selectionList = om.MSelectionList()
+    selectionList.add(name)
+    return selectionList.getDependNode(0)
 
-class QMayaWindow(QWidget): # class we use to find the main maya window and create our new window to work with it
-    def __init__(self):
-        DeleteWindowWithName(self.GetWindowHash()) # looks for the previously created window with the hash we gave it
-        super().__init__(parent = GetMayaMainWindow()) # parents our new window under the main maya window
-        self.setWindowFlags(Qt.WindowType.Window) # sets the window we create as a window for maya to understand
-        self.setObjectName(self.GetWindowHash()) # gives the window a hash to be used later to find and delete it
-
-
-    def GetWindowHash(self): # function to get the hash for the window and return it to be used later
-        return "ukvgiayvbavbabvafkuvbvbfvbdsjhvbvcskdv"
-    
+def GetDagPath(name)->om.MDagPath:
+    selectionList = om.MSelectionList()
+    selectionList.add(name)
+    return selectionList.getDagPath(0)
 
+def CreateCompleteVertComponent(vertCount)->om.MObject:
+    # a component that covers vert 0 to vertCount - 1, for reading or writing per vertex data in one go
+    vertComponentFn = om.MFnSingleIndexedComponent()
+    vertComponent = vertComponentFn.create(om.MFn.kMeshVertComponent)
+    vertComponentFn.setCompleteData(vertCount)
+    return vertComponent
 
 def IsMesh(object):
     shapes = mc.listRelatives(object, s = True)
@@ -44,6 +40,8 @@ def IsSkin(object):
 def IsJoint(object):
     return mc.objectType(object) == "joint"
 
+typeFilters = {IsSkin : "skinCluster", IsJoint : "joint"}
+
 def GetUpperStream(object):
     return mc.listConnections(object, s = True, d = False, sh = True)
 
@@ -51,6 +49,17 @@ def GetLowerStream(object):
     return mc.listConnections(object, s = False, d = True, sh = True)
 
 def GetAllConnectionsIn(object, nextFunction, searchDepth = 10, Filter = None):
+    if nextFunction in (GetUpperStream, GetLowerStream):
+        # the common walks go through the cached index, and the type filters read the types it already recorded
+        index = GetConnectionIndex(object, Upstream if nextFunction is GetUpperStream else Downstream, searchDepth)
+        if not Filter:
+            return index.GetNodes()
+
+        if Filter in typeFilters:
+            return index.OfType(typeFilters[Filter])
+
+        return index.Filter(Filter)
+
     AllFound = set()
     nexts = nextFunction(object)
 
@@ -72,4 +81,101 @@ def GetAllConnectionsIn(object, nextFunction, searchDepth = 10, Filter = None):
         if Filter(found):
             filtered.append(found)
 
-    return filtered
\ No newline at end of file
+    return filtered
+
+class MayaConnectionBackend: # lets ConnectionGraph walk the maya scene
+    def ListConnections(self, nodes, direction):
+        if not nodes:
+            return []
+
+        return mc.listConnections(nodes, s = direction == Upstream, d = direction == Downstream, sh = True) or []
+
+    def GetNodeTypes(self, nodes):
+        if not nodes:
+            return {}
+
+        namesAndTypes = mc.ls(nodes, showType = True) # comes back flat, name, type, name, type...
+        foundTypes = dict(zip(namesAndTypes[0::2], namesAndTypes[1::2]))
+        return {node : foundTypes[node] if node in foundTypes else mc.objectType(node) for node in nodes}
+
+class MayaSceneBackend: # lets SceneQuery read the maya scene, every node goes into one selection list instead of a few commands per node
+    def QueryNodes(self, nodes):
+        selectionList = om.MSelectionList()
+        foundNodes = [] # (node, the selection list it is in, its index there)
+        for node in GetUniqueInOrder(nodes):
+            listLength = selectionList.length()
+            try:
+                selectionList.add(node)
+            except RuntimeError: # does not exist
+                continue
+
+            addedCount = selectionList.length() - listLength
+            if addedCount == 1:
+                foundNodes.append((node, selectionList, listLength))
+            elif addedCount == 0:
+                # another name of a node that is already in the list, add merged it into that entry, so it gets a list of its own
+                foundNodes.append((node, om.MSelectionList().add(node), 0))
+            else:
+                # the name matches more than one node, like an ambiguous short name, it is left out like a missing one
+                for index in reversed(range(listLength, listLength + addedCount)):
+                    selectionList.remove(index)
+
+        nodeInfos = {}
+        for node, nodeList, i in foundNodes:
+            mobject = nodeList.getDependNode(i)
+            if not mobject.hasFn(om.MFn.kDagNode):
+                nodeInfos[node] = NodeInfo(node, om.MFnDependencyNode(mobject).typeName)
+                continue
+
+            dagPath = nodeList.getDagPath(i)
+            dagNode = om.MFnDagNode(dagPath)
+            nodeInfo = NodeInfo(node, dagNode.typeName, dagPath.fullPathName(), dagNode.isIntermediateObject)
+            nodeInfo.worldMatrix = list(dagPath.inclusiveMatrix())
+            for childIndex in range(dagNode.childCount()):
+                childObject = dagNode.child(childIndex)
+                childNode = om.MFnDagNode(childObject)
+                if childObject.hasFn(om.MFn.kShape):
+                    nodeInfo.shapes.append(NodeInfo(childNode.partialPathName(), childNode.typeName, childNode.fullPathName(), childNode.isIntermediateObject))
+                else:
+                    nodeInfo.children.append(childNode.partialPathName())
+
+            nodeInfos[node] = nodeInfo
+
+        return nodeInfos
+
+sceneBackend = MayaSceneBackend()
+
+def QueryNodes(nodes, backend = None):
+    # node -> NodeInfo with the type, shapes, children and world matrix of every node, nodes that do not exist are left out
+    return (backend or sceneBackend).QueryNodes(nodes)
+
+def ClassifyNodes(nodes, backend = None):
+    # "mesh", "joint", "skinCluster" and so on -> the nodes of that kind, the batched version of IsMesh, IsJoint and IsSkin
+    return ClassifyNodeInfos(QueryNodes(nodes, backend))
+
+connectionIndexCache = ConnectionIndexCache(MayaConnectionBackend())
+connectionIndexCallbackIds = []
+
+def InvalidateConnectionIndices(*args):
+    connectionIndexCache.Invalidate()
+
+def RegisterConnectionIndexCallbacks():
+    # any change to the scene graph can change what a walk finds, so the cached walks are thrown away
+    if connectionIndexCallbackIds:
+        return
+
+    connectionIndexCallbackIds.append(om.MDGMessage.addConnectionCallback(InvalidateConnectionIndices))
+    connectionIndexCallbackIds.append(om.MDGMessage.addNodeRemovedCallback(InvalidateConnectionIndices))
+    connectionIndexCallbackIds.append(om.MNodeMessage.addNameChangedCallback(om.MObject.kNullObj, InvalidateConnectionIndices))
+    connectionIndexCallbackIds.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, InvalidateConnectionIndices))
+    connectionIndexCallbackIds.append(om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, InvalidateConnectionIndices))
+
+def RemoveConnectionIndexCallbacks():
+    if connectionIndexCallbackIds:
+        om.MMessage.removeCallbacks(connectionIndexCallbackIds)
+        connectionIndexCallbackIds.clear()
+
+def GetConnectionIndex(object, direction = Upstream, searchDepth = 10):
+    # walks once and remembers every node found with its type, ask it for as many types as needed
+    RegisterConnectionIndexCallbacks()
+    return connectionIndexCache.GetIndex(object, direction, searchDepth)
@@ -0,0 +1,113 @@
+import hashlib
+import os
+import tempfile
+import numpy as np
+from ProxyRigUtilities import PackSegments, UnpackSegments
+
+# stores the face ownership and the built segments of proxy rigs on disk, keyed by everything they are computed from
+# so a character that has not changed skips the partition and the segment building on the next build
+
+class ProxyPartitionCache:
+    def __init__(self, directory, maxBytes = 512 * 1024 * 1024):
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def GetKey(self, faceVertCounts, faceVertIndices, influences, vertOwners):
+        # the partition only sees the weights through the dominant influence of every vert, so that goes in instead of the
+        # whole weight matrix, it is a fraction of the bytes to hash and a weight repaint that moves no owner keeps its entry
+        hasher = hashlib.blake2b(digest_size = 20)
+        hasher.update(np.ascontiguousarray(faceVertCounts, dtype = np.int32).tobytes())
+        hasher.update(np.ascontiguousarray(faceVertIndices, dtype = np.int32).tobytes())
+        hasher.update("\n".join(influences).encode("utf-8"))
+        hasher.update(np.ascontiguousarray(vertOwners, dtype = np.int32).tobytes())
+        return hasher.hexdigest()
+
+    def GetEntryPath(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def Load(self, key, influences):
+        entryPath = self.GetEntryPath(key)
+        if not os.path.exists(entryPath):
+            self.misses += 1
+            return None
+
+        try:
+            with np.load(entryPath) as entry:
+                faceOwners = entry["faceOwners"]
+                segments = UnpackSegments(entry, influences)
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            print(f"dropping unreadable proxy partition cache entry {entryPath}: {e}")
+            self.RemoveEntry(entryPath)
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(entryPath) # the modified time is the last used time, the oldest entries are evicted first
+        except OSError:
+            pass # another worker evicted it after it was read, what was read is still good
+
+        self.hits += 1
+        return faceOwners, segments
+
+    def Save(self, key, faceOwners, segments, influences):
+        os.makedirs(self.directory, exist_ok = True)
+        entryPath = self.GetEntryPath(key)
+        # every save gets its own temp file, so workers building the same character at once never write into each other's file
+        tempHandle, tempPath = tempfile.mkstemp(dir = self.directory, suffix = ".tmp.npz")
+        try:
+            with os.fdopen(tempHandle, "wb") as tempFile:
+                np.savez(tempFile, faceOwners = np.asarray(faceOwners, dtype = np.int32), **PackSegments(segments, influences))
+
+            os.replace(tempPath, entryPath) # never leaves a half written entry behind
+        except OSError as e:
+            # usually another worker had the same entry open or replaced it first, its entry is just as good as this one
+            print(f"could not save proxy partition cache entry {entryPath}, skipping it: {e}")
+            self.RemoveEntry(tempPath)
+            return
+
+        self.Evict()
+
+    def GetEntries(self):
+        # (path, size, last used) of every entry, oldest first
+        if not os.path.isdir(self.directory):
+            return []
+
+        entries = []
+        for fileName in os.listdir(self.directory):
+            if not fileName.endswith(".npz") or fileName.endswith(".tmp.npz"):
+                continue
+
+            entryPath = os.path.join(self.directory, fileName)
+            try:
+                stat = os.stat(entryPath)
+            except OSError:
+                continue # removed by another worker since the listing
+            entries.append((entryPath, stat.st_size, stat.st_mtime))
+
+        entries.sort(key = lambda entry : entry[2])
+        return entries
+
+    def Evict(self):
+        entries = self.GetEntries()
+        totalBytes = sum(size for _, size, _ in entries)
+        for entryPath, size, _ in entries:
+            if totalBytes <= self.maxBytes:
+                break
+
+            self.RemoveEntry(entryPath)
+            totalBytes -= size
+            self.evictions += 1
+
+    def RemoveEntry(self, entryPath):
+        try:
+            os.remove(entryPath)
+        except OSError:
+            pass
+
+    def GetReport(self):
+        entries = self.GetEntries()
+        totalMegabytes = sum(size for _, size, _ in entries) / (1024 * 1024)
+        return f"proxy partition cache: {self.hits} hit(s), {self.misses} miss(es), {self.evictions} eviction(s), {len(entries)} entries using {totalMegabytes:.1f} MB of {self.maxBytes / (1024 * 1024):.0f} MB"
@@ -0,0 +1,162 @@
+import base64
+import numpy as np
+import zlib
+
+# everything in here works on plain numpy arrays so it can run and be checked without maya
+
+def GetDominantInfluences(weights):
+    # weights is a vertex x influence matrix, returns the column of the biggest weight for every vertex
+    # argmax keeps the first influence on a tie, the same as the old per vertex loop did
+    weights = np.asarray(weights)
+    if weights.ndim != 2:
+        raise ValueError(f"weights should be a vertex x influence matrix, got shape {weights.shape}")
+
+    if weights.shape[0] == 0:
+        return np.zeros(0, dtype = np.int32)
+
+    return np.argmax(weights, axis = 1).astype(np.int32)
+
+def GroupIndicesByLabel(labels, labelCount):
+    # returns a list with one sorted index array per label, label i owns every index where labels == i
+    labels = np.asarray(labels, dtype = np.int64)
+    order = np.argsort(labels, kind = "stable").astype(np.int32)
+    counts = np.bincount(labels, minlength = labelCount)
+    return np.split(order, np.cumsum(counts)[:-1])
+
+def GenerateInfluenceVertGroups(weights, influences):
+    # maps every influence name to the array of vertex indices it is the dominant influence of
+    if len(influences) != np.shape(weights)[1]:
+        raise ValueError(f"got {len(influences)} influences for a weight matrix with {np.shape(weights)[1]} columns")
+
+    dominantInfluences = GetDominantInfluences(weights)
+    groups = GroupIndicesByLabel(dominantInfluences, len(influences))
+    return dict(zip(influences, groups))
+
+def GetIndexRanges(indices):
+    # collapses sorted indices into inclusive (start, end) runs so [1, 2, 3, 7] becomes [(1, 3), (7, 7)]
+    indices = np.asarray(indices, dtype = np.int64)
+    if indices.size == 0:
+        return []
+
+    breaks = np.flatnonzero(np.diff(indices) != 1)
+    starts = np.concatenate(([indices[0]], indices[breaks + 1]))
+    ends = np.concatenate((indices[breaks], [indices[-1]]))
+    return list(zip(starts.tolist(), ends.tolist()))
+
+class ProxySegment:
+    def __init__(self, joint, faces, polygonCounts, polygonConnects, sourceVerts):
+        self.joint = joint
+        self.faces = faces # face indices of the source mesh that belong to this segment
+        self.polygonCounts = polygonCounts # vert count of every face of the segment
+        self.polygonConnects = polygonConnects # segment vert indices of every face, in the layout MFnMesh.create wants
+        self.sourceVerts = sourceVerts # sourceVerts[i] is the source mesh vert that segment vert i came from
+
+def GetFaceOffsets(faceVertCounts):
+    # where each face starts in the flat face vert index array
+    faceVertCounts = np.asarray(faceVertCounts, dtype = np.int64)
+    return np.concatenate(([0], np.cumsum(faceVertCounts)[:-1])).astype(np.int64)
+
+def GetFaceOwners(faceVertCounts, faceVertIndices, vertOwners, ownerCount):
+    # a face goes to the owner of most of its verts, a tie goes to the lower owner index
+    faceVertCounts = np.asarray(faceVertCounts, dtype = np.int64)
+    faceVertOwners = np.asarray(vertOwners, dtype = np.int64)[np.asarray(faceVertIndices, dtype = np.int64)]
+    faceIds = np.repeat(np.arange(len(faceVertCounts), dtype = np.int64), faceVertCounts)
+
+    keys, keyCounts = np.unique(faceIds * ownerCount + faceVertOwners, return_counts = True)
+    keyFaces = keys // ownerCount
+    keyOwners = keys % ownerCount
+
+    # sorted by face, then by most verts, then by owner, so the first entry of every face is the winner
+    order = np.lexsort((keyOwners, -keyCounts, keyFaces))
+    sortedFaces = keyFaces[order]
+    isWinner = np.ones(len(order), dtype = bool)
+    isWinner[1:] = sortedFaces[1:] != sortedFaces[:-1]
+
+    faceOwners = np.zeros(len(faceVertCounts), dtype = np.int32)
+    faceOwners[sortedFaces[isWinner]] = keyOwners[order][isWinner]
+    return faceOwners
+
+def BuildSegmentTopology(faces, faceVertCounts, faceVertIndices, faceOffsets):
+    # cuts the given faces out of the flat topology arrays and renumbers their verts from 0
+    faces = np.asarray(faces, dtype = np.int64)
+    polygonCounts = np.asarray(faceVertCounts, dtype = np.int64)[faces]
+
+    faceStarts = np.repeat(faceOffsets[faces], polygonCounts)
+    cornerInFace = np.arange(polygonCounts.sum(), dtype = np.int64) - np.repeat(np.cumsum(polygonCounts) - polygonCounts, polygonCounts)
+    sourceConnects = np.asarray(faceVertIndices, dtype = np.int64)[faceStarts + cornerInFace]
+
+    sourceVerts, polygonConnects = np.unique(sourceConnects, return_inverse = True)
+    return polygonCounts.astype(np.int32), polygonConnects.astype(np.int32), sourceVerts.astype(np.int32)
+
+def PartitionMesh(faceVertCounts, faceVertIndices, vertOwners, influences):
+    # assigns every face to one influence in a single pass and builds one segment per influence that owns faces
+    faceOwners = GetFaceOwners(faceVertCounts, faceVertIndices, vertOwners, len(influences))
+    return BuildSegments(faceOwners, faceVertCounts, faceVertIndices, influences)
+
+def BuildSegments(faceOwners, faceVertCounts, faceVertIndices, influences):
+    faceOffsets = GetFaceOffsets(faceVertCounts)
+    segments = []
+    for influence, faces in zip(influences, GroupIndicesByLabel(faceOwners, len(influences))):
+        if len(faces) == 0:
+            continue
+
+        polygonCounts, polygonConnects, sourceVerts = BuildSegmentTopology(faces, faceVertCounts, faceVertIndices, faceOffsets)
+        segments.append(ProxySegment(influence, faces, polygonCounts, polygonConnects, sourceVerts))
+
+    return segments
+
+def PackSegments(segments, influences):
+    # flattens the segments into a few arrays that can be saved in one npz, UnpackSegments gives them back
+    influenceIndices = {influence : index for index, influence in enumerate(influences)}
+    packed = {
+        "segmentOwners" : np.array([influenceIndices[segment.joint] for segment in segments], dtype = np.int32),
+        "segmentFaceCounts" : np.array([len(segment.faces) for segment in segments], dtype = np.int32),
+        "segmentCornerCounts" : np.array([len(segment.polygonConnects) for segment in segments], dtype = np.int32),
+        "segmentVertCounts" : np.array([len(segment.sourceVerts) for segment in segments], dtype = np.int32),
+    }
+    for name in ("faces", "polygonCounts", "polygonConnects", "sourceVerts"):
+        packed[name] = np.concatenate([np.asarray(getattr(segment, name), dtype = np.int32) for segment in segments]) if segments else np.zeros(0, dtype = np.int32)
+
+    return packed
+
+def UnpackSegments(packed, influences):
+    def Split(values, counts):
+        return np.split(values, np.cumsum(counts)[:-1]) if len(counts) else []
+
+    faces = Split(packed["faces"], packed["segmentFaceCounts"])
+    polygonCounts = Split(packed["polygonCounts"], packed["segmentFaceCounts"])
+    polygonConnects = Split(packed["polygonConnects"], packed["segmentCornerCounts"])
+    sourceVerts = Split(packed["sourceVerts"], packed["segmentVertCounts"])
+    owners = packed["segmentOwners"].tolist()
+    return [ProxySegment(influences[owners[i]], faces[i], polygonCounts[i], polygonConnects[i], sourceVerts[i]) for i in range(len(owners))]
+
+def RemapSegmentWeights(weights, sourceVerts, sourceInfluences, targetInfluences):
+    # takes the weight rows of the segment verts and reorders the columns to the target skinCluster influence order
+    # a target influence the source skin does not have gets zero weight
+    sourceColumns = {influence : column for column, influence in enumerate(sourceInfluences)}
+    segmentWeights = np.asarray(weights, dtype = np.float64)[np.asarray(sourceVerts, dtype = np.int64)]
+
+    remapped = np.zeros((len(segmentWeights), len(targetInfluences)), dtype = np.float64)
+    for targetColumn, influence in enumerate(targetInfluences):
+        if influence in sourceColumns:
+            remapped[:, targetColumn] = segmentWeights[:, sourceColumns[influence]]
+
+    return remapped
+
+def EncodeIndexArray(indices):
+    # packs an index array into a short string that can be kept in a maya string attribute
+    packed = zlib.compress(np.ascontiguousarray(indices, dtype = np.int32).tobytes())
+    return base64.b64encode(packed).decode("ascii")
+
+def DecodeIndexArray(text):
+    return np.frombuffer(zlib.decompress(base64.b64decode(text)), dtype = np.int32).copy()
+
+def GetChangedSegmentOwners(oldFaceOwners, newFaceOwners, oldInfluences, newInfluences):
+    # names of the influences whose segment gained or lost faces, which is when the segment verts change too
+    # returns None when the topology or the influence list changed, then the only option is a full rebuild
+    if list(oldInfluences) != list(newInfluences) or len(oldFaceOwners) != len(newFaceOwners):
+        return None
+
+    changedFaces = np.flatnonzero(np.asarray(oldFaceOwners) != np.asarray(newFaceOwners))
+    changedOwners = np.union1d(np.asarray(oldFaceOwners)[changedFaces], np.asarray(newFaceOwners)[changedFaces])
+    return {newInfluences[owner] for owner in changedOwners.tolist()}
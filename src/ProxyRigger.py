@@ -1,71 +1,79 @@
-import importlib
-import MayaUtilities
-importlib.reload(MayaUtilities)
-
-from MayaUtilities import * # the * imports everything in the file be careful using this
-from PySide2.QtWidgets import QPushButton, QVBoxLayout
+from ConnectionGraph import Upstream
+from MayaUtilities import CreateCompleteVertComponent, GetConnectionIndex, GetDagPath, GetDependNode, IsMesh
+from MayaWindow import QMayaWindow
+from BatchRunner import BatchJob, RunBatch, SummarizeBatch, WriteBatchReport
+from ProxyPartitionCache import ProxyPartitionCache
+from ProxyRigUtilities import BuildSegments, DecodeIndexArray, EncodeIndexArray, GenerateInfluenceVertGroups, GetChangedSegmentOwners, GetDominantInfluences, GetFaceOwners, RemapSegmentWeights
+from PySide2.QtWidgets import QFileDialog, QPushButton, QVBoxLayout
 import maya.cmds as mc
+import maya.utils
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+import json
+import numpy as np
+import os
+import tempfile
+import threading
+import time
 
 class ProxyRigger:
     def __init__(self):
         self.skin = ""
         self.model = ""
+        self.modelShape = ""
         self.joints = []
-
-    def CreateProxyRigFromSelectedMesh(self):
+        self.weights = None # vertex x influence skin weight matrix of the model, filled in by GenerateProxySegments
+        self.influences = []
+        self.transferWeightsByIndex = True # False goes back to copySkinWeights with a closest point search
+        self.faceOwners = None # index into influences of the joint that owns each face, filled in by GenerateProxySegments
+        self.influencesAttr = "proxyInfluences"
+        self.faceOwnersAttr = "proxyFaceOwners"
+        self.partitionCache = ProxyPartitionCache(os.path.join(mc.internalVar(uad = True), "ProxyRiggerCache"))
+
+    def FindSkinAndJointsOfSelectedMesh(self):
         mesh = mc.ls(sl = True)[0]
         if not IsMesh(mesh):
             raise TypeError(f"{mesh} is not a mesh! Please select a mesh")
         
         self.model = mesh
-        modelShape = mc.listRelatives(self.model, s = True)[0]
+        modelShape = mc.listRelatives(self.model, s = True, ni = True)[0]
+        self.modelShape = modelShape
         print(f"found mesh {mesh}, and shape {modelShape}")
 
-        skin = GetAllConnectionsIn(modelShape, GetUpperStream, 10, IsSkin)
+        upstreamIndex = GetConnectionIndex(modelShape, Upstream, 10)
+        skin = upstreamIndex.OfType("skinCluster")
         if not skin:
             raise Exception(f"{mesh} has no skin! Tool only works with a rigged model")
         
         self.skin = skin[0]
 
-        joints = GetAllConnectionsIn(modelShape, GetUpperStream, 10, IsJoint)
+        joints = upstreamIndex.OfType("joint")
         if not joints:
             raise Exception(f"{mesh} has no joints bound! Tool only works with a rigged model.")
         
         self.joints = joints
 
+    def CreateProxyRigFromSelectedMesh(self):
+        self.FindSkinAndJointsOfSelectedMesh()
         print(f"start build with mesh: {self.model}, skin: {self.skin}, and joints: {self.joints}")
 
-        jointVertMap = self.GenerateJointVertDict()
+        proxySegments = self.GenerateProxySegments()
+        points = self.GetMeshPoints()
         segments = []
         controls = []
-        for joint, verts in jointVertMap.items():
-            print(f"joint {joints} controls {verts} primarily")
-            newSeg = self.CreateProxyModelForJointAndVerts(joint, verts)
-            if newSeg is None:
-                continue
-
-            newSkinCluster = mc.skinCluster(self.joints, newSeg)[0]
-            mc.copySkinWeights(ss = self.skin, ds = newSkinCluster, nm = True, sa = "closestPoint", ia = "closestJoint")
+        for proxySegment in proxySegments:
+            print(f"joint {proxySegment.joint} controls {len(proxySegment.faces)} faces primarily")
+            newSeg = self.CreateProxySegment(proxySegment, points)
             segments.append(newSeg)
+            controls.append(self.CreateProxyControlForJoint(proxySegment.joint, newSeg))
 
-            controlLocator = "ac_" + joint + "_proxy"
-            mc.spaceLocator(n = controlLocator)
-            controlLocatorGrp = controlLocator + "_grp"
-            mc.group(controlLocator, n = controlLocatorGrp)
-            mc.matchTransform(controlLocatorGrp, joint)
-
-            visibilityAttr = "vis"
-            mc.addAttr(controlLocator, ln = visibilityAttr, min = 0, max = 1, dv = 1, k = True)
-            mc.connectAttr(controlLocator + "." + visibilityAttr, newSeg + ".v")
-            controls.append(controlLocatorGrp)
-
-        proxyTopGrp = self.model + "_proxy_grp"
+        proxyTopGrp = self.GetProxyTopGroupName()
         mc.group(segments, n = proxyTopGrp)
 
-        controlTopGrp = "ac_" + self.model + "_proxy_grp"
+        controlTopGrp = self.GetControlTopGroupName()
         mc.group(controls, n = controlTopGrp)
 
-        globalProxyControl = "ac_" + self.model + "_proxy_global"
+        globalProxyControl = self.GetGlobalProxyControlName()
         mc.circle(n = globalProxyControl, r = 30)
         mc.parent(proxyTopGrp, globalProxyControl)
         mc.parent(controlTopGrp, globalProxyControl)
@@ -75,61 +83,209 @@ class ProxyRigger:
         mc.addAttr(globalProxyControl, ln = visibilityAttr, min = 0, max = 1, dv = 1, k = True)
         mc.connectAttr(globalProxyControl + "." + visibilityAttr, proxyTopGrp + ".v")
 
+        self.RecordBuildState(globalProxyControl)
+
+    def UpdateProxyRigFromSelectedMesh(self):
+        # only rebuilds the segments whose faces changed owner since the last build, the controls are left alone
+        startTime = time.perf_counter()
+        self.FindSkinAndJointsOfSelectedMesh()
+
+        globalProxyControl = self.GetGlobalProxyControlName()
+        if not mc.objExists(globalProxyControl) or not mc.attributeQuery(self.faceOwnersAttr, node = globalProxyControl, exists = True):
+            raise Exception(f"{self.model} has no proxy rig to update, please generate the proxy rig first!")
+
+        oldInfluences = json.loads(mc.getAttr(globalProxyControl + "." + self.influencesAttr))
+        oldFaceOwners = DecodeIndexArray(mc.getAttr(globalProxyControl + "." + self.faceOwnersAttr))
+
+        proxySegments = self.GenerateProxySegments()
+        changedJoints = GetChangedSegmentOwners(oldFaceOwners, self.faceOwners, oldInfluences, self.influences)
+        if changedJoints is None:
+            raise Exception(f"the topology or the joints of {self.model} changed since the last build, please generate a new proxy rig!")
+
+        points = None
+        proxyTopGrp = self.GetProxyTopGroupName()
+        rebuiltSegments = []
+        for proxySegment in proxySegments:
+            joint = proxySegment.joint
+            segmentName = self.GetProxySegmentName(joint)
+            if joint not in changedJoints and mc.objExists(segmentName):
+                # same verts as before, but the weights inside the segment may still have been painted
+                if self.transferWeightsByIndex:
+                    segmentShape = mc.listRelatives(segmentName, s = True, ni = True)[0]
+                    self.SetSegmentSkinWeights(proxySegment, segmentName, GetConnectionIndex(segmentShape, Upstream, 10).OfType("skinCluster")[0])
+                continue
 
-    def CreateProxyModelForJointAndVerts(self, joint, verts):
-        if not verts:
-            return None
-        
-        faces = mc.polyListComponentConversion(verts, fromVertex = True, toFace = True)
-        faces = mc.ls(faces, fl = True)
+            if points is None:
+                points = self.GetMeshPoints()
 
-        labels = set() # a set is like a list, but it only holds unique elements, it is not ordered, and it is faster than a list when it comes to looking for things
-        for face in faces:
-            labels.add(face.replace(self.model, ""))
-            
-        dupe = mc.duplicate(self.model)[0]
+            if mc.objExists(segmentName):
+                mc.delete(segmentName)
 
-        allDupeFaces = mc.ls(f"{dupe}.f[*]", fl = True)
-        facesToDelete = []
-        for dupeFace in allDupeFaces:
-            label = dupeFace.replace(dupe, "")
-            if label not in labels:
-                facesToDelete.append(dupeFace)
+            newSeg = self.CreateProxySegment(proxySegment, points)
+            mc.parent(newSeg, proxyTopGrp)
+            rebuiltSegments.append(newSeg)
 
-        mc.delete(facesToDelete)
+            controlLocator = self.GetProxyControlName(joint)
+            if mc.objExists(controlLocator):
+                mc.connectAttr(controlLocator + ".vis", newSeg + ".v")
+            else:
+                mc.parent(self.CreateProxyControlForJoint(joint, newSeg), self.GetControlTopGroupName())
 
-        dupeName = self.model + "_" + joint + "_proxy"
-        mc.rename(dupe, dupeName)
-        return dupeName
+        # joints that lost every face they had no longer get a segment
+        segmentJoints = {proxySegment.joint for proxySegment in proxySegments}
+        for joint in changedJoints - segmentJoints:
+            if mc.objExists(self.GetProxySegmentName(joint)):
+                mc.delete(self.GetProxySegmentName(joint))
 
+        self.RecordBuildState(globalProxyControl)
+        print(f"updated proxy rig of {self.model} in {time.perf_counter() - startTime:.2f}s, rebuilt {len(rebuiltSegments)} of {len(proxySegments)} segments: {rebuiltSegments}")
 
-    def GenerateJointVertDict(self):
-        dict = {}
-        for joint in self.joints:
-            dict[joint] = []
+    def RecordBuildState(self, globalProxyControl):
+        # keeps the face ownership of this build on the rig itself, so an update can diff against it even after reopening the scene
+        for attr in (self.influencesAttr, self.faceOwnersAttr):
+            if not mc.attributeQuery(attr, node = globalProxyControl, exists = True):
+                mc.addAttr(globalProxyControl, ln = attr, dt = "string")
+
+        mc.setAttr(globalProxyControl + "." + self.influencesAttr, json.dumps(self.influences), type = "string")
+        mc.setAttr(globalProxyControl + "." + self.faceOwnersAttr, EncodeIndexArray(self.faceOwners), type = "string")
+
+    def CreateProxySegment(self, proxySegment, points):
+        newSeg = self.CreateProxyModelForSegment(proxySegment, points)
+        self.TransferSkinWeights(proxySegment, newSeg)
+        return newSeg
+
+    def CreateProxyControlForJoint(self, joint, proxyModel):
+        controlLocator = self.GetProxyControlName(joint)
+        mc.spaceLocator(n = controlLocator)
+        controlLocatorGrp = controlLocator + "_grp"
+        mc.group(controlLocator, n = controlLocatorGrp)
+        mc.matchTransform(controlLocatorGrp, joint)
+
+        visibilityAttr = "vis"
+        mc.addAttr(controlLocator, ln = visibilityAttr, min = 0, max = 1, dv = 1, k = True)
+        mc.connectAttr(controlLocator + "." + visibilityAttr, proxyModel + ".v")
+        return controlLocatorGrp
+
+    def GetProxySegmentName(self, joint):
+        return self.model + "_" + joint + "_proxy"
+
+    def GetProxyControlName(self, joint):
+        return "ac_" + joint + "_proxy"
+
+    def GetProxyTopGroupName(self):
+        return self.model + "_proxy_grp"
+
+    def GetControlTopGroupName(self):
+        return "ac_" + self.model + "_proxy_grp"
+
+    def GetGlobalProxyControlName(self):
+        return "ac_" + self.model + "_proxy_global"
+
+    def CreateProxyModelForSegment(self, proxySegment, points):
+        # builds the segment straight from its own faces, so nothing gets duplicated or string matched
+        segmentPoints = [om.MPoint(x, y, z) for x, y, z in points[proxySegment.sourceVerts].tolist()]
+        newTransform = om.MFnMesh().create(segmentPoints, proxySegment.polygonCounts.tolist(), proxySegment.polygonConnects.tolist())
 
-        verts = mc.ls(f"{self.model}.vtx[*]", fl = True)
-        for vert in verts:
-            owningJoint = self.GetJointWithMaxInfluence(vert, self.skin)
-            dict[owningJoint].append(vert)
+        segmentName = mc.rename(om.MFnDagNode(newTransform).partialPathName(), self.GetProxySegmentName(proxySegment.joint))
+        mc.sets(segmentName, e = True, forceElement = "initialShadingGroup")
+        return segmentName
 
-        return dict
+    def TransferSkinWeights(self, proxySegment, proxyModel):
+        if not self.transferWeightsByIndex:
+            newSkinCluster = mc.skinCluster(self.joints, proxyModel)[0]
+            mc.copySkinWeights(ss = self.skin, ds = newSkinCluster, nm = True, sa = "closestPoint", ia = "closestJoint")
+            return newSkinCluster
+
+        newSkinCluster = mc.skinCluster(self.influences, proxyModel, tsb = True)[0]
+        self.SetSegmentSkinWeights(proxySegment, proxyModel, newSkinCluster)
+        return newSkinCluster
+
+    def SetSegmentSkinWeights(self, proxySegment, proxyModel, skinCluster):
+        # every segment vert is a copy of a source vert, so its weights can be looked up directly instead of searched for
+        skinFn = oma.MFnSkinCluster(GetDependNode(skinCluster))
+        shapePath = GetDagPath(mc.listRelatives(proxyModel, s = True, ni = True)[0])
+        targetInfluences = [influencePath.partialPathName() for influencePath in skinFn.influenceObjects()]
+
+        segmentWeights = RemapSegmentWeights(self.weights, proxySegment.sourceVerts, self.influences, targetInfluences)
+
+        vertComponent = CreateCompleteVertComponent(len(proxySegment.sourceVerts))
+
+        influenceIndices = om.MIntArray(list(range(len(targetInfluences))))
+        skinFn.setWeights(shapePath, vertComponent, influenceIndices, om.MDoubleArray(segmentWeights.ravel().tolist()), normalize = False)
 
-    def GetJointWithMaxInfluence(self, vert, skin):
-        weights = mc.skinPercent(skin, vert, q = True, v = True)
-        joints = mc.skinPercent(skin, vert, q = True, t = None)
+    def GenerateProxySegments(self):
+        self.weights, self.influences = self.GetSkinWeightMatrix()
+        faceVertCounts, faceVertIndices = self.GetMeshTopology()
+        vertOwners = GetDominantInfluences(self.weights)
+
+        cacheKey = self.partitionCache.GetKey(faceVertCounts, faceVertIndices, self.influences, vertOwners)
+        cachedPartition = self.partitionCache.Load(cacheKey, self.influences)
+        if cachedPartition is None:
+            faceOwners = GetFaceOwners(faceVertCounts, faceVertIndices, vertOwners, len(self.influences))
+            proxySegments = BuildSegments(faceOwners, faceVertCounts, faceVertIndices, self.influences)
+            self.partitionCache.Save(cacheKey, faceOwners, proxySegments, self.influences)
+        else:
+            faceOwners, proxySegments = cachedPartition
+
+        self.faceOwners = faceOwners
+        print(self.partitionCache.GetReport())
+        return proxySegments
+
+    def GetMeshTopology(self):
+        faceVertCounts, faceVertIndices = om.MFnMesh(GetDagPath(self.modelShape)).getVertices()
+        faceVertCounts = np.fromiter(faceVertCounts, dtype = np.int32, count = len(faceVertCounts))
+        faceVertIndices = np.fromiter(faceVertIndices, dtype = np.int32, count = len(faceVertIndices))
+        return faceVertCounts, faceVertIndices
+
+    def GetMeshPoints(self):
+        points = mc.xform(f"{self.modelShape}.vtx[*]", q = True, ws = True, t = True)
+        return np.array(points, dtype = np.float64).reshape(-1, 3)
+
+    def GenerateJointVertDict(self):
+        weights, influences = self.GetSkinWeightMatrix()
+        return GenerateInfluenceVertGroups(weights, influences)
 
-        maxWeightIndex = 0
-        maxWeight = weights[0]
+    def GetSkinWeightMatrix(self):
+        # reads the weights of every vertex in one call instead of 2 skinPercent queries per vertex
+        skinFn = oma.MFnSkinCluster(GetDependNode(self.skin))
+        shapePath = GetDagPath(self.modelShape)
 
-        for i in range(1, len(weights)):
-            if weights[i] > maxWeight:
-                maxWeight = weights[i]
-                maxWeightIndex = i
+        vertComponent = CreateCompleteVertComponent(om.MFnMesh(shapePath).numVertices)
 
-        return joints[maxWeightIndex]
+        weights, influenceCount = skinFn.getWeights(shapePath, vertComponent)
+        weightMatrix = np.fromiter(weights, dtype = np.float64, count = len(weights)).reshape(-1, influenceCount)
+        influences = [influencePath.partialPathName() for influencePath in skinFn.influenceObjects()]
+        return weightMatrix, influences
         
 
+def RunProxyRigBatch(scenes, outputDirectory, workerCount = 4, retries = 1, workerCommand = None):
+    # builds proxy rigs for every skinned mesh of every scene, each scene in its own headless mayapy
+    jobs = [BatchJob(os.path.basename(scene), "ProxyRig", {"scene" : scene, "outputDirectory" : outputDirectory}, os.path.getsize(scene)) for scene in scenes]
+    return RunProxyRigJobs(jobs, outputDirectory, workerCount, retries, workerCommand)
+
+def RunProxyRigBatchOnMeshes(scene, meshes, outputDirectory, workerCount = 4, retries = 1, workerCommand = None):
+    # builds a proxy rig for each of the given meshes of one scene, each mesh in its own headless mayapy
+    # every worker opens the same scene, rigs only its mesh and saves the result as <mesh>_proxy next to the others
+    sceneExtension = os.path.splitext(scene)[1]
+    jobs = []
+    for mesh in meshes:
+        outputName = mesh.strip("|").replace("|", "_").replace(":", "_") # full paths, so meshes with the same short name get their own scene
+        arguments = {"scene" : scene, "meshes" : [mesh], "outputScene" : os.path.join(outputDirectory, outputName + "_proxy" + sceneExtension)}
+        jobs.append(BatchJob(mesh, "ProxyRig", arguments))
+
+    return RunProxyRigJobs(jobs, outputDirectory, workerCount, retries, workerCommand)
+
+def RunProxyRigJobs(jobs, outputDirectory, workerCount, retries, workerCommand):
+    startTime = time.perf_counter()
+    def OnResult(result):
+        # called from the batch runner threads, the message is handed to the maya main thread like the batch buttons do (mayapy runs it right away)
+        maya.utils.executeDeferred(print, f"proxy rig batch: {result.job.name} {'done' if result.success else 'failed'} in {result.seconds:.1f}s")
+
+    results = RunBatch(jobs, workerCommand, workerCount, retries, OnResult = OnResult)
+    summary = SummarizeBatch(results, time.perf_counter() - startTime)
+    WriteBatchReport(os.path.join(outputDirectory, "proxyRigBatchReport.json"), summary)
+    return summary
+
 class ProxyRiggerWidget(QMayaWindow):
     def __init__(self):
         super().__init__()
@@ -140,13 +296,65 @@ class ProxyRiggerWidget(QMayaWindow):
         generateProxyRigButton = QPushButton("Generate Proxy Rig")
         self.masterLayout.addWidget(generateProxyRigButton)
         generateProxyRigButton.clicked.connect(self.GenerateProxyRigButtonClicked)
+        updateProxyRigButton = QPushButton("Update Proxy Rig")
+        self.masterLayout.addWidget(updateProxyRigButton)
+        updateProxyRigButton.clicked.connect(self.UpdateProxyRigButtonClicked)
+        batchProxyRigButton = QPushButton("Batch Proxy Rig Scenes...")
+        self.masterLayout.addWidget(batchProxyRigButton)
+        batchProxyRigButton.clicked.connect(self.BatchProxyRigButtonClicked)
+        batchProxyRigMeshesButton = QPushButton("Batch Proxy Rig Selected Meshes...")
+        self.masterLayout.addWidget(batchProxyRigMeshesButton)
+        batchProxyRigMeshesButton.clicked.connect(self.BatchProxyRigMeshesButtonClicked)
 
     def GenerateProxyRigButtonClicked(self):
         self.proxyRigger.CreateProxyRigFromSelectedMesh()
 
+    def UpdateProxyRigButtonClicked(self):
+        self.proxyRigger.UpdateProxyRigFromSelectedMesh()
+
+    def BatchProxyRigButtonClicked(self):
+        scenes, _ = QFileDialog.getOpenFileNames(self, "Scenes to Proxy Rig", "", "Maya Scenes (*.ma *.mb)")
+        if not scenes:
+            return
+
+        outputDirectory = QFileDialog.getExistingDirectory(self, "Output Directory")
+        if not outputDirectory:
+            return
+
+        # the workers are separate processes, so this session only waits on them in the background
+        def RunInBackground():
+            summary = RunProxyRigBatch(scenes, outputDirectory)
+            maya.utils.executeDeferred(print, f"proxy rig batch finished: {summary['succeeded']} of {summary['total']} scenes done in {summary['wallSeconds']}s, report in {outputDirectory}")
+
+        threading.Thread(target = RunInBackground, daemon = True).start()
+
+    def BatchProxyRigMeshesButtonClicked(self):
+        meshes = [selected for selected in mc.ls(sl = True, l = True) if IsMesh(selected)]
+        if not meshes:
+            raise Exception("select the skinned meshes to build proxy rigs for")
+
+        outputDirectory = QFileDialog.getExistingDirectory(self, "Output Directory")
+        if not outputDirectory:
+            return
+
+        # the workers open a copy of the open scene, it may have unsaved changes and they must not touch the file the user has open
+        sceneFileHandle, workerScene = tempfile.mkstemp(prefix = "ProxyRigger_", suffix = ".mb")
+        os.close(sceneFileHandle)
+        mc.file(workerScene, exportAll = True, preserveReferences = True, type = "mayaBinary", force = True) # writes a copy, the open scene keeps its name
+
+        def RunInBackground():
+            try:
+                summary = RunProxyRigBatchOnMeshes(workerScene, meshes, outputDirectory)
+            finally:
+                os.remove(workerScene)
+            maya.utils.executeDeferred(print, f"proxy rig batch finished: {summary['succeeded']} of {summary['total']} meshes done in {summary['wallSeconds']}s, report in {outputDirectory}")
+
+        threading.Thread(target = RunInBackground, daemon = True).start()
+
     def GetWindowHash(self):
         return "712890f8c1f9b099b91b6e9aa2fcc0830973ff04"
 
 def Run():
     proxyRiggerWidget = ProxyRiggerWidget()
-    proxyRiggerWidget.show()
\ No newline at end of file
+    proxyRiggerWidget.show()
+    return proxyRiggerWidget
\ No newline at end of file
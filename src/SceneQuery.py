@@ -0,0 +1,105 @@
+# reads what the tools need to know about many nodes at once through a backend, so the same queries run on the maya scene
+# (MayaUtilities.MayaSceneBackend) or on a made up scene held in memory (SceneGraph)
+# a backend has one method, QueryNodes(nodes) -> {node : NodeInfo}, nodes that do not exist are left out
+
+from ConnectionGraph import GetUniqueInOrder
+
+identityMatrix = [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0]
+
+class NodeInfo: # one node, with its shapes and children, as one query saw it
+    def __init__(self, name, nodeType, path = None, intermediate = False):
+        self.name = name
+        self.type = nodeType
+        self.path = path or name
+        self.intermediate = intermediate
+        self.shapes = [] # NodeInfo of every shape right under the node, intermediate ones included
+        self.children = [] # names of the transforms and joints right under the node
+        self.worldMatrix = None # 16 floats, row major like maya, None for nodes that are not in the dag
+
+    def GetShapeTypes(self, includeIntermediate = True):
+        return [shape.type for shape in self.shapes if includeIntermediate or not shape.intermediate]
+
+    def GetWorldPosition(self):
+        if self.worldMatrix is None:
+            return None
+
+        return tuple(self.worldMatrix[12:15])
+
+    def GetClassification(self):
+        # a transform with a mesh shape is a mesh, like MayaUtilities.IsMesh, everything else goes by its own type
+        if "mesh" in self.GetShapeTypes():
+            return "mesh"
+
+        return self.type
+
+def ClassifyNodeInfos(nodeInfos):
+    # classification -> nodes, in the order they were asked for
+    classified = {}
+    for node, nodeInfo in nodeInfos.items():
+        classified.setdefault(nodeInfo.GetClassification(), []).append(node)
+
+    return classified
+
+class SceneGraph: # in memory backend, nodes are added by hand
+    def __init__(self):
+        self.nodes = {} # name -> (type, parent, local translation, intermediate)
+        self.children = {}
+
+    def AddNode(self, node, nodeType, parent = None, translation = (0.0, 0.0, 0.0), intermediate = False):
+        if parent is not None and parent not in self.nodes:
+            raise KeyError(f"{parent} is not in the scene, add it before its children")
+
+        self.nodes[node] = (nodeType, parent, tuple(translation), intermediate)
+        self.children[node] = []
+        if parent is not None:
+            self.children[parent].append(node)
+
+    def GetPath(self, node):
+        path = []
+        while node is not None:
+            path.append(node)
+            node = self.nodes[node][1]
+
+        return "|" + "|".join(reversed(path))
+
+    def GetWorldMatrix(self, node):
+        # translations only, enough to stand in for the placement queries the tools make
+        x, y, z = 0.0, 0.0, 0.0
+        while node is not None:
+            _, node, (tx, ty, tz), _ = self.nodes[node]
+            x, y, z = x + tx, y + ty, z + tz
+
+        return identityMatrix[:12] + [x, y, z, 1.0]
+
+    def GetNodeInfo(self, node):
+        nodeType, _, _, intermediate = self.nodes[node]
+        nodeInfo = NodeInfo(node, nodeType, self.GetPath(node), intermediate)
+        nodeInfo.worldMatrix = self.GetWorldMatrix(node)
+        for child in self.children[node]:
+            if self.IsShape(child):
+                nodeInfo.shapes.append(self.GetNodeInfo(child))
+            else:
+                nodeInfo.children.append(child)
+
+        return nodeInfo
+
+    def IsShape(self, node):
+        return self.nodes[node][0] in ("mesh", "nurbsCurve", "nurbsSurface", "locator")
+
+    def FindNode(self, name):
+        # takes short names and full or partial dag paths like maya does, None when nothing matches
+        shortName = name.rsplit("|", 1)[-1]
+        if shortName not in self.nodes:
+            return None
+
+        path = self.GetPath(shortName)
+        return shortName if name == shortName or path == name or path.endswith("|" + name) else None
+
+    def QueryNodes(self, nodes):
+        nodeInfos = {}
+        for node in GetUniqueInOrder(nodes):
+            foundNode = self.FindNode(node)
+            if foundNode is not None:
+                nodeInfos[node] = self.GetNodeInfo(foundNode)
+
+        return nodeInfos
@@ -0,0 +1,120 @@
+import math
+import re
+
+# finds the limbs of a whole skeleton from its hierarchy and joint positions, nothing in here needs maya
+# joints are dag paths like "|root|hips|leg_l", a joint's parent is the path up to its last "|"
+
+sideTokens = {
+    "left" : ["l", "lf", "lft", "left"],
+    "right" : ["r", "rt", "rgt", "right"],
+}
+sideColors = {
+    "left" : (0.0, 0.3, 1.0),
+    "right" : (1.0, 0.1, 0.1),
+    "center" : (1.0, 0.9, 0.0),
+}
+namePartPattern = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+") # splits "L_upperArm01" into L, upper, Arm, 01
+
+class LimbChain:
+    def __init__(self, joints, side, mirrorKey, length):
+        self.root, self.mid, self.end = joints
+        self.side = side
+        self.mirrorKey = mirrorKey # the name with its side taken out, the left and right version of a limb share it
+        self.length = length
+        self.mirror = None # the chain on the other side, when there is one
+
+    def GetJoints(self):
+        return [self.root, self.mid, self.end]
+
+def GetShortName(joint):
+    return joint.rsplit("|", 1)[-1].rsplit(":", 1)[-1]
+
+def GetSide(jointName):
+    # (side, name with the side part swapped for #), "L_arm", "arm_l", "leftArm" and "LeftArm" are all left arms
+    nameParts = namePartPattern.findall(GetShortName(jointName))
+    for i, namePart in enumerate(nameParts):
+        for side, tokens in sideTokens.items():
+            if namePart.lower() in tokens:
+                return side, "_".join(nameParts[:i] + ["#"] + nameParts[i + 1:]).lower()
+
+    return "center", "_".join(nameParts).lower()
+
+def GetChildren(parents):
+    # parents maps a joint to its parent joint, or to None for a joint without a parent joint
+    children = {joint : [] for joint in parents}
+    for joint, parent in parents.items():
+        if parent in children:
+            children[parent].append(joint)
+
+    for childList in children.values():
+        childList.sort()
+
+    return children
+
+def GetUnbranchedRuns(parents):
+    # every run of joints where each joint but the last has exactly one child, so a limb never crosses a branch
+    children = GetChildren(parents)
+    runs = []
+    for joint, parent in sorted(parents.items()):
+        if parent in children and len(children[parent]) == 1:
+            continue # the middle of a run, it gets picked up from the joint that starts it
+
+        run = [joint]
+        while len(children[run[-1]]) == 1:
+            run.append(children[run[-1]][0])
+
+        runs.append(run)
+
+    return runs
+
+def GetDistance(positions, first, second):
+    return math.dist(positions[first], positions[second])
+
+def GetBestWindow(run, positions, minBoneRatio):
+    # the three joints in a row with the longest bones, a clavicle before the arm or a short toe after the foot is left out
+    best = None
+    for i in range(len(run) - 2):
+        window = run[i:i + 3]
+        upperLength = GetDistance(positions, window[0], window[1])
+        lowerLength = GetDistance(positions, window[1], window[2])
+        if min(upperLength, lowerLength) <= 0 or min(upperLength, lowerLength) / max(upperLength, lowerLength) < minBoneRatio:
+            continue
+
+        if best is None or upperLength + lowerLength > best[1]:
+            best = (window, upperLength + lowerLength)
+
+    return best
+
+def FindLimbChains(parents, positions, minRelativeLength = 0.25, minBoneRatio = 0.3, includeCenter = False):
+    # every three joint chain worth rigging as a limb, with its left/right partner set on chain.mirror
+    # chains shorter than minRelativeLength of the longest one (fingers, toes, face joints) are dropped
+    # center chains (spine, neck, tail) are only kept with includeCenter, they are usually not ik/fk limbs
+    chains = []
+    for run in GetUnbranchedRuns(parents):
+        best = GetBestWindow(run, positions, minBoneRatio)
+        if best is None:
+            continue
+
+        window, length = best
+        side, mirrorKey = GetSide(window[0])
+        if side == "center" and not includeCenter:
+            continue
+
+        chains.append(LimbChain(window, side, mirrorKey, length))
+
+    if not chains:
+        return []
+
+    longestLength = max(chain.length for chain in chains)
+    chains = [chain for chain in chains if chain.length >= longestLength * minRelativeLength]
+    PairChains(chains)
+    return sorted(chains, key = lambda chain : (chain.mirrorKey, chain.side))
+
+def PairChains(chains):
+    chainsBySideAndKey = {(chain.side, chain.mirrorKey) : chain for chain in chains}
+    for chain in chains:
+        if chain.side == "left":
+            mirror = chainsBySideAndKey.get(("right", chain.mirrorKey))
+            if mirror:
+                chain.mirror = mirror
+                mirror.mirror = chain
@@ -0,0 +1,242 @@
+import asyncio
+import atexit
+import concurrent.futures
+import hashlib
+import json
+import os
+import threading
+import time
+import remote_execution
+from remote_execution_async import AsyncRemoteExecution, CommandNotSentError, RemoteExecutionLoopThread
+
+# one remote execution session for the whole maya session, instead of discovering and connecting on every export
+
+BootstrapRequired = "MAYATOUE_BOOTSTRAP_REQUIRED"
+ResultMarker = "MAYATOUE_RESULT "
+
+# installs the helper source as a module inside the editor, under a name that includes its hash
+BootstrapTemplate = """import sys, types
+for _name in [name for name in sys.modules if name.startswith({modulePrefix!r}) and name != {moduleName!r}]:
+    del sys.modules[_name]
+_module = types.ModuleType({moduleName!r})
+_module.__file__ = {sourcePath!r}
+exec(compile({source!r}, {sourcePath!r}, "exec"), _module.__dict__)
+sys.modules[{moduleName!r}] = _module
+"""
+
+# a call only carries the function name and json arguments, and asks for a bootstrap when the module is not there
+CallTemplate = """import json, sys
+_module = sys.modules.get({moduleName!r})
+if _module is None:
+    raise RuntimeError({bootstrapRequired!r})
+_result = getattr(_module, {functionName!r})(*json.loads({args!r}), **json.loads({kwargs!r}))
+print({resultMarker!r} + json.dumps(_result, default = str))
+"""
+
+class RemoteModule: # a helper file that gets installed in the editor once and then called into
+    def __init__(self, sourcePath):
+        self.sourcePath = os.path.normpath(sourcePath)
+        self.source = ""
+        self.sourceHash = ""
+        self.sourceModifiedTime = None
+
+    def Refresh(self):
+        # only reads the file again when it changed on disk
+        modifiedTime = os.path.getmtime(self.sourcePath)
+        if modifiedTime != self.sourceModifiedTime:
+            with open(self.sourcePath, "r") as sourceFile:
+                self.source = sourceFile.read()
+
+            self.sourceHash = hashlib.sha1(self.source.encode("utf-8")).hexdigest()
+            self.sourceModifiedTime = modifiedTime
+
+    def GetModulePrefix(self):
+        return "MayaToUE_" + os.path.splitext(os.path.basename(self.sourcePath))[0] + "_"
+
+    def GetModuleName(self):
+        return self.GetModulePrefix() + self.sourceHash[:16]
+
+    def GetBootstrapCommand(self):
+        return BootstrapTemplate.format(modulePrefix = self.GetModulePrefix(), moduleName = self.GetModuleName(), sourcePath = self.sourcePath.replace("\\", "/"), source = self.source)
+
+    def GetCallCommand(self, functionName, args, kwargs):
+        return CallTemplate.format(moduleName = self.GetModuleName(), bootstrapRequired = BootstrapRequired, functionName = functionName, args = json.dumps(args), kwargs = json.dumps(kwargs), resultMarker = ResultMarker)
+
+def GetRemoteResult(commandResult):
+    # the call prints its return value as json on a marked line of the command output
+    for outputEntry in reversed(commandResult.get("output") or []):
+        for outputLine in reversed(outputEntry.get("output", "").splitlines()):
+            if outputLine.startswith(ResultMarker):
+                return json.loads(outputLine[len(ResultMarker):])
+
+    return None
+
+class UnrealSession:
+    def __init__(self, discoveryTimeout = 5.0, config = None):
+        self.discoveryTimeout = discoveryTimeout # how long to wait for an unreal editor to answer the discovery ping
+        self.config = config or remote_execution.RemoteExecutionConfig()
+        self.loopThread = RemoteExecutionLoopThread() # the transport runs on its own event loop, so maya only waits when it wants a result
+        self.remoteExecution = None
+        self.nodeId = "" # the editor used last, it is picked again as long as it is still around
+        self.lock = threading.RLock()
+        self.connectLocks = {} # node id -> asyncio lock, so two calls do not both open a connection to the same editor
+        self.remoteModules = {} # source path -> RemoteModule
+
+    def Start(self):
+        with self.lock:
+            if self.remoteExecution is None:
+                remoteExecution = AsyncRemoteExecution(self.config)
+                self.loopThread.run(remoteExecution.start())
+                self.remoteExecution = remoteExecution
+
+    def Stop(self):
+        with self.lock:
+            if self.remoteExecution is not None:
+                self.loopThread.run(self.remoteExecution.stop())
+                self.remoteExecution = None
+                self.connectLocks = {}
+
+            self.loopThread.stop()
+
+    def Submit(self, coroutine):
+        # hands a coroutine of this session to the transport loop and returns a concurrent future right away
+        self.Start()
+        return self.loopThread.submit(coroutine)
+
+    def Wait(self, coroutine, cancelEvent = None):
+        # with a cancelEvent (a threading.Event) the wait checks it every so often and cancels the coroutine once it is set
+        future = self.Submit(coroutine)
+        if cancelEvent is None:
+            return future.result()
+
+        while True:
+            try:
+                return future.result(timeout = 0.1)
+            except concurrent.futures.TimeoutError:
+                if cancelEvent.is_set():
+                    future.cancel()
+                    raise Exception("cancelled while waiting on Unreal")
+
+    def GetNodes(self, timeout = None):
+        # pings and listens for the whole window, every running editor gets to answer, not only the quickest one
+        self.Start()
+        return self.Wait(self.remoteExecution.discover_remote_nodes(self.discoveryTimeout if timeout is None else timeout))
+
+    async def ConnectAsync(self, nodeId = None):
+        nodeIds = [node["node_id"] for node in await self.remoteExecution.wait_for_remote_nodes(self.discoveryTimeout)]
+        if not nodeIds:
+            raise Exception("No Unreal Editor found! Please open Unreal and enable Python Remote Execution in the project settings.")
+
+        if nodeId is None:
+            nodeId = self.nodeId if self.nodeId in nodeIds else nodeIds[0]
+        elif nodeId not in nodeIds:
+            raise Exception(f"Unreal Editor {nodeId} is no longer running!")
+
+        async with self.connectLocks.setdefault(nodeId, asyncio.Lock()):
+            if self.remoteExecution.get_command_connection(nodeId) is None:
+                await self.remoteExecution.open_command_connection(nodeId)
+
+        self.nodeId = nodeId
+        return nodeId
+
+    def Connect(self, nodeId = None):
+        return self.Wait(self.ConnectAsync(nodeId))
+
+    def Disconnect(self, nodeId = None):
+        with self.lock:
+            if self.remoteExecution is not None:
+                self.Wait(self.remoteExecution.close_command_connection(nodeId or self.nodeId))
+
+    async def RunCommandAsync(self, command, execMode = remote_execution.MODE_EXEC_FILE, nodeId = None):
+        # a connection that broke before the command went out (editor restarted, socket dropped) is reopened and the command sent once more
+        # once it went out it may have run in the editor already, a failure then is raised, sending it again could import everything twice
+        for attempt in range(2):
+            connectedNodeId = None
+            try:
+                connectedNodeId = await self.ConnectAsync(nodeId)
+                return await self.remoteExecution.run_command(connectedNodeId, command, exec_mode = execMode)
+            except CommandNotSentError:
+                await self.remoteExecution.close_command_connection(connectedNodeId)
+                if attempt > 0:
+                    raise
+            except (OSError, RuntimeError, asyncio.CancelledError):
+                if connectedNodeId:
+                    await self.remoteExecution.close_command_connection(connectedNodeId) # the editor may still answer, that answer must not be read as the next call's
+
+                raise
+
+    def RunCommand(self, command, execMode = remote_execution.MODE_EXEC_FILE, nodeId = None):
+        return self.Wait(self.RunCommandAsync(command, execMode, nodeId))
+
+    def GetRemoteModule(self, sourcePath):
+        with self.lock:
+            remoteModule = self.remoteModules.setdefault(os.path.normpath(sourcePath), RemoteModule(sourcePath))
+            remoteModule.Refresh()
+            return remoteModule
+
+    async def CallRemoteAsync(self, sourcePath, functionName, *args, nodeId = None, **kwargs):
+        # runs functionName from the helper file inside the editor, the file itself is only sent when the editor does not have this version yet
+        remoteModule = self.GetRemoteModule(sourcePath)
+        nodeId = await self.ConnectAsync(nodeId)
+
+        # the call goes first, the module name carries the source hash so a stale or missing version asks for the bootstrap
+        callCommand = remoteModule.GetCallCommand(functionName, args, kwargs)
+        commandResult = await self.RunCommandAsync(callCommand, nodeId = nodeId)
+        if not commandResult["success"] and BootstrapRequired in str(commandResult["result"]):
+            # first call into this editor, the helper changed, or the editor lost the module after a python reset
+            await self.InstallRemoteModuleAsync(remoteModule, nodeId)
+            commandResult = await self.RunCommandAsync(callCommand, nodeId = nodeId)
+
+        if not commandResult["success"]:
+            raise RuntimeError(f"{functionName} failed in Unreal: {commandResult['result']}")
+
+        return GetRemoteResult(commandResult)
+
+    def CallRemote(self, sourcePath, functionName, *args, nodeId = None, cancelEvent = None, **kwargs):
+        return self.Wait(self.CallRemoteAsync(sourcePath, functionName, *args, nodeId = nodeId, **kwargs), cancelEvent)
+
+    def SubmitCallRemote(self, sourcePath, functionName, *args, nodeId = None, **kwargs):
+        # same as CallRemote but returns a future right away, so maya work can go on while the editor is busy
+        return self.Submit(self.CallRemoteAsync(sourcePath, functionName, *args, nodeId = nodeId, **kwargs))
+
+    async def CallRemoteOnNodeAsync(self, nodeId, timeout, sourcePath, functionName, args, kwargs):
+        # never raises, a failed or timed out editor is reported in its own result so the other editors carry on
+        startTime = time.perf_counter()
+        nodeResult = {"success" : False, "result" : None, "error" : "", "seconds" : 0.0}
+        try:
+            nodeResult["result"] = await asyncio.wait_for(self.CallRemoteAsync(sourcePath, functionName, *args, nodeId = nodeId, **kwargs), timeout)
+            nodeResult["success"] = True
+        except asyncio.TimeoutError:
+            nodeResult["error"] = f"timed out after {timeout}s"
+            await self.remoteExecution.close_command_connection(nodeId) # the editor may still answer later, that answer must not be read as the next call's
+        except Exception as e:
+            nodeResult["error"] = f"{e}"
+
+        nodeResult["seconds"] = round(time.perf_counter() - startTime, 3)
+        return nodeResult
+
+    async def CallRemoteOnNodesAsync(self, nodeIds, sourcePath, functionName, *args, timeout = None, **kwargs):
+        # every editor gets its own command connection and they all run at the same time
+        nodeResults = await asyncio.gather(*[self.CallRemoteOnNodeAsync(nodeId, timeout, sourcePath, functionName, args, kwargs) for nodeId in nodeIds])
+        return dict(zip(nodeIds, nodeResults))
+
+    def CallRemoteOnNodes(self, nodeIds, sourcePath, functionName, *args, timeout = None, cancelEvent = None, **kwargs):
+        # node id -> {"success", "result", "error", "seconds"}
+        return self.Wait(self.CallRemoteOnNodesAsync(list(nodeIds), sourcePath, functionName, *args, timeout = timeout, **kwargs), cancelEvent)
+
+    async def InstallRemoteModuleAsync(self, remoteModule, nodeId):
+        bootstrapResult = await self.RunCommandAsync(remoteModule.GetBootstrapCommand(), nodeId = nodeId)
+        if not bootstrapResult["success"]:
+            raise RuntimeError(f"failed to install {remoteModule.sourcePath} in Unreal: {bootstrapResult['result']}")
+
+        print(f"installed {os.path.basename(remoteModule.sourcePath)} version {remoteModule.sourceHash[:16]} in Unreal Editor {nodeId}")
+
+unrealSession = None
+
+def GetUnrealSession():
+    global unrealSession
+    if unrealSession is None:
+        unrealSession = UnrealSession()
+        atexit.register(unrealSession.Stop)
+
+    return unrealSession
@@ -1,20 +1,21 @@
 import unreal
 import os
+import time
 
-def CreateBaseImportTask(importPath):
+def CreateBaseImportTask(importPath, save = True):
     importTask = unreal.AssetImportTask()
     importTask.filename = importPath
 
     fileName = os.path.basename(importPath).split(".")[0]
     importTask.destination_path = '/Game/' + fileName
     importTask.automated = True
-    importTask.save = True
+    importTask.save = save # batched imports leave this off and save every package once at the end
     importTask.replace_existing = True
 
     return importTask
 
-def ImportSkeletalMesh(meshPath):
-    importTask = CreateBaseImportTask(meshPath)
+def ImportSkeletalMesh(meshPath, save = True):
+    importTask = CreateBaseImportTask(meshPath, save)
 
     importOption = unreal.FbxImportUI()
     importOption.import_mesh = True
@@ -31,8 +32,8 @@ def ImportSkeletalMesh(meshPath):
 
     return importTask.get_objects()[-1]
 
-def ImportAnimation(mesh: unreal.SkeletalMesh, animPath):
-    importTask = CreateBaseImportTask(animPath)
+def CreateAnimationImportTask(mesh: unreal.SkeletalMesh, animPath, save = True):
+    importTask = CreateBaseImportTask(animPath, save)
     meshDirectory = os.path.dirname(mesh.get_path_name())
     importTask.destination_path = meshDirectory + "/animations"
 
@@ -47,17 +48,75 @@ def ImportAnimation(mesh: unreal.SkeletalMesh, animPath):
     importOptions.set_editor_property('mesh_type_to_import', unreal.FBXImportType.FBXIT_ANIMATION)
 
     importTask.options = importOptions
+    return importTask
 
+def ImportAnimation(mesh: unreal.SkeletalMesh, animPath):
+    importTask = CreateAnimationImportTask(mesh, animPath)
     unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks([importTask])
 
-
-
-def ImportMeshAndAnimation(meshPath, animDir):
-    mesh = ImportSkeletalMesh(meshPath)
-    for fileName in os.listdir(animDir):
-        if ".fbx" in fileName:
-            animPath = os.path.join(animDir, fileName)
-            ImportAnimation(mesh, animPath)
+def ImportAnimations(mesh: unreal.SkeletalMesh, animPaths):
+    # builds every task first and imports them all in one call, nothing is saved until SaveImportedPackages
+    # returns the seconds per asset and the imported assets, for SaveImportedPackages
+    importTasks = [CreateAnimationImportTask(mesh, animPath, False) for animPath in animPaths]
+    if not importTasks:
+        return {}, []
+
+    # the import subsystem reports each asset as it finishes, so one batch still gives a time per asset
+    assetSeconds = {}
+    lastFinishTime = [time.perf_counter()]
+    def AssetImported(factory, createdObject):
+        now = time.perf_counter()
+        assetSeconds[createdObject.get_path_name()] = round(now - lastFinishTime[0], 3)
+        lastFinishTime[0] = now
+
+    importSubsystem = unreal.get_editor_subsystem(unreal.ImportSubsystem) if hasattr(unreal, "ImportSubsystem") else None
+    if importSubsystem:
+        importSubsystem.on_asset_post_import.add_callable(AssetImported)
+
+    try:
+        unreal.AssetToolsHelpers.get_asset_tools().import_asset_tasks(importTasks)
+    finally:
+        if importSubsystem:
+            importSubsystem.on_asset_post_import.remove_callable(AssetImported)
+
+    return assetSeconds, [importedObject for importTask in importTasks for importedObject in importTask.get_objects()]
+
+def GetSkeletalMeshAssets(mesh: unreal.SkeletalMesh):
+    # a mesh import without a skeleton set also creates the skeleton and the physics asset next to the mesh
+    return [asset for asset in (mesh, mesh.skeleton, mesh.get_editor_property("physics_asset")) if asset]
+
+def SaveImportedPackages(importedAssets):
+    # one save for the packages of the imported assets, instead of one save per asset
+    # only these are saved, unrelated packages the user has dirtied in the editor are left alone
+    if not unreal.EditorAssetLibrary.save_loaded_assets(importedAssets, only_if_is_dirty = True):
+        unreal.log_warning(f"could not save every one of the {len(importedAssets)} imported asset(s)")
+
+def IsFbxFile(fileName):
+    return os.path.splitext(fileName)[1].lower() == ".fbx"
+
+def ImportMeshAndAnimation(meshPath, animDir, animPaths = None):
+    report = {}
+    startTime = time.perf_counter()
+    mesh = ImportSkeletalMesh(meshPath, False)
+    report["meshSeconds"] = round(time.perf_counter() - startTime, 3)
+
+    if animPaths is None:
+        animPaths = [os.path.join(animDir, fileName) for fileName in sorted(os.listdir(animDir)) if IsFbxFile(fileName)]
+
+    animationStartTime = time.perf_counter()
+    report["animationSeconds"], animations = ImportAnimations(mesh, animPaths)
+    report["animationBatchSeconds"] = round(time.perf_counter() - animationStartTime, 3)
+
+    saveStartTime = time.perf_counter()
+    SaveImportedPackages(GetSkeletalMeshAssets(mesh) + animations)
+    report["saveSeconds"] = round(time.perf_counter() - saveStartTime, 3)
+    report["totalSeconds"] = round(time.perf_counter() - startTime, 3)
+
+    unreal.log(f"imported {meshPath} and {len(animPaths)} animation(s) in {report['totalSeconds']}s")
+    for assetPath, seconds in report["animationSeconds"].items():
+        unreal.log(f"    {assetPath}: {seconds}s")
+
+    return report
 
 
 # ImportMeshAndAnimation("D:/profile redirect/jvpalmer/Desktop/Tech_Dir/Alex_start/assets/Alex.fbx", 
@@ -0,0 +1,66 @@
+import sys
+import threading
+
+from BatchRunner import BatchJob, RunBatch, SplitByWeight, SummarizeBatch
+
+# stands in for BatchWorker.py, it speaks the same stdin/stdout protocol without needing mayapy
+standInWorker = r'''
+import json, os, sys, time
+job = json.loads(sys.stdin.read())
+arguments = job["arguments"]
+print("some log line")
+if job["task"] == "Crash":
+    # crashes until it has been started crashCount times, counted in a file so retries see it
+    with open(arguments["counterPath"], "a") as counterFile:
+        counterFile.write("x")
+    if os.path.getsize(arguments["counterPath"]) <= arguments["crashCount"]:
+        sys.exit(3)
+elif job["task"] == "Fail":
+    print("BATCH_RESULT " + json.dumps({"success" : False, "error" : "no such scene"}))
+    sys.exit(1)
+elif job["task"] == "Sleep":
+    time.sleep(arguments["seconds"])
+print("BATCH_RESULT " + json.dumps({"success" : True, "result" : arguments}))
+'''
+workerCommand = [sys.executable, "-c", standInWorker]
+
+def test_RunBatchReturnsResultsInJobOrder():
+    jobs = [BatchJob(f"job{i}", "Echo", {"index" : i}, weight = i) for i in range(5)]
+    reported = []
+    results = RunBatch(jobs, workerCommand, workerCount = 3, OnResult = lambda result : reported.append(result.job.name))
+
+    assert [result.job.name for result in results] == [job.name for job in jobs]
+    assert all(result.success and result.attempts == 1 for result in results)
+    assert [result.result for result in results] == [{"index" : i} for i in range(5)]
+    assert sorted(reported) == sorted(job.name for job in jobs)
+
+def test_RunBatchRetriesACrashedWorker(tmp_path):
+    job = BatchJob("crashy", "Crash", {"counterPath" : str(tmp_path / "counter"), "crashCount" : 1})
+    result, = RunBatch([job], workerCommand, retries = 1)
+    assert result.success and result.attempts == 2
+
+def test_RunBatchGivesUpAfterRetries(tmp_path):
+    crashJob = BatchJob("crashy", "Crash", {"counterPath" : str(tmp_path / "counter"), "crashCount" : 5})
+    failJob = BatchJob("failing", "Fail", {})
+    crashResult, failResult = RunBatch([crashJob, failJob], workerCommand, retries = 2)
+
+    assert not crashResult.success and crashResult.attempts == 3
+    assert "exited with code 3" in crashResult.error
+    assert not failResult.success and failResult.attempts == 3
+    assert failResult.error == "no such scene"
+    assert SummarizeBatch([crashResult, failResult])["failed"] == 2
+
+def test_RunBatchTimeoutAndCancel():
+    result, = RunBatch([BatchJob("slow", "Sleep", {"seconds" : 30})], workerCommand, retries = 0, timeout = 0.5)
+    assert not result.success and result.error.startswith("timed out")
+    assert result.seconds < 10
+
+    cancelEvent = threading.Event()
+    cancelEvent.set()
+    result, = RunBatch([BatchJob("slow", "Sleep", {"seconds" : 30})], workerCommand, cancelEvent = cancelEvent)
+    assert not result.success and result.error == "cancelled" and result.attempts == 0
+
+def test_SplitByWeight():
+    groups = SplitByWeight(["a", "b", "c", "d", "e"], [5, 1, 4, 2, 3], 2)
+    assert groups == [["a", "d", "b"], ["c", "e"]]
+    assert SplitByWeight(["a"], [1], 4) == [["a"]]
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from ProxyRigUtilities import GenerateInfluenceVertGroups, GetDominantInfluences, GetFaceOwners, GroupIndicesByLabel, PartitionMesh, RemapSegmentWeights
+
+def LoopDominantInfluences(weights):
+    # the per vertex loop the proxy rigger used before, kept here to check the argmax against
+    dominantInfluences = []
+    for vertWeights in weights:
+        best = 0
+        for column, weight in enumerate(vertWeights):
+            if weight > vertWeights[best]:
+                best = column
+
+        dominantInfluences.append(best)
+
+    return dominantInfluences
+
+def test_GetDominantInfluencesMatchesLoop():
+    weights = np.random.default_rng(7).random((200, 6))
+    weights[::5, 2] = weights[::5, 4] = 2.0 # ties between two influences
+    assert GetDominantInfluences(weights).tolist() == LoopDominantInfluences(weights)
+
+def test_GetDominantInfluencesKeepsFirstOnTie():
+    assert GetDominantInfluences([[0.5, 0.5], [0.0, 0.0], [0.2, 0.8]]).tolist() == [0, 0, 1]
+
+def test_GetDominantInfluencesEmptyAndWrongShape():
+    assert GetDominantInfluences(np.zeros((0, 3))).tolist() == []
+    with pytest.raises(ValueError):
+        GetDominantInfluences([0.1, 0.9])
+
+def test_GroupIndicesByLabel():
+    groups = GroupIndicesByLabel([2, 0, 2, 1, 0], 4)
+    assert [group.tolist() for group in groups] == [[1, 4], [3], [0, 2], []]
+
+def test_GenerateInfluenceVertGroups():
+    weights = [[1.0, 0.0, 0.0], [0.0, 0.0, 1.0], [0.9, 0.1, 0.0], [0.0, 0.3, 0.7]]
+    groups = GenerateInfluenceVertGroups(weights, ["hip", "knee", "foot"])
+    assert {influence : verts.tolist() for influence, verts in groups.items()} == {"hip" : [0, 2], "knee" : [], "foot" : [1, 3]}
+
+    with pytest.raises(ValueError):
+        GenerateInfluenceVertGroups(weights, ["hip", "knee"])
+
+def test_GetFaceOwnersMajorityAndTie():
+    # a quad with three verts on owner 1, a quad split 2 - 2 between owners 2 and 0, and a triangle on owner 2
+    faceVertCounts = [4, 4, 3]
+    faceVertIndices = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    vertOwners = [1, 1, 0, 1, 2, 0, 2, 0, 2, 2, 2]
+    assert GetFaceOwners(faceVertCounts, faceVertIndices, vertOwners, 3).tolist() == [1, 0, 2]
+
+def test_PartitionMesh():
+    # two quads sharing an edge, the left one on "upper" and the right one on "lower"
+    faceVertCounts = [4, 4]
+    faceVertIndices = [0, 1, 4, 3, 1, 2, 5, 4]
+    vertOwners = [0, 0, 1, 0, 1, 1]
+    segments = PartitionMesh(faceVertCounts, faceVertIndices, vertOwners, ["upper", "lower", "unused"])
+
+    assert [segment.joint for segment in segments] == ["upper", "lower"]
+    upper, lower = segments
+    assert upper.faces.tolist() == [0] and lower.faces.tolist() == [1]
+    assert lower.sourceVerts.tolist() == [1, 2, 4, 5]
+    assert lower.polygonCounts.tolist() == [4]
+    assert lower.sourceVerts[lower.polygonConnects].tolist() == [1, 2, 5, 4] # renumbered verts point back at the source face
+
+def test_RemapSegmentWeightsPicksRowsAndReordersColumns():
+    weights = np.array([[1.0, 0.0, 0.0], [0.2, 0.8, 0.0], [0.0, 0.4, 0.6], [0.0, 0.0, 1.0]])
+    remapped = RemapSegmentWeights(weights, [3, 1], ["hip", "knee", "foot"], ["foot", "hip", "knee"])
+    assert remapped.tolist() == [[1.0, 0.0, 0.0], [0.0, 0.2, 0.8]]
+
+def test_RemapSegmentWeightsZeroForMissingInfluence():
+    weights = np.array([[0.3, 0.7], [0.5, 0.5]])
+    remapped = RemapSegmentWeights(weights, [0, 1], ["hip", "knee"], ["knee", "toe"])
+    assert remapped.tolist() == [[0.7, 0.0], [0.5, 0.0]]
+
+def test_RemapSegmentWeightsNoVerts():
+    assert RemapSegmentWeights(np.ones((4, 2)), [], ["hip", "knee"], ["knee"]).shape == (0, 1)
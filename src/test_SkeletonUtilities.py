@@ -0,0 +1,82 @@
+from SkeletonUtilities import FindLimbChains, GetSide, GetUnbranchedRuns
+
+def AddJoint(parents, positions, parent, name, position):
+    joint = (parent or "") + "|" + name
+    parents[joint] = parent
+    positions[joint] = position
+    return joint
+
+def BuildSkeleton():
+    # a small biped, y up, facing +z, with clavicles, two fingers per hand and toes
+    parents, positions = {}, {}
+    root = AddJoint(parents, positions, None, "root", (0, 0, 0))
+    hips = AddJoint(parents, positions, root, "hips", (0, 10, 0))
+    spine = AddJoint(parents, positions, hips, "spine", (0, 12, 0))
+    chest = AddJoint(parents, positions, spine, "spine1", (0, 14, 0))
+    chest = AddJoint(parents, positions, chest, "chest", (0, 16, 0))
+    neck = AddJoint(parents, positions, chest, "neck", (0, 17, 0))
+    AddJoint(parents, positions, neck, "head", (0, 18, 0))
+    for sideName, x in (("l", 1), ("r", -1)):
+        thigh = AddJoint(parents, positions, hips, f"thigh_{sideName}", (x, 10, 0))
+        calf = AddJoint(parents, positions, thigh, f"calf_{sideName}", (x, 5, 0.2))
+        foot = AddJoint(parents, positions, calf, f"foot_{sideName}", (x, 1, 0))
+        AddJoint(parents, positions, foot, f"toe_{sideName}", (x, 0, 0.5))
+
+        clavicle = AddJoint(parents, positions, chest, f"clavicle_{sideName}", (x * 0.5, 16, 0))
+        upperArm = AddJoint(parents, positions, clavicle, f"upperArm_{sideName}", (x * 1.5, 16, 0))
+        lowerArm = AddJoint(parents, positions, upperArm, f"lowerArm_{sideName}", (x * 4.5, 16, -0.2))
+        hand = AddJoint(parents, positions, lowerArm, f"hand_{sideName}", (x * 7.5, 16, 0))
+        for finger, z in (("index", 0.2), ("pinky", -0.2)):
+            knuckle = AddJoint(parents, positions, hand, f"{finger}01_{sideName}", (x * 8, 16, z))
+            middle = AddJoint(parents, positions, knuckle, f"{finger}02_{sideName}", (x * 8.4, 16, z))
+            AddJoint(parents, positions, middle, f"{finger}03_{sideName}", (x * 8.7, 16, z))
+
+    return parents, positions
+
+def GetChainNames(chains):
+    return [[joint.rsplit("|", 1)[-1] for joint in chain.GetJoints()] for chain in chains]
+
+def test_FindLimbChainsFindsArmsAndLegs():
+    parents, positions = BuildSkeleton()
+    chains = FindLimbChains(parents, positions)
+
+    # the clavicles and toes are too short next to the bone after or before them, the fingers too short next to the legs
+    assert GetChainNames(chains) == [
+        ["thigh_l", "calf_l", "foot_l"],
+        ["thigh_r", "calf_r", "foot_r"],
+        ["upperArm_l", "lowerArm_l", "hand_l"],
+        ["upperArm_r", "lowerArm_r", "hand_r"],
+    ]
+    assert [chain.side for chain in chains] == ["left", "right", "left", "right"]
+    assert chains[0].mirror is chains[1] and chains[1].mirror is chains[0]
+    assert chains[2].mirror is chains[3]
+    assert chains[0].root == "|root|hips|thigh_l" # full dag paths, so same named joints elsewhere do not clash
+
+def test_FindLimbChainsCenterAndFingers():
+    parents, positions = BuildSkeleton()
+    centerChains = [chain for chain in FindLimbChains(parents, positions, includeCenter = True) if chain.side == "center"]
+    assert GetChainNames(centerChains) == [["spine", "spine1", "chest"]]
+
+    fingerChains = [chain for chain in FindLimbChains(parents, positions, minRelativeLength = 0) if "index" in chain.mirrorKey]
+    assert GetChainNames(fingerChains) == [["index01_l", "index02_l", "index03_l"], ["index01_r", "index02_r", "index03_r"]]
+
+def test_FindLimbChainsUnpairedAndEmpty():
+    parents, positions = BuildSkeleton()
+    for joint in [joint for joint in parents if "_r" in joint]:
+        del parents[joint], positions[joint]
+
+    chains = FindLimbChains(parents, positions)
+    assert [chain.side for chain in chains] == ["left", "left"]
+    assert all(chain.mirror is None for chain in chains)
+    assert FindLimbChains({}, {}) == []
+
+def test_GetUnbranchedRunsStopAtBranches():
+    parents = {"|a" : None, "|a|b" : "|a", "|a|b|c" : "|a|b", "|a|b|d" : "|a|b", "|a|b|d|e" : "|a|b|d"}
+    assert GetUnbranchedRuns(parents) == [["|a", "|a|b"], ["|a|b|c"], ["|a|b|d", "|a|b|d|e"]]
+
+def test_GetSide():
+    assert GetSide("|root|L_arm") == ("left", "#_arm")
+    assert GetSide("arm_r") == ("right", "arm_#")
+    assert GetSide("leftArm")[0] == "left"
+    assert GetSide("ns:RightLeg") == ("right", "#_leg")
+    assert GetSide("spine01") == ("center", "spine_01")